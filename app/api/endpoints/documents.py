@@ -1,13 +1,16 @@
 """Document management API endpoints"""
 
 from fastapi import APIRouter, UploadFile, File, HTTPException, Depends, BackgroundTasks, Query
-from fastapi.responses import JSONResponse, FileResponse
+from fastapi.responses import JSONResponse, FileResponse, StreamingResponse
 from sqlalchemy.orm import Session
 from typing import Optional, List
 from pathlib import Path
 import shutil
 import logging
 
+import orjson
+import redis.asyncio as aioredis
+
 from app.database.session import get_db
 from app.security.auth import get_current_active_admin, decode_access_token
 from app.models.admin import Admin
@@ -29,6 +32,8 @@ from app.schemas.document import (
     DocumentUpdate,
     DocumentUsageStats
 )
+from app.rag.config import rag_config
+from app.services import ocr_progress
 from app.services.document_service import document_service
 from app.services.file_processor import file_processor
 
@@ -608,6 +613,59 @@ async def get_document_chunks(
         raise HTTPException(status_code=500, detail=f"Failed to get chunks: {str(e)}")
 
 
+@router.get("/documents/{document_id}/ocr-progress")
+async def stream_ocr_progress(
+    document_id: int,
+    db: Session = Depends(get_db),
+    current_admin: Admin = Depends(get_current_active_admin)
+):
+    """
+    Stream live OCR progress for a document as server-sent events.
+
+    The OCR worker publishes per-page progress over Redis pub/sub
+    (channel ocr:{document_id}); subscribing here replaces clients
+    polling the documents table every few seconds. The stream ends when
+    OCR reports completion or after 60s without an event.
+    """
+    document = db.query(Document).filter(Document.id == document_id).first()
+    if not document:
+        raise HTTPException(status_code=404, detail="Document not found")
+
+    last_known = None
+    if document.ocr_progress_total:
+        last_known = orjson.dumps({
+            "current": document.ocr_progress_current or 0,
+            "total": document.ocr_progress_total,
+            "message": "last known state"
+        })
+
+    async def event_stream():
+        client = aioredis.from_url(rag_config.redis_url)
+        pubsub = client.pubsub()
+        try:
+            await pubsub.subscribe(f"{ocr_progress.CHANNEL_PREFIX}{document_id}")
+            # Seed with the last-known DB state so the client renders
+            # something before the first live event arrives
+            if last_known:
+                yield b"data: " + last_known + b"\n\n"
+            while True:
+                message = await pubsub.get_message(
+                    ignore_subscribe_messages=True, timeout=60.0
+                )
+                if message is None:
+                    break
+                data = message['data']
+                yield b"data: " + data + b"\n\n"
+                event = orjson.loads(data)
+                if event.get('total') and event.get('current', 0) >= event['total']:
+                    break
+        finally:
+            await pubsub.close()
+            await client.aclose()
+
+    return StreamingResponse(event_stream(), media_type="text/event-stream")
+
+
 @router.put("/documents/{document_id}")
 async def update_document(
     document_id: int,
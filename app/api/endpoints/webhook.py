@@ -13,6 +13,7 @@ from app.services.message_service import (
 from app.services.waha_client import WAHAClient
 from app.security.rate_limiter import RateLimiter
 from app.config import settings
+import asyncio
 import logging
 import time
 import redis
@@ -327,20 +328,21 @@ async def send_auto_reply(phone: str, user_message: str, request_id: str, phone_
                Required because newer WhatsApp accounts use @lid instead of @c.us.
     """
     from app.database.session import get_db
-    
+    import re
+
     try:
         logger.info(f"[{request_id}] Starting AI reply to {phone}")
         
         # Initialize WAHA client
         waha = WAHAClient(session="default")
-        
-        # Send typing indicator
-        if phone_raw:
-            waha.send_typing(to=phone, chat_id=phone_raw)
-        else:
-            waha.send_typing(to=phone)
-        logger.info(f"[{request_id}] Typing indicator sent")
-        
+
+        # Fire the typing indicator concurrently with response
+        # generation — the two calls are independent, so the typing RTT
+        # overlaps the RAG pipeline instead of delaying it
+        typing_task = asyncio.create_task(
+            waha.send_typing_async(to=phone, chat_id=phone_raw)
+        )
+
         # Get database session
         db = next(get_db())
         
@@ -353,13 +355,32 @@ async def send_auto_reply(phone: str, user_message: str, request_id: str, phone_
             conversation = get_or_create_conversation(user.id, db)
             logger.info(f"[{request_id}] Conversation ID: {conversation.id}")
             
+            # Use phone_raw (@lid/@c.us) as chat_id for newer WhatsApp accounts
+            chat_id = phone_raw if phone_raw else None
+
+            # Long answers are pipelined: the first paragraph goes out
+            # as soon as the LLM finishes it, hiding the rest of the
+            # generation behind delivery. The closure records how much
+            # text was pre-sent so the final send carries only the
+            # remainder (plus sources).
+            sent_early = {"chars": 0}
+
+            async def _send_first_paragraph(paragraph: str):
+                head = re.sub(r'\s*\[[\d,\s]+\]', '', paragraph).strip()
+                head = markdown_to_whatsapp(head)
+                await typing_task
+                await waha.send_message_async(to=phone, text=head, chat_id=chat_id)
+                sent_early["chars"] = len(paragraph)
+                logger.info(f"[{request_id}] First paragraph sent early ({len(head)} chars)")
+
             # Generate AI response using RAG
             logger.info(f"[{request_id}] Generating AI response with RAG")
             response = await generate_ai_response(
                 user_message=user_message,
                 conversation_id=conversation.id,
                 user_id=user.id,
-                db=db
+                db=db,
+                on_first_paragraph=_send_first_paragraph
             )
             
             reply_text = response['text']
@@ -380,7 +401,6 @@ async def send_auto_reply(phone: str, user_message: str, request_id: str, phone_
             
             # Append source references to reply
             # Use regex to find all citations like [1], [1, 2]
-            import re
             citations = re.findall(r'\[([\d,\s]+)\]', reply_text)
             cited_indices = set()
             for citation in citations:
@@ -400,9 +420,11 @@ async def send_auto_reply(phone: str, user_message: str, request_id: str, phone_
                 # If LLM didn't cite anything (e.g. said "I don't know"), don't append sources
                 sources_text = ""
                 
-            # Clean up the citations from reply text
-            clean_reply_text = re.sub(r'\s*\[[\d,\s]+\]', '', reply_text).strip()
-            
+            # Clean up the citations, skipping whatever the early send
+            # already delivered
+            remainder = reply_text[sent_early["chars"]:]
+            clean_reply_text = re.sub(r'\s*\[[\d,\s]+\]', '', remainder).strip()
+
             # Format markdown to WhatsApp
             clean_reply_text = markdown_to_whatsapp(clean_reply_text)
             
@@ -413,10 +435,15 @@ async def send_auto_reply(phone: str, user_message: str, request_id: str, phone_
                 reply_text = clean_reply_text
                 logger.info(f"[{request_id}] No high-relevance sources to append")
             
-            # Use phone_raw (@lid/@c.us) as chat_id for newer WhatsApp accounts
-            chat_id = phone_raw if phone_raw else None
             logger.info(f"[{request_id}] Sending message to {phone} (chat_id={chat_id})")
-            result = waha.send_message(to=phone, text=reply_text, chat_id=chat_id)
+            # Typing errors are already swallowed in the client; awaiting
+            # a task the early send already finished is a no-op
+            await typing_task
+            if reply_text.strip():
+                result = await waha.send_message_async(to=phone, text=reply_text, chat_id=chat_id)
+            else:
+                # Everything already went out with the early send
+                result = {"status": "sent", "chatId": chat_id}
             logger.info(f"[{request_id}] WAHA send result: {result}")
             
             logger.info(
@@ -437,7 +464,7 @@ async def send_auto_reply(phone: str, user_message: str, request_id: str, phone_
         try:
             waha = WAHAClient(session="default")
             error_msg = "Maaf, saya mengalami kesulitan memproses permintaan Anda. Silakan coba lagi dalam beberapa saat. 😊"
-            waha.send_message(to=phone, text=error_msg, chat_id=phone_raw if phone_raw else None)
+            await waha.send_message_async(to=phone, text=error_msg, chat_id=phone_raw if phone_raw else None)
             logger.info(f"[{request_id}] Error message sent to user")
         except Exception as send_error:
             logger.error(f"[{request_id}] Failed to send error message: {str(send_error)}")
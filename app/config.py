@@ -29,6 +29,10 @@ class Settings(BaseSettings):
     QDRANT_URL: str = "http://localhost:6333"
     QDRANT_API_KEY: str = ""
     QDRANT_COLLECTION: str = "documents"
+    # gRPC transport skips per-call JSON encode/decode and reuses HTTP/2
+    # streams; requires the server to expose the gRPC port
+    QDRANT_PREFER_GRPC: bool = False
+    QDRANT_GRPC_PORT: int = 6334
     
     # AI Model Configuration
     AI_PROVIDER: str = "gemini"  # "openai" or "gemini"
@@ -1,7 +1,7 @@
 """FastAPI application entry point"""
 
 from fastapi import FastAPI, Request
-from fastapi.responses import JSONResponse
+from fastapi.responses import ORJSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
 import logging
@@ -61,6 +61,13 @@ async def lifespan(app: FastAPI):
     except Exception as e:
         logger.error(f"Database initialization error: {str(e)}")
     
+    # Start the bulk message writer
+    try:
+        from app.services.message_writer import message_writer
+        message_writer.start()
+    except Exception as e:
+        logger.error(f"Message writer initialization error: {str(e)}")
+
     # Start background scheduler
     try:
         # Add keep-alive job - runs every 5 minutes
@@ -81,6 +88,13 @@ async def lifespan(app: FastAPI):
     # Shutdown
     logger.info(f"Shutting down {settings.APP_NAME}")
     
+    # Flush and stop the bulk message writer
+    try:
+        from app.services.message_writer import message_writer
+        await message_writer.stop()
+    except Exception as e:
+        logger.error(f"Message writer shutdown error: {str(e)}")
+
     # Stop scheduler
     try:
         scheduler.shutdown()
@@ -95,6 +109,9 @@ app = FastAPI(
     description="Intelligent RAG-powered WhatsApp chatbot using WAHA",
     version="1.0.0",
     lifespan=lifespan,
+    # orjson serializes responses several times faster than the stdlib
+    # encoder, which matters for the large document/conversation listings
+    default_response_class=ORJSONResponse,
     docs_url="/docs" if settings.DEBUG else None,
     redoc_url="/redoc" if settings.DEBUG else None
 )
@@ -136,7 +153,7 @@ app.include_router(admins.router, prefix="/api", tags=["admins"])
 async def chatbot_exception_handler(request: Request, exc: ChatbotException):
     """Handle custom chatbot exceptions"""
     logger.error(f"Chatbot exception: {str(exc)}")
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=500,
         content={
             "error": exc.__class__.__name__,
@@ -149,7 +166,7 @@ async def chatbot_exception_handler(request: Request, exc: ChatbotException):
 async def general_exception_handler(request: Request, exc: Exception):
     """Handle all other exceptions"""
     logger.error(f"Unhandled exception: {str(exc)}", exc_info=True)
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=500,
         content={
             "error": "InternalServerError",
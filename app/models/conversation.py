@@ -1,6 +1,6 @@
 """Conversation model"""
 
-from sqlalchemy import Column, Integer, ForeignKey, DateTime, Boolean, Index
+from sqlalchemy import Column, Integer, ForeignKey, DateTime, Boolean, Index, func
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from app.database.base import Base
@@ -13,7 +13,7 @@ class Conversation(Base):
     
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
-    started_at = Column(DateTime, default=datetime.utcnow, index=True)
+    started_at = Column(DateTime, server_default=func.now(), index=True)
     ended_at = Column(DateTime, nullable=True)
     message_count = Column(Integer, default=0)
     is_active = Column(Boolean, default=True, index=True)
@@ -24,6 +24,13 @@ class Conversation(Base):
     
     __table_args__ = (
         Index('idx_user_active', 'user_id', 'is_active'),
+        # Covers the active-conversation lookup in
+        # get_or_create_conversation: the ORDER BY started_at DESC
+        # LIMIT 1 is served straight from index order
+        Index(
+            'idx_conv_user_active_started',
+            'user_id', 'is_active', started_at.desc()
+        ),
     )
     
     def __repr__(self):
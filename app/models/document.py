@@ -1,6 +1,6 @@
 """Document model"""
 
-from sqlalchemy import Column, Integer, String, Text, DateTime, Boolean, Index, ForeignKey
+from sqlalchemy import Column, Integer, String, Text, DateTime, Boolean, Index, ForeignKey, func
 from sqlalchemy.dialects.mysql import JSON, LONGTEXT
 from sqlalchemy.orm import relationship
 from datetime import datetime
@@ -19,7 +19,7 @@ class Document(Base):
     source_url = Column(Text, nullable=True)
     doc_metadata = Column(JSON, nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow, index=True)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
     is_active = Column(Boolean, default=True, index=True)
     embedding_status = Column(String(20), default="pending", index=True)  # pending, processing, completed, failed
     
@@ -29,14 +29,16 @@ class Document(Base):
     file_path = Column(String(500), nullable=True)
     file_size = Column(Integer, nullable=True)  # Size in bytes
     file_type = Column(String(50), nullable=True)  # pdf, docx, txt, md
+    content_hash = Column(String(64), nullable=True, index=True)  # SHA-256 of file bytes for dedup
     chunks_count = Column(Integer, default=0, nullable=False)
     processed_at = Column(DateTime, nullable=True)
     failed_reason = Column(Text, nullable=True)
-    upload_date = Column(DateTime, default=datetime.utcnow, nullable=False)
+    upload_date = Column(DateTime, server_default=func.now(), nullable=False)
     
-    # OCR progress tracking
-    ocr_progress_current = Column(Integer, default=0, nullable=False)
-    ocr_progress_total = Column(Integer, default=0, nullable=False)
+    # OCR progress: last-known terminal state only — live updates stream
+    # over Redis pub/sub (app/services/ocr_progress.py), not DB polling
+    ocr_progress_current = Column(Integer, nullable=True)
+    ocr_progress_total = Column(Integer, nullable=True)
     
     # Relationships
     category = relationship("DocumentCategory", back_populates="documents")
@@ -1,6 +1,6 @@
 """Message model"""
 
-from sqlalchemy import Column, Integer, String, Text, ForeignKey, DateTime, Index
+from sqlalchemy import Column, Integer, String, Text, ForeignKey, DateTime, Index, func
 from sqlalchemy.dialects.mysql import JSON
 from sqlalchemy.orm import relationship
 from datetime import datetime
@@ -19,7 +19,9 @@ class Message(Base):
     content = Column(Text, nullable=False)
     content_type = Column(String(50), default="text")  # text, image, audio, etc.
     media_url = Column(Text, nullable=True)
-    created_at = Column(DateTime, default=datetime.utcnow, index=True)
+    # Server-side default: the DB stamps the row, saving a Python call
+    # per message and keeping timestamps on one clock
+    created_at = Column(DateTime, server_default=func.now(), index=True)
     processed_at = Column(DateTime, nullable=True)
     rag_context = Column(JSON, nullable=True)
     llm_tokens = Column(Integer, nullable=True)
@@ -11,7 +11,16 @@ from app.rag.retriever import LCELRetriever, retriever
 from app.rag.document_processor import document_processor
 from app.rag.vector_store import vector_store
 from app.rag.embeddings import embeddings_service
-from app.rag.generator import generator
+
+
+def __getattr__(name):
+    # Lazily resolve the OpenAI generator singleton so importing app.rag
+    # doesn't force OpenAI client + tiktoken init
+    if name == "generator":
+        from app.rag.generator import get_generator
+        return get_generator()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 
 __all__ = [
     # ── Chain (sekarang berbasis LCEL) ──
@@ -14,10 +14,14 @@ Integration:
 
 from __future__ import annotations
 
+from collections import OrderedDict
 from typing import Any, Dict, List, Optional
+import hashlib
 import logging
 import time
 
+import orjson
+
 # LangChain Core (LCEL)
 from langchain_core.documents import Document
 from langchain_core.runnables import (
@@ -27,9 +31,11 @@ from langchain_core.runnables import (
 
 # Project internals
 from app.rag.config import rag_config
-from app.rag.prompt_templates import LCEL_RAG_PROMPT
+from app.rag.factory import get_embeddings_service
+from app.rag.prompt_templates import LCEL_RAG_PROMPT, format_conversation_history
 from app.rag.retriever import LCELRetriever
 from app.rag.generator_gemini import GeminiLCELWrapper
+from app.rag.semantic_cache import semantic_cache
 
 logger = logging.getLogger(__name__)
 
@@ -37,30 +43,65 @@ logger = logging.getLogger(__name__)
 _llm_instance = GeminiLCELWrapper()
 
 
+# Memo for _format_docs: popular FAQs retrieve the same chunk set turn
+# after turn, so the formatted block is rebuilt from identical inputs.
+# Keyed on a hash of everything that enters the output (metadata header
+# fields + chunk text), evicted LRU-style.
+_DOCS_FMT_CACHE_MAX = 256
+_docs_fmt_cache: "OrderedDict[str, str]" = OrderedDict()
+
+
+def _docs_fmt_key(docs: List[Document]) -> str:
+    """Content-identity fingerprint of the docs as _format_docs sees them"""
+    digest = hashlib.blake2b(digest_size=16)
+    for doc in docs:
+        meta = doc.metadata
+        digest.update(orjson.dumps([
+            meta.get("title"),
+            meta.get("file_name"),
+            meta.get("page_number"),
+            meta.get("doc_metadata", {}),
+            doc.page_content,
+        ], default=str))
+    return digest.hexdigest()
+
+
 def _format_docs(docs: List[Document]) -> str:
     """
     Format list of Documents into context text for LLM prompt.
     Each chunk is labeled with source number and file name.
+
+    The formatted block is deliberately deterministic for a given set of
+    chunks — no per-query values like relevance scores. Hosted LLM APIs
+    (Gemini implicit caching, OpenAI prompt caching) reuse server-side
+    KV state for byte-identical prompt prefixes, so repeated retrievals
+    of the same chunks only prefill the trailing history + question.
+    Scores stay available to clients via sources_metadata.
     """
     if not docs:
         return "Tidak ada informasi relevan yang ditemukan dalam knowledge base."
 
+    key = _docs_fmt_key(docs)
+    cached = _docs_fmt_cache.get(key)
+    if cached is not None:
+        _docs_fmt_cache.move_to_end(key)
+        return cached
+
     parts: List[str] = []
     for i, doc in enumerate(docs, 1):
         meta = doc.metadata
         title      = meta.get("title", "Document")
         file_name  = meta.get("file_name", "-")
         page_num   = meta.get("page_number")
-        score      = meta.get("score", 0.0)
         doc_metadata = meta.get("doc_metadata", {})
-        
+
         doc_type = doc_metadata.get("Jenis Dokumen", "Dokumen")
         doc_number = doc_metadata.get("No. Dokumen", "")
         doc_rev = doc_metadata.get("No. Revisi", "")
         doc_title = doc_metadata.get("Judul", title)
 
         page_info = f" | p.{page_num}" if page_num is not None else ""
-        
+
         header_parts = [f"--- SUMBER {i} ---"]
         header_parts.append(f"Judul: {doc_title}")
         if doc_number:
@@ -70,8 +111,7 @@ def _format_docs(docs: List[Document]) -> str:
         if doc_rev:
             header_parts.append(f"Revisi: {doc_rev}")
         header_parts.append(f"Nama File: {file_name}{page_info}")
-        header_parts.append(f"Relevansi: {score:.2f}")
-        
+
         header = "\n".join(header_parts)
         
         parts.append(
@@ -79,7 +119,11 @@ def _format_docs(docs: List[Document]) -> str:
             f"{doc.page_content}"
         )
 
-    return "\n\n".join(parts)
+    result = "\n\n".join(parts)
+    _docs_fmt_cache[key] = result
+    if len(_docs_fmt_cache) > _DOCS_FMT_CACHE_MAX:
+        _docs_fmt_cache.popitem(last=False)
+    return result
 
 
 def extract_sources_metadata(docs: List[Document]) -> List[Dict[str, Any]]:
@@ -178,17 +222,13 @@ class RAGChainWithSources:
     def __init__(self):
         self._chain = build_rag_chain_with_sources()
 
-    # Format conversation history
+    # Format conversation history (memoized in prompt_templates; the
+    # same history is reformatted on retries and repeat turns)
     @staticmethod
     def _format_history(history: List[Dict[str, str]]) -> str:
         if not history:
             return "No conversation history yet."
-        recent = history[-5:]  # last 5 messages
-        lines = []
-        for msg in recent:
-            role = "User" if msg.get("role") == "user" else "Assistant"
-            lines.append(f"{role}: {msg.get('content', '')}")
-        return "\n".join(lines)
+        return format_conversation_history(history, max_messages=5)
 
     # Preprocess user query
     @staticmethod
@@ -264,6 +304,53 @@ class RAGChainWithSources:
                 "generation_time_ms":0,
             }
 
+    # Don't fire the early send before this much text: short answers
+    # should go out as a single message
+    _FIRST_PARAGRAPH_MIN_CHARS = 120
+
+    @classmethod
+    async def _stream_with_early_send(cls, messages, on_first_paragraph):
+        """
+        Stream the LLM response, handing the first complete paragraph to
+        the callback as soon as it exists so the caller can deliver it
+        while the rest is still generating.
+
+        Returns (full_text, estimated_tokens). Streamed responses carry
+        no usage metadata, so tokens use the chars/4 estimate applied
+        elsewhere when metadata is missing.
+        """
+        from app.rag.generator_gemini import get_gemini_generator
+        from langchain_core.messages import AIMessage, SystemMessage
+
+        converted: List[Dict[str, str]] = []
+        for msg in messages:
+            if isinstance(msg, SystemMessage):
+                role = "system"
+            elif isinstance(msg, AIMessage):
+                role = "assistant"
+            else:
+                role = "user"
+            converted.append({"role": role, "content": msg.content})
+
+        parts: List[str] = []
+        length = 0
+        fired = False
+        async for chunk in get_gemini_generator().generate_stream(converted):
+            parts.append(chunk)
+            length += len(chunk)
+            if not fired and length >= cls._FIRST_PARAGRAPH_MIN_CHARS:
+                text = ''.join(parts)
+                cut = text.find('\n\n')
+                if cut >= cls._FIRST_PARAGRAPH_MIN_CHARS:
+                    fired = True
+                    try:
+                        await on_first_paragraph(text[:cut])
+                    except Exception as cb_error:
+                        logger.warning(f"Early-send callback failed: {cb_error}")
+
+        full_text = ''.join(parts)
+        return full_text, len(full_text) // 4
+
     # Async
     async def generate_response_async(
         self,
@@ -271,8 +358,18 @@ class RAGChainWithSources:
         conversation_history: Optional[List[Dict[str, str]]] = None,
         user_id: Optional[int] = None,
         filters: Optional[Dict[str, Any]] = None,
+        on_first_paragraph=None,
     ) -> Dict[str, Any]:
-        """Async version of generate_response (for FastAPI endpoints)."""
+        """
+        Async version of generate_response (for FastAPI endpoints).
+
+        When `on_first_paragraph` (an async callable taking the raw
+        paragraph text) is given, the LLM call is streamed and the
+        callback fires as soon as the first paragraph is complete, so
+        the caller can start delivering the answer while the rest
+        generates. The returned dict is identical either way; callers
+        track what they already delivered.
+        """
         start = time.time()
 
         # Step 1: Preprocess query
@@ -283,9 +380,34 @@ class RAGChainWithSources:
         retriever   = LCELRetriever()
 
         try:
+            # Embed the query once: the same vector feeds the semantic
+            # response cache lookup and (on a miss) the retrieval step
+            query_vector = await get_embeddings_service().generate_embedding_async(
+                processed_query
+            )
+
+            # Semantic response cache: a near-duplicate query (e.g. a
+            # rephrased FAQ) skips retrieval and the LLM completion.
+            # Only for unfiltered, history-free queries — filters change
+            # the answer, and a history-conditioned answer ("jelaskan
+            # lebih detail") must never be replayed into another
+            # conversation that embeds to the same vector.
+            cacheable = not filters and not conversation_history
+            if cacheable:
+                cached = semantic_cache.get_response(query_vector)
+                if cached is not None:
+                    cached["cache"] = "semantic"
+                    cached["total_time_ms"] = int((time.time() - start) * 1000)
+                    logger.info(
+                        f"[User {user_id}] Served response from semantic cache"
+                    )
+                    return cached
+
             # Step 3: Retrieve relevant documents (async)
-            docs = await retriever.aretrieve(processed_query, filters)
-            
+            docs = await retriever.aretrieve(
+                processed_query, filters, query_vector=query_vector
+            )
+
             # Step 4: Format context
             context = _format_docs(docs)
 
@@ -296,10 +418,16 @@ class RAGChainWithSources:
                 "question":             processed_query,
             })
             
-            # Step 6: Generate response with LLM
-            llm_result = await _llm_instance.ainvoke(prompt_value.to_messages())
-            answer = llm_result.get("content", "")
-            tokens_used = llm_result.get("tokens_used", 0)
+            # Step 6: Generate response with LLM (streamed when the
+            # caller wants the first paragraph early)
+            if on_first_paragraph is None:
+                llm_result = await _llm_instance.ainvoke(prompt_value.to_messages())
+                answer = llm_result.get("content", "")
+                tokens_used = llm_result.get("tokens_used", 0)
+            else:
+                answer, tokens_used = await self._stream_with_early_send(
+                    prompt_value.to_messages(), on_first_paragraph
+                )
 
             # Step 7: Extract source metadata for WhatsApp formatting
             sources_metadata = extract_sources_metadata(docs)
@@ -310,7 +438,7 @@ class RAGChainWithSources:
                 f"{len(docs)} docs, {tokens_used} tokens"
             )
 
-            return {
+            response = {
                 "text":             answer,
                 "answer":           answer,
                 "source_documents": docs,
@@ -324,6 +452,17 @@ class RAGChainWithSources:
                 "generation_time_ms":0,
             }
 
+            # Cache the response for near-duplicate queries. Document
+            # objects aren't JSON-serializable; sources_metadata carries
+            # everything downstream consumers read.
+            if cacheable and answer:
+                semantic_cache.set_response(
+                    query_vector,
+                    {**response, "source_documents": []}
+                )
+
+            return response
+
         except Exception as exc:
             logger.error(f"[User {user_id}] LCEL RAG async error: {exc}", exc_info=True)
             return {
@@ -366,7 +505,10 @@ async def generate_rag_response_async(
     query: str,
     conversation_history: Optional[List[Dict[str, str]]] = None,
     user_id: Optional[int] = None,
-    filters: Optional[Dict[str, Any]] = None
+    filters: Optional[Dict[str, Any]] = None,
+    on_first_paragraph=None
 ) -> Dict[str, Any]:
     """Generate RAG response (async) - convenience function"""
-    return await rag_chain.generate_response_async(query, conversation_history, user_id, filters)
+    return await rag_chain.generate_response_async(
+        query, conversation_history, user_id, filters, on_first_paragraph
+    )
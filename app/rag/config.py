@@ -31,8 +31,14 @@ class RAGConfig:
     vertex_location: str = settings.VERTEX_LOCATION
     
     # Qdrant Settings
+    # Server-side tip: set `storage.async_scorer: true` in the Qdrant
+    # config (io_uring scorer) — with on_disk vectors and memmapped
+    # segments it overlaps SSD reads with distance computation and is
+    # the biggest single win for collections larger than RAM.
     qdrant_url: str = settings.QDRANT_URL
     qdrant_api_key: str = settings.QDRANT_API_KEY
+    qdrant_prefer_grpc: bool = settings.QDRANT_PREFER_GRPC
+    qdrant_grpc_port: int = settings.QDRANT_GRPC_PORT
     
     # Dynamic collection name based on AI provider to avoid dimension conflicts
     # This allows switching between providers without deleting data
@@ -48,6 +54,13 @@ class RAGConfig:
     # - Gemini text-embedding-004: 768
     vector_size: int = settings.VECTOR_SIZE
     
+    # Qdrant HNSW tuning
+    # m / ef_construct are applied at collection creation; hnsw_ef_search
+    # is the per-query beam width (higher = better recall, more latency)
+    hnsw_m: int = 24
+    hnsw_ef_construct: int = 128
+    hnsw_ef_search: int = 128
+
     # RAG Settings
     chunk_size: int = settings.RAG_CHUNK_SIZE
     chunk_overlap: int = settings.RAG_CHUNK_OVERLAP
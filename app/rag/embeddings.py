@@ -1,7 +1,10 @@
 """OpenAI embeddings service"""
 
-from typing import List, Optional
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
 from openai import OpenAI, AsyncOpenAI
+import numpy as np
 import redis
 import json
 import hashlib
@@ -13,12 +16,24 @@ logger = logging.getLogger(__name__)
 
 class EmbeddingsService:
     """Service for generating embeddings using OpenAI"""
-    
+
+    # In-process LRU of query embeddings in front of Redis: WhatsApp
+    # traffic is highly skewed (greetings, FAQs), so hot queries resolve
+    # with a dict lookup instead of a Redis RTT or an API call. Vectors
+    # are stored as float32 bytes (~4x smaller than a list of Python
+    # floats).
+    _LOCAL_CACHE_MAX = 4096
+
     def __init__(self):
         self.client = OpenAI(api_key=rag_config.openai_api_key)
         self.async_client = AsyncOpenAI(api_key=rag_config.openai_api_key)
         self.model = rag_config.embedding_model
-        
+
+        self._local_cache: "OrderedDict[bytes, bytes]" = OrderedDict()
+        self._local_cache_lock = threading.Lock()
+        self._local_hits = 0
+        self._local_misses = 0
+
         # Redis cache for embeddings
         self.cache_enabled = rag_config.enable_cache
         if self.cache_enabled:
@@ -35,34 +50,91 @@ class EmbeddingsService:
     def _get_cache_key(self, text: str) -> str:
         """Generate cache key for text"""
         return f"emb:{hashlib.md5(text.encode()).hexdigest()}"
+
+    @staticmethod
+    def _normalize(embedding) -> List[float]:
+        """
+        L2-normalize an embedding to unit length.
+
+        Vectors are normalized once at generation so the collection can
+        use DOT distance, which ranks identically to cosine on unit
+        vectors without the per-comparison normalization inside Qdrant.
+        """
+        vec = np.asarray(embedding, dtype=np.float32)
+        norm = float(np.linalg.norm(vec))
+        if norm > 0:
+            vec = vec / norm
+        return vec.tolist()
+
+    @staticmethod
+    def _local_key(text: str) -> bytes:
+        """Key for the in-process cache, normalized for query phrasing"""
+        return hashlib.blake2b(
+            text.strip().lower().encode(), digest_size=16
+        ).digest()
+
+    def _get_from_local(self, text: str) -> Optional[List[float]]:
+        """Get embedding from the in-process LRU"""
+        key = self._local_key(text)
+        with self._local_cache_lock:
+            cached = self._local_cache.get(key)
+            if cached is None:
+                self._local_misses += 1
+                return None
+            self._local_cache.move_to_end(key)
+            self._local_hits += 1
+        return np.frombuffer(cached, dtype=np.float32).tolist()
+
+    def _save_to_local(self, text: str, embedding: List[float]):
+        """Save embedding to the in-process LRU as float32 bytes"""
+        key = self._local_key(text)
+        packed = np.asarray(embedding, dtype=np.float32).tobytes()
+        with self._local_cache_lock:
+            self._local_cache[key] = packed
+            while len(self._local_cache) > self._LOCAL_CACHE_MAX:
+                self._local_cache.popitem(last=False)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Hit/miss counters and size of the in-process embedding cache"""
+        with self._local_cache_lock:
+            return {
+                'local_cache_hits': self._local_hits,
+                'local_cache_misses': self._local_misses,
+                'local_cache_size': len(self._local_cache)
+            }
     
     def _get_from_cache(self, text: str) -> Optional[List[float]]:
         """Get embedding from cache"""
         if not self.cache_enabled:
             return None
-        
+
         try:
             key = self._get_cache_key(text)
             cached = self.redis_client.get(key)
             if cached:
                 logger.debug(f"Cache hit for embedding")
-                return json.loads(cached)
+                if cached[:1] == b'[':
+                    # Entry written before the float32 packing switch
+                    return json.loads(cached)
+                return np.frombuffer(cached, dtype=np.float32).tolist()
         except Exception as e:
             logger.warning(f"Cache retrieval error: {e}")
-        
+
         return None
-    
+
     def _save_to_cache(self, text: str, embedding: List[float]):
-        """Save embedding to cache"""
+        """Save embedding to cache as raw float32 bytes"""
         if not self.cache_enabled:
             return
-        
+
         try:
             key = self._get_cache_key(text)
+            # float32 bytes are ~8x smaller than the JSON text encoding
+            # and skip the parse on read (np.frombuffer is zero-copy)
             self.redis_client.setex(
                 key,
                 rag_config.cache_ttl,
-                json.dumps(embedding)
+                np.asarray(embedding, dtype=np.float32).tobytes()
             )
             logger.debug(f"Cached embedding")
         except Exception as e:
@@ -78,24 +150,30 @@ class EmbeddingsService:
         Returns:
             List of floats representing the embedding vector
         """
-        # Check cache first
+        # Check in-process cache, then Redis
+        local = self._get_from_local(text)
+        if local:
+            return local
+
         cached = self._get_from_cache(text)
         if cached:
+            self._save_to_local(text, cached)
             return cached
-        
+
         try:
             response = self.client.embeddings.create(
                 model=self.model,
                 input=text
             )
-            embedding = response.data[0].embedding
-            
+            embedding = self._normalize(response.data[0].embedding)
+
             # Cache the result
             self._save_to_cache(text, embedding)
-            
+            self._save_to_local(text, embedding)
+
             logger.debug(f"Generated embedding for text of length {len(text)}")
             return embedding
-            
+
         except Exception as e:
             logger.error(f"Error generating embedding: {e}")
             raise
@@ -110,21 +188,27 @@ class EmbeddingsService:
         Returns:
             List of floats representing the embedding vector
         """
-        # Check cache first
+        # Check in-process cache, then Redis
+        local = self._get_from_local(text)
+        if local:
+            return local
+
         cached = self._get_from_cache(text)
         if cached:
+            self._save_to_local(text, cached)
             return cached
-        
+
         try:
             response = await self.async_client.embeddings.create(
                 model=self.model,
                 input=text
             )
-            embedding = response.data[0].embedding
-            
+            embedding = self._normalize(response.data[0].embedding)
+
             # Cache the result
             self._save_to_cache(text, embedding)
-            
+            self._save_to_local(text, embedding)
+
             logger.debug(f"Generated embedding (async) for text of length {len(text)}")
             return embedding
             
@@ -151,7 +235,7 @@ class EmbeddingsService:
                 input=texts
             )
             
-            embeddings = [item.embedding for item in response.data]
+            embeddings = [self._normalize(item.embedding) for item in response.data]
             
             # Cache individual embeddings
             for text, embedding in zip(texts, embeddings):
@@ -183,7 +267,7 @@ class EmbeddingsService:
                 input=texts
             )
             
-            embeddings = [item.embedding for item in response.data]
+            embeddings = [self._normalize(item.embedding) for item in response.data]
             
             # Cache individual embeddings
             for text, embedding in zip(texts, embeddings):
@@ -0,0 +1,118 @@
+"""Local FastEmbed (ONNX Runtime) embeddings service"""
+
+import functools
+import logging
+from typing import List
+
+logger = logging.getLogger(__name__)
+
+
+class FastEmbedEmbeddingsService:
+    """
+    CPU-local dense embeddings via FastEmbed.
+
+    Drop-in alternative to the API-backed services for deployments that
+    want zero per-query embedding cost: ONNX Runtime runs quantized
+    kernels with AVX2/AVX-512 and mmaps the model, so it is 2-4x faster
+    than fp32 PyTorch on CPU with a fraction of the memory.
+
+    Select with AI_PROVIDER=fastembed. VECTOR_SIZE must match the model
+    dimension (384 for the default bge-small) and the collection must be
+    (re)ingested with the same model — embedding spaces are not
+    interchangeable across providers.
+    """
+
+    def __init__(self, model_name: str = "BAAI/bge-small-en-v1.5"):
+        self.model_name = model_name
+        self.model = None
+        self._initialized = False
+
+        # Lazy initialization
+        try:
+            self._init_model()
+            self._initialized = True
+        except Exception as e:
+            logger.warning(f"FastEmbed not available at startup: {e}")
+            logger.warning("Dense embeddings will be initialized on first use")
+
+    def _init_model(self):
+        try:
+            from fastembed import TextEmbedding
+            logger.info(f"Initializing FastEmbed dense model: {self.model_name}")
+            self.model = TextEmbedding(model_name=self.model_name, threads=None)
+            logger.info(f"✅ FastEmbed dense model loaded")
+        except ImportError:
+            logger.error("fastembed library not installed! Run: pip install fastembed")
+            raise
+        except Exception as e:
+            logger.error(f"Failed to load fastembed dense model: {e}")
+            raise
+
+    def _ensure_initialized(self):
+        if not self._initialized or self.model is None:
+            self._init_model()
+            self._initialized = True
+
+    def generate_embedding(self, text: str) -> List[float]:
+        """Generate embedding for a single text"""
+        return self.generate_embeddings_batch([text])[0]
+
+    async def generate_embedding_async(self, text: str) -> List[float]:
+        """Generate embedding for a single text (async interface parity)"""
+        # ONNX inference is CPU-bound and fast for single queries; no
+        # network wait to overlap, so the sync path is called directly
+        return self.generate_embedding(text)
+
+    def generate_embeddings_batch(self, texts: List[str]) -> List[List[float]]:
+        """
+        Generate embeddings for multiple texts in batch
+
+        Args:
+            texts: List of texts to embed
+
+        Returns:
+            List of embedding vectors
+        """
+        if not texts:
+            return []
+
+        self._ensure_initialized()
+
+        try:
+            # Sort by approximate token length so each internal batch pads
+            # to similar-length neighbours instead of the longest text in a
+            # mixed batch, then undo the permutation on the way out
+            order = sorted(range(len(texts)), key=lambda i: len(texts[i].split()))
+            sorted_texts = [texts[i] for i in order]
+
+            sorted_embeddings = [
+                emb.tolist()
+                for emb in self.model.embed(sorted_texts, batch_size=256, parallel=0)
+            ]
+
+            embeddings: List[List[float]] = [None] * len(texts)
+            for pos, i in enumerate(order):
+                embeddings[i] = sorted_embeddings[pos]
+
+            logger.info(f"Generated {len(embeddings)} embeddings in batch (fastembed)")
+            return embeddings
+        except Exception as e:
+            logger.error(f"Error generating fastembed embeddings: {e}")
+            raise
+
+    async def generate_embeddings_batch_async(self, texts: List[str]) -> List[List[float]]:
+        """Generate embeddings for multiple texts in batch (async interface parity)"""
+        return self.generate_embeddings_batch(texts)
+
+
+@functools.cache
+def get_fastembed_embeddings_service() -> FastEmbedEmbeddingsService:
+    """Get the process-wide FastEmbed service, constructing it on first use"""
+    return FastEmbedEmbeddingsService()
+
+
+def __getattr__(name: str):
+    # Keep `fastembed_embeddings_service` importable lazily
+    if name == "fastembed_embeddings_service":
+        return get_fastembed_embeddings_service()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
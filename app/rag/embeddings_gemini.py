@@ -3,6 +3,7 @@
 from typing import List, Optional
 from google import genai
 from google.genai import types
+import numpy as np
 import redis
 import json
 import hashlib
@@ -53,6 +54,21 @@ class GeminiEmbeddingsService:
     def _get_cache_key(self, text: str) -> str:
         """Generate cache key for text"""
         return f"emb:gemini:{hashlib.md5(text.encode()).hexdigest()}"
+
+    @staticmethod
+    def _normalize(embedding) -> List[float]:
+        """
+        L2-normalize an embedding to unit length.
+
+        Vectors are normalized once at generation so the collection can
+        use DOT distance, which ranks identically to cosine on unit
+        vectors without the per-comparison normalization inside Qdrant.
+        """
+        vec = np.asarray(embedding, dtype=np.float32)
+        norm = float(np.linalg.norm(vec))
+        if norm > 0:
+            vec = vec / norm
+        return vec.tolist()
     
     def _get_from_cache(self, text: str) -> Optional[List[float]]:
         """Get embedding from cache"""
@@ -63,23 +79,26 @@ class GeminiEmbeddingsService:
             key = self._get_cache_key(text)
             cached = self.redis_client.get(key)
             if cached:
-                return json.loads(cached)
+                if cached[:1] == b'[':
+                    # Entry written before the float32 packing switch
+                    return json.loads(cached)
+                return np.frombuffer(cached, dtype=np.float32).tolist()
         except Exception as e:
             logger.warning(f"Cache retrieval error: {e}")
-        
+
         return None
-    
+
     def _save_to_cache(self, text: str, embedding: List[float]):
-        """Save embedding to cache"""
+        """Save embedding to cache as raw float32 bytes"""
         if not self.cache_enabled:
             return
-        
+
         try:
             key = self._get_cache_key(text)
             self.redis_client.setex(
                 key,
                 rag_config.cache_ttl,
-                json.dumps(embedding)
+                np.asarray(embedding, dtype=np.float32).tobytes()
             )
         except Exception as e:
             logger.warning(f"Cache save error: {e}")
@@ -103,8 +122,8 @@ class GeminiEmbeddingsService:
                 model=self.model_name,
                 contents=text,
             )
-            embedding = response.embeddings[0].values
-            
+            embedding = self._normalize(response.embeddings[0].values)
+
             self._save_to_cache(text, embedding)
             return embedding
             
@@ -164,7 +183,7 @@ class GeminiEmbeddingsService:
                             )
                             # Extact values from the list of embeddings returned
                             for emb in response.embeddings:
-                                batch_embeddings.append(emb.values)
+                                batch_embeddings.append(self._normalize(emb.values))
                             break
                         except Exception as retry_err:
                             if "429" in str(retry_err) or "Resource exhausted" in str(retry_err):
@@ -0,0 +1 @@
+"""Evaluation support utilities for the RAG system"""
@@ -0,0 +1,239 @@
+"""Persistence and reporting for RAG evaluation runs"""
+
+import logging
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List
+
+import orjson
+
+logger = logging.getLogger(__name__)
+
+_RULE = "=" * 70
+_THIN_RULE = "-" * 70
+
+
+class EvaluationReporter:
+    """
+    Saves, loads and lists evaluation run results on disk.
+
+    Per-sample scores are streamed to a `<run>.partial.jsonl` file as the
+    run progresses, so partial progress survives a crash and peak memory
+    stays O(1) regardless of dataset size. Aggregated results are written
+    as `<run>.json` when the run completes.
+    """
+
+    def __init__(self, results_dir: str = "evaluation_data/results"):
+        self.results_dir = Path(results_dir)
+        self.results_dir.mkdir(parents=True, exist_ok=True)
+
+    def _partial_path(self, run_name: str) -> Path:
+        return self.results_dir / f"{run_name}.partial.jsonl"
+
+    def _samples_path(self, run_name: str) -> Path:
+        return self.results_dir / f"{run_name}.samples.jsonl"
+
+    def _results_path(self, run_name: str) -> Path:
+        return self.results_dir / f"{run_name}.json"
+
+    @property
+    def _index_path(self) -> Path:
+        return self.results_dir / "_index.jsonl"
+
+    def _append_index(self, entry: Dict[str, Any]) -> None:
+        with open(self._index_path, 'ab') as f:
+            f.write(orjson.dumps(entry) + b"\n")
+
+    def append_partial(self, run_name: str, record: Dict[str, Any]) -> None:
+        """Append one scored sample to the run's partial JSONL file"""
+        with open(self._partial_path(run_name), 'ab') as f:
+            f.write(orjson.dumps(record, default=str) + b"\n")
+
+    def finalize_run(self, run_name: str, results: Dict[str, Any]) -> str:
+        """
+        Mark a streamed run as complete: the partial JSONL becomes the
+        durable per-sample file and the aggregated results are saved.
+        """
+        partial = self._partial_path(run_name)
+        if partial.exists():
+            partial.rename(self._samples_path(run_name))
+        return self.save_results(results, run_name)
+
+    def save_results(self, results: Dict[str, Any], run_name: str) -> str:
+        """Save aggregated results to `<run>.json`, returning the file path"""
+        results_with_meta = {
+            'run_name': run_name,
+            'timestamp': datetime.now().isoformat(),
+            **results
+        }
+        file_path = self._results_path(run_name)
+        with open(file_path, 'wb') as f:
+            f.write(orjson.dumps(results_with_meta, option=orjson.OPT_INDENT_2, default=str))
+        self._append_index({
+            'run_name': run_name,
+            'timestamp': results_with_meta['timestamp'],
+            'file_path': str(file_path)
+        })
+        logger.info(f"Evaluation results saved to {file_path}")
+        return str(file_path)
+
+    def save_results_df(self, df, results: Dict[str, Any], run_name: str) -> str:
+        """
+        Save a run whose per-sample scores are already in a DataFrame
+        (e.g. ragas result.to_pandas()).
+
+        The per-sample rows are written straight to the samples JSONL with
+        a single df.to_json call, skipping the row-by-row
+        df.to_dict('records') materialization; the aggregated results go
+        through save_results as usual.
+        """
+        df.to_json(self._samples_path(run_name), orient='records',
+                   lines=True, force_ascii=False)
+        return self.save_results(results, run_name)
+
+    def load_results(self, run_name: str) -> Dict[str, Any]:
+        """Load aggregated results for a run"""
+        with open(self._results_path(run_name), 'rb') as f:
+            return orjson.loads(f.read())
+
+    def load_samples(self, run_name: str) -> List[Dict[str, Any]]:
+        """Load the per-sample records for a run (partial or finalized)"""
+        path = self._samples_path(run_name)
+        if not path.exists():
+            path = self._partial_path(run_name)
+        records = []
+        with open(path, 'rb') as f:
+            for line in f:
+                if line.strip():
+                    records.append(orjson.loads(line))
+        return records
+
+    def generate_summary_report(self, run_name: str) -> str:
+        """
+        Render a plain-text summary of a run's aggregated metrics.
+
+        The aggregated dict keys are '<metric>_<stat>'; they are parsed in
+        one linear pass with rpartition into a dict-of-dicts instead of
+        per-stat startswith scans over the whole key set.
+        """
+        results = self.load_results(run_name)
+        aggregated = results.get('aggregated', {})
+
+        metrics: Dict[str, Dict[str, Any]] = {}
+        for key, value in aggregated.items():
+            name, _, stat = key.rpartition('_')
+            metrics.setdefault(name, {})[stat] = value
+
+        lines = [
+            _RULE,
+            f"EVALUATION SUMMARY: {run_name}",
+            f"Timestamp:   {results.get('timestamp', '-')}",
+            f"Samples:     {results.get('num_samples', '-')}",
+            _THIN_RULE,
+        ]
+        for name, stats in metrics.items():
+            stat_str = "  ".join(
+                f"{stat}={value:.4f}" if isinstance(value, float) else f"{stat}={value}"
+                for stat, value in stats.items()
+            )
+            lines.append(f"{name:<24} {stat_str}")
+        lines.append(_RULE)
+        return "\n".join(lines)
+
+    def compare_runs(self, run_name_1: str, run_name_2: str) -> Dict[str, Any]:
+        """
+        Compare the mean metrics of two runs.
+
+        The shared '_mean' keys are stacked into two numpy arrays and the
+        absolute/percent differences come out of one vectorized operation
+        instead of per-key Python arithmetic.
+        """
+        import numpy as np
+
+        agg1 = self.load_results(run_name_1).get('aggregated', {})
+        agg2 = self.load_results(run_name_2).get('aggregated', {})
+
+        keys = sorted(k for k in agg1 if k.endswith('_mean') and k in agg2)
+        a1 = np.fromiter((agg1[k] for k in keys), dtype=np.float64, count=len(keys))
+        a2 = np.fromiter((agg2[k] for k in keys), dtype=np.float64, count=len(keys))
+        diff = a2 - a1
+        with np.errstate(divide='ignore', invalid='ignore'):
+            pct = np.where(a1 != 0, diff / a1 * 100.0, 0.0)
+
+        return {
+            'run_1': run_name_1,
+            'run_2': run_name_2,
+            'metrics': {
+                key: {
+                    'run_1': float(v1),
+                    'run_2': float(v2),
+                    'diff': float(d),
+                    'pct_change': float(p),
+                    'improved': bool(d > 0)
+                }
+                for key, v1, v2, d, p in zip(keys, a1, a2, diff, pct)
+            }
+        }
+
+    def export_to_csv(self, run_name: str, output_path: str) -> str:
+        """
+        Export a run's per-sample records to CSV.
+
+        Uses csv.writer with a fieldname order computed once and a large
+        write buffer, instead of csv.DictWriter's per-row dict translation.
+        """
+        import csv
+
+        per_sample = self.load_samples(run_name)
+        if not per_sample:
+            raise ValueError(f"No per-sample records found for run '{run_name}'")
+
+        fieldnames = list(per_sample[0].keys())
+        with open(output_path, 'w', encoding='utf-8', newline='',
+                  buffering=1 << 20) as f:
+            writer = csv.writer(f)
+            writer.writerow(fieldnames)
+            writer.writerows(
+                [r.get(k) for k in fieldnames] for r in per_sample
+            )
+        logger.info(f"Exported {len(per_sample)} samples to {output_path}")
+        return output_path
+
+    def list_runs(self) -> List[Dict[str, Any]]:
+        """
+        List completed runs with their name, timestamp and file path.
+
+        Reads only the sidecar `_index.jsonl` maintained by save_results
+        instead of parsing every (potentially large) results file. If the
+        index is missing it is rebuilt from a full directory scan.
+        """
+        if not self._index_path.exists():
+            return self._rebuild_index()
+
+        runs = []
+        with open(self._index_path, 'rb') as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                entry = orjson.loads(line)
+                if Path(entry['file_path']).exists():
+                    runs.append(entry)
+        return runs
+
+    def _rebuild_index(self) -> List[Dict[str, Any]]:
+        """Rebuild the sidecar index by scanning every results file"""
+        runs = []
+        for file_path in sorted(self.results_dir.glob("*.json")):
+            try:
+                with open(file_path, 'rb') as f:
+                    data = orjson.loads(f.read())
+                runs.append({
+                    'run_name': data.get('run_name', file_path.stem),
+                    'timestamp': data.get('timestamp'),
+                    'file_path': str(file_path)
+                })
+            except (orjson.JSONDecodeError, OSError) as e:
+                logger.warning(f"Skipping unreadable results file {file_path}: {e}")
+        for entry in runs:
+            self._append_index(entry)
+        return runs
@@ -0,0 +1,76 @@
+"""Disk-backed memoization of per-sample evaluation metric scores"""
+
+import hashlib
+import logging
+import sqlite3
+import time
+from pathlib import Path
+from typing import List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class SQLiteScoreCache:
+    """
+    SQLite-backed cache for per-sample metric scores.
+
+    Keyed by sha256(metric_name|model|question|answer|sorted(contexts)|ground_truth)
+    so re-runs of the same or overlapping evaluation dataset become lookups
+    instead of metric recomputation (or judge-LLM calls for LLM-based metrics).
+    The model name is part of the key, so switching evaluation models
+    invalidates old entries naturally.
+    """
+
+    def __init__(self, db_path: str = "evaluation_data/score_cache.db"):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.db_path))
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS scores (key TEXT PRIMARY KEY, score REAL, ts INT)"
+        )
+        self._conn.commit()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(
+        metric_name: str,
+        model: str,
+        question: str,
+        answer: str,
+        contexts: Optional[List[str]] = None,
+        ground_truth: str = ""
+    ) -> str:
+        """Build the content-hash cache key for one (sample, metric) pair"""
+        parts = "|".join([
+            metric_name,
+            model,
+            question or "",
+            answer or "",
+            "|".join(sorted(contexts or [])),
+            ground_truth or ""
+        ])
+        return hashlib.sha256(parts.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[float]:
+        """Return cached score for key, or None on miss"""
+        row = self._conn.execute(
+            "SELECT score FROM scores WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return row[0]
+
+    def set(self, key: str, score: float) -> None:
+        """Store score for key (overwrites existing entry)"""
+        self._conn.execute(
+            "INSERT OR REPLACE INTO scores (key, score, ts) VALUES (?, ?, ?)",
+            (key, float(score), int(time.time()))
+        )
+        self._conn.commit()
+
+    def close(self) -> None:
+        """Close the underlying SQLite connection"""
+        self._conn.close()
@@ -1,63 +1,78 @@
 """Factory for AI service providers"""
 
+import importlib
 import logging
+import threading
 from typing import Any
 from app.rag.config import rag_config
 
 logger = logging.getLogger(__name__)
 
+# Provider registries: provider name -> (module path, attribute).
+# Adding a provider is one entry here instead of a new if/else branch
+# in every getter; modules stay lazily imported.
+_EMBEDDINGS_REGISTRY = {
+    "gemini": ("app.rag.embeddings_gemini", "gemini_embeddings_service"),
+    "openai": ("app.rag.embeddings", "embeddings_service"),
+    # CPU-local ONNX embeddings (no API cost); VECTOR_SIZE must match
+    "fastembed": ("app.rag.embeddings_fastembed", "fastembed_embeddings_service"),
+}
+
+_GENERATOR_REGISTRY = {
+    "gemini": ("app.rag.generator_gemini", "gemini_generator"),
+    "openai": ("app.rag.generator", "generator"),
+}
+
+
+def _load_from_registry(registry: dict, provider: str) -> Any:
+    """Import and return the registered service for a provider"""
+    module_path, attr = registry.get(provider, registry["openai"])
+    logger.debug(f"Loading {attr} from {module_path}...")
+    return getattr(importlib.import_module(module_path), attr)
+
 
 class AIServiceFactory:
     """Factory to get the correct AI service based on configuration"""
-    
+
     _embeddings_service = None
     _generator_service = None
     _provider_logged = False
-    
+    # Guards the lazy provider imports: without it two concurrent first
+    # requests can both run the heavy module import/init
+    _lock = threading.Lock()
+
+    @classmethod
+    def _log_provider_once(cls, provider: str) -> None:
+        if not cls._provider_logged:
+            logger.info(f"🚀 AI Provider: {provider.upper()}")
+            cls._provider_logged = True
+
     @classmethod
     def get_embeddings_service(cls) -> Any:
         """Get embeddings service based on AI_PROVIDER"""
         if cls._embeddings_service is None:
-            provider = rag_config.ai_provider.lower()
-            
-            if not cls._provider_logged:
-                logger.info(f"🚀 AI Provider: {provider.upper()}")
-                cls._provider_logged = True
-            
-            if provider == "gemini":
-                logger.info("Loading Gemini embeddings service...")
-                from app.rag.embeddings_gemini import gemini_embeddings_service
-                cls._embeddings_service = gemini_embeddings_service
-                logger.info("✅ Gemini embeddings service loaded")
-            else:
-                logger.info("Loading OpenAI embeddings service...")
-                from app.rag.embeddings import embeddings_service
-                cls._embeddings_service = embeddings_service
-                logger.info("✅ OpenAI embeddings service loaded")
-        
+            with cls._lock:
+                if cls._embeddings_service is None:
+                    provider = rag_config.ai_provider.lower()
+                    cls._log_provider_once(provider)
+                    cls._embeddings_service = _load_from_registry(
+                        _EMBEDDINGS_REGISTRY, provider
+                    )
+
         return cls._embeddings_service
-    
+
     @classmethod
     def get_generator_service(cls) -> Any:
         """Get generator service based on AI_PROVIDER"""
         if cls._generator_service is None:
-            provider = rag_config.ai_provider.lower()
-            
-            if not cls._provider_logged:
-                logger.info(f"🚀 AI Provider: {provider.upper()}")
-                cls._provider_logged = True
-            
-            if provider == "gemini":
-                logger.info("Loading Gemini generator service...")
-                from app.rag.generator_gemini import gemini_generator
-                cls._generator_service = gemini_generator
-                logger.info("✅ Gemini generator service loaded")
-            else:
-                logger.info("Loading OpenAI generator service...")
-                from app.rag.generator import generator
-                cls._generator_service = generator
-                logger.info("✅ OpenAI generator service loaded")
-        
+            with cls._lock:
+                if cls._generator_service is None:
+                    provider = rag_config.ai_provider.lower()
+                    cls._log_provider_once(provider)
+                    cls._generator_service = _load_from_registry(
+                        _GENERATOR_REGISTRY, provider
+                    )
+
         return cls._generator_service
 
 
@@ -1,5 +1,9 @@
 """LLM response generator"""
 
+import functools
+import threading
+import time
+from collections import OrderedDict
 from typing import List, Dict, Any, Optional, AsyncIterator
 from openai import OpenAI, AsyncOpenAI
 import tiktoken
@@ -9,41 +13,146 @@ from app.rag.config import rag_config
 logger = logging.getLogger(__name__)
 
 
+def _encoding_name_for_model(model: str) -> str:
+    """
+    Pick the tiktoken encoding by model family prefix.
+
+    Avoids tiktoken.encoding_for_model's full model-registry lookup and
+    its KeyError path for models the registry doesn't know yet.
+    """
+    if model.startswith(("gpt-4o", "gpt-4.1", "gpt-5", "o1", "o3", "o4")):
+        return "o200k_base"
+    return "cl100k_base"
+
+
+# Process-wide encoder registry: the BPE merge table is a couple of MB and
+# takes tens of ms to load, so every Generator instance (tests, sub-
+# services) shares one Encoding per encoding name.
+_ENCODERS: Dict[str, "tiktoken.Encoding"] = {}
+_ENCODER_LOCK = threading.Lock()
+
+
+def _get_encoder(model: str) -> "tiktoken.Encoding":
+    """Get the shared tiktoken encoder for a model, loading it once"""
+    name = _encoding_name_for_model(model)
+    with _ENCODER_LOCK:
+        encoder = _ENCODERS.get(name)
+        if encoder is None:
+            encoder = _ENCODERS[name] = tiktoken.get_encoding(name)
+        return encoder
+
+
+def fast_count_tokens(text: str) -> int:
+    """
+    Estimate the token count without tokenizing.
+
+    ~3.8 chars/token is empirically tighter than the usual /4 for the
+    mixed English + Indonesian text this bot handles. Good enough for
+    logging and soft budget checks; the API's usage.prompt_tokens is the
+    authoritative count anyway.
+    """
+    return (len(text) * 1000) // 3800
+
+
 class Generator:
     """LLM-based response generator"""
-    
+
+    # Bounded exact-match cache of text -> token count. The static system
+    # prompt and repeated context chunks are re-counted on every request,
+    # so hits skip the BPE encode entirely.
+    _TOKEN_CACHE_MAX = 10_000
+
+    # Streaming chunks are coalesced before being yielded: flush when the
+    # buffer reaches this many chars or this much time has passed, so
+    # downstream consumers see one write per batch instead of one per token
+    STREAM_FLUSH_CHARS = 64
+    STREAM_FLUSH_SECS = 0.05
+
     def __init__(self):
         self.client = OpenAI(api_key=rag_config.openai_api_key)
-        self.async_client = AsyncOpenAI(api_key=rag_config.openai_api_key)
+        self.async_client = self._build_async_client()
         self.model = rag_config.llm_model
         self.max_tokens = rag_config.max_tokens
         self.temperature = rag_config.temperature
-        
-        # Token counter
+
+        # Token counter (shared process-wide, see _get_encoder)
+        self.encoding = _get_encoder(self.model)
+
+        self._token_cache: "OrderedDict[str, int]" = OrderedDict()
+        self._token_cache_lock = threading.Lock()
+        self._last_stream_text: Optional[str] = None
+
+    @staticmethod
+    def _build_async_client() -> AsyncOpenAI:
+        """
+        Build the async OpenAI client on an aiohttp transport when available.
+
+        httpx's default connection pool serializes around internal locks
+        under high concurrency, so async throughput collapses as concurrent
+        WhatsApp requests rise; the SDK's aiohttp transport does not. Fall
+        back to the default transport on older openai versions.
+        """
         try:
-            self.encoding = tiktoken.encoding_for_model(self.model)
-        except KeyError:
-            self.encoding = tiktoken.get_encoding("cl100k_base")
-    
+            from openai import DefaultAioHttpClient
+            return AsyncOpenAI(
+                api_key=rag_config.openai_api_key,
+                http_client=DefaultAioHttpClient()
+            )
+        except ImportError:
+            logger.debug("openai aiohttp transport unavailable, using default httpx client")
+            return AsyncOpenAI(api_key=rag_config.openai_api_key)
+
     def count_tokens(self, text: str) -> int:
-        """Count tokens in text"""
+        """Count tokens in text (cached by exact text match)"""
+        with self._token_cache_lock:
+            cached = self._token_cache.get(text)
+            if cached is not None:
+                self._token_cache.move_to_end(text)
+                return cached
+
         try:
-            return len(self.encoding.encode(text))
+            count = len(self.encoding.encode(text))
         except Exception as e:
             logger.warning(f"Error counting tokens: {e}")
             # Rough estimate: 1 token ≈ 4 characters
             return len(text) // 4
+
+        with self._token_cache_lock:
+            self._token_cache[text] = count
+            while len(self._token_cache) > self._TOKEN_CACHE_MAX:
+                self._token_cache.popitem(last=False)
+        return count
+
+    def clear_token_cache(self) -> None:
+        """Clear the text -> token count cache (mainly for tests)"""
+        with self._token_cache_lock:
+            self._token_cache.clear()
     
-    def count_messages_tokens(self, messages: List[Dict[str, str]]) -> int:
-        """Count tokens in message list"""
-        total = 0
-        for message in messages:
-            # Each message has overhead (role, content, etc.)
-            total += 4  # Overhead per message
-            for key, value in message.items():
-                total += self.count_tokens(str(value))
-        total += 2  # Overhead for entire request
-        return total
+    def count_messages_tokens(self, messages: List[Dict[str, str]], exact: bool = False) -> int:
+        """
+        Count tokens in message list.
+
+        By default this is a character-based estimate (fast_count_tokens):
+        the count is only logged and the API reports the authoritative
+        usage.prompt_tokens. Pass exact=True when gating against a hard
+        context window; that path tokenizes all fields in a single
+        encode_ordinary_batch call (one FFI crossing, parallel Rust BPE)
+        instead of one encode per field.
+        """
+        texts = [str(value) for message in messages for value in message.values()]
+        if not exact:
+            total = sum(fast_count_tokens(text) for text in texts)
+            return total + 4 * len(messages) + 2
+        try:
+            # tiktoken releases the GIL and parallelizes internally; let it
+            # pick the thread count rather than pinning num_threads
+            token_lists = self.encoding.encode_ordinary_batch(texts)
+            total = sum(len(tokens) for tokens in token_lists)
+        except Exception as e:
+            logger.warning(f"Error batch-counting tokens: {e}")
+            total = sum(self.count_tokens(text) for text in texts)
+        # Overhead per message (role, separators) plus per request
+        return total + 4 * len(messages) + 2
     
     def generate(
         self,
@@ -68,7 +177,7 @@ class Generator:
             
             # Count input tokens
             input_tokens = self.count_messages_tokens(messages)
-            logger.info(f"Generating response with {input_tokens} input tokens")
+            logger.info(f"Generating response with ~{input_tokens} input tokens (estimated)")
             
             response = self.client.chat.completions.create(
                 model=self.model,
@@ -120,7 +229,7 @@ class Generator:
             
             # Count input tokens
             input_tokens = self.count_messages_tokens(messages)
-            logger.info(f"Generating response (async) with {input_tokens} input tokens")
+            logger.info(f"Generating response (async) with ~{input_tokens} input tokens (estimated)")
             
             response = await self.async_client.chat.completions.create(
                 model=self.model,
@@ -171,7 +280,8 @@ class Generator:
             max_tokens = max_tokens or self.max_tokens
             
             logger.info(f"Starting streaming response generation")
-            
+
+            t0 = time.perf_counter()
             stream = await self.async_client.chat.completions.create(
                 model=self.model,
                 messages=messages,
@@ -179,17 +289,94 @@ class Generator:
                 max_tokens=max_tokens,
                 stream=True
             )
-            
+
+            buf: List[str] = []
+            buf_len = 0
+            last_flush = time.monotonic()
+            first_t: Optional[float] = None
+            n_chunks = 0
+
             async for chunk in stream:
-                if chunk.choices[0].delta.content:
-                    yield chunk.choices[0].delta.content
-            
-            logger.info(f"Streaming response completed")
+                delta = chunk.choices[0].delta.content
+                if not delta:
+                    continue
+                if first_t is None:
+                    first_t = time.perf_counter()
+                n_chunks += 1
+                buf.append(delta)
+                buf_len += len(delta)
+                now = time.monotonic()
+                if (buf_len >= self.STREAM_FLUSH_CHARS
+                        or now - last_flush > self.STREAM_FLUSH_SECS):
+                    yield ''.join(buf)
+                    buf.clear()
+                    buf_len = 0
+                    last_flush = now
+
+            if buf:
+                yield ''.join(buf)
+
+            # ttft = time to first token, tpoc = mean time per output chunk;
+            # these tell network latency apart from streaming overhead
+            if first_t is not None:
+                end = time.perf_counter()
+                logger.info(
+                    f"Streaming response completed: ttft={first_t - t0:.3f}s "
+                    f"tpoc={(end - first_t) / max(n_chunks - 1, 1):.4f}s chunks={n_chunks}"
+                )
+            else:
+                logger.info(f"Streaming response completed: no content chunks received")
             
         except Exception as e:
             logger.error(f"Error in streaming generation: {e}")
             raise
     
+    async def generate_collecting(
+        self,
+        messages: List[Dict[str, str]],
+        temperature: Optional[float] = None,
+        max_tokens: Optional[int] = None
+    ) -> AsyncIterator[str]:
+        """
+        Stream chunks while accumulating the full text in O(n).
+
+        Callers that need the complete response should iterate this and
+        then read `last_stream_text`, instead of doing `full += chunk`
+        per chunk (quadratic copying on long responses).
+        """
+        parts: List[str] = []
+        self._last_stream_text = None
+        async for chunk in self.generate_stream(messages, temperature, max_tokens):
+            parts.append(chunk)
+            yield chunk
+        self._last_stream_text = ''.join(parts)
+
+    @property
+    def last_stream_text(self) -> Optional[str]:
+        """Full text of the last generate_collecting stream, once exhausted"""
+        return self._last_stream_text
+
+    @staticmethod
+    def _split_oversized(text: str, max_length: int) -> List[str]:
+        """
+        Split a single over-long block (no usable paragraph breaks) in one
+        pass, cutting at the last newline — or space — inside the window so
+        code/log replies still fit the WhatsApp limit.
+        """
+        chunks = []
+        rest = text
+        while len(rest) > max_length:
+            cut = rest.rfind('\n', 0, max_length)
+            if cut <= max_length // 2:
+                cut = rest.rfind(' ', 0, max_length)
+            if cut <= max_length // 2:
+                cut = max_length
+            chunks.append(rest[:cut].strip())
+            rest = rest[cut:].lstrip()
+        if rest:
+            chunks.append(rest)
+        return chunks
+
     def format_for_whatsapp(self, text: str, max_length: int = 4000) -> List[str]:
         """
         Format response for WhatsApp (split if too long)
@@ -203,26 +390,50 @@ class Generator:
         """
         if len(text) <= max_length:
             return [text]
-        
-        # Split by paragraphs first
+
+        import numpy as np
+
+        # Greedy paragraph packing over a prefix-sum of paragraph lengths:
+        # each cut point is found with one searchsorted and each chunk is
+        # assembled with a single join, instead of growing a string
+        # paragraph by paragraph
         paragraphs = text.split('\n\n')
+        lens = np.fromiter(
+            (len(p) + 2 for p in paragraphs),
+            dtype=np.int64,
+            count=len(paragraphs)
+        )
+        cum = np.cumsum(lens)
+
         chunks = []
-        current_chunk = ""
-        
-        for para in paragraphs:
-            if len(current_chunk) + len(para) + 2 <= max_length:
-                current_chunk += para + "\n\n"
+        start = 0
+        offset = 0
+        while start < len(paragraphs):
+            end = int(np.searchsorted(cum, offset + max_length, side='right'))
+            if end <= start:
+                # Single paragraph longer than the limit: hard-split it at
+                # line/word boundaries instead of emitting an oversize chunk
+                chunks.extend(self._split_oversized(paragraphs[start], max_length))
+                end = start + 1
             else:
-                if current_chunk:
-                    chunks.append(current_chunk.strip())
-                current_chunk = para + "\n\n"
-        
-        if current_chunk:
-            chunks.append(current_chunk.strip())
-        
+                chunks.append('\n\n'.join(paragraphs[start:end]).strip())
+            offset = int(cum[end - 1])
+            start = end
+
         logger.info(f"Split response into {len(chunks)} chunks for WhatsApp")
         return chunks
 
 
-# Global generator instance
-generator = Generator()
+# Global generator instance, constructed lazily: importing this module no
+# longer pays OpenAI client init + tiktoken BPE table loading
+@functools.cache
+def get_generator() -> Generator:
+    """Get the process-wide Generator, constructing it on first use"""
+    return Generator()
+
+
+def __getattr__(name: str):
+    # Keep `from app.rag.generator import generator` working lazily
+    if name == "generator":
+        return get_generator()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,5 +1,8 @@
 """Google Gemini LLM generator (using google-genai SDK)"""
 
+import functools
+import threading
+import time
 from typing import List, Dict, Any, Optional, AsyncIterator
 from google import genai
 from google.genai import types
@@ -12,18 +15,60 @@ logger = logging.getLogger(__name__)
 
 class GeminiGenerator:
     """Gemini-based response generator (new google-genai SDK)"""
-    
+
+    # Streaming chunks are coalesced before being yielded: flush when the
+    # buffer reaches this many chars or this much time has passed, so
+    # downstream consumers see one write per batch instead of one per token
+    STREAM_FLUSH_CHARS = 64
+    STREAM_FLUSH_SECS = 0.05
+
+    @staticmethod
+    def _build_http_options():
+        """
+        Raise the shared HTTP client's connection-pool limits.
+
+        The genai client (built once in __init__ and reused for every call)
+        rides on httpx; the default pool caps concurrent connections and
+        lets keep-alive connections expire quickly, which reconnects/TLS
+        handshakes under load. Returns None on SDK versions without these
+        HttpOptions fields.
+        """
+        try:
+            import httpx
+            limits = httpx.Limits(
+                max_connections=256,
+                max_keepalive_connections=64,
+                keepalive_expiry=300
+            )
+            return types.HttpOptions(
+                client_args={"limits": limits},
+                async_client_args={"limits": limits},
+            )
+        except Exception as e:
+            logger.debug(f"Using default genai HTTP options: {e}")
+            return None
+
     def __init__(self):
-        # Initialize the new genai client
+        # Initialize the new genai client (built once; every generate /
+        # stream call reuses its pooled connections)
+        client_kwargs = {}
+        http_options = self._build_http_options()
+        if http_options is not None:
+            client_kwargs["http_options"] = http_options
+
         if rag_config.use_vertex_ai and rag_config.vertex_project_id:
             self.client = genai.Client(
                 vertexai=True,
                 project=rag_config.vertex_project_id,
-                location=rag_config.vertex_location
+                location=rag_config.vertex_location,
+                **client_kwargs
             )
             logger.info(f"Using Vertex AI for generation: {rag_config.vertex_project_id} in {rag_config.vertex_location}")
         else:
-            self.client = genai.Client(api_key=rag_config.google_api_key)
+            self.client = genai.Client(
+                api_key=rag_config.google_api_key,
+                **client_kwargs
+            )
             logger.info("Using Google AI Studio (API Key) for generation")
         # Model name (without "models/" prefix)
         model_name = rag_config.gemini_model
@@ -33,7 +78,15 @@ class GeminiGenerator:
         
         self.max_tokens = rag_config.gemini_max_tokens
         self.temperature = rag_config.gemini_temperature
-        
+        self._last_stream_text: Optional[str] = None
+
+        # GenerateContentConfig memoized by (system_instruction,
+        # temperature, max_tokens): the system prompt repeats across
+        # requests, so the config (and its proto validation) is built once
+        # per distinct tuple instead of per call
+        self._config_cache: Dict[tuple, types.GenerateContentConfig] = {}
+        self._config_cache_lock = threading.Lock()
+
         logger.info(f"Initializing Gemini generator with model: {self.model_name}")
     
     def count_tokens(self, text: str) -> int:
@@ -68,15 +121,59 @@ class GeminiGenerator:
                 contents.append(types.Content(role="user", parts=[types.Part.from_text(text=content)]))
             elif role == "assistant":
                 contents.append(types.Content(role="model", parts=[types.Part.from_text(text=content)]))
-        
-        config = types.GenerateContentConfig(
-            system_instruction=system_instruction,
-            temperature=temperature if temperature is not None else self.temperature,
-            max_output_tokens=max_tokens if max_tokens is not None else self.max_tokens,
+
+        config = self._get_config(
+            system_instruction,
+            temperature if temperature is not None else self.temperature,
+            max_tokens if max_tokens is not None else self.max_tokens,
         )
-        
+
         return contents, config
+
+    def _get_config(
+        self,
+        system_instruction: Optional[str],
+        temperature: float,
+        max_tokens: int
+    ) -> types.GenerateContentConfig:
+        """Get (or build and cache) the generation config for a tuple key"""
+        key = (system_instruction, temperature, max_tokens)
+        with self._config_cache_lock:
+            config = self._config_cache.get(key)
+            if config is None:
+                config = types.GenerateContentConfig(
+                    system_instruction=system_instruction,
+                    temperature=temperature,
+                    max_output_tokens=max_tokens,
+                )
+                if len(self._config_cache) >= 32:
+                    self._config_cache.pop(next(iter(self._config_cache)))
+                self._config_cache[key] = config
+        return config
     
+    @staticmethod
+    def _extract_usage(response, messages: List[Dict[str, str]], content: str):
+        """
+        Read token usage from the generation response metadata.
+
+        The counts are included in every generate_content response, so no
+        extra count_tokens RPCs are needed. When usage_metadata is missing
+        (rare), fall back to a local chars/4 estimate rather than N remote
+        count_tokens round-trips.
+        """
+        usage = response.usage_metadata
+        if usage:
+            prompt_tokens = usage.prompt_token_count or 0
+            completion_tokens = usage.candidates_token_count or 0
+            total_tokens = usage.total_token_count or 0
+        else:
+            prompt_tokens = sum(
+                len(msg.get("content", "")) for msg in messages
+            ) // 4
+            completion_tokens = len(content or "") // 4
+            total_tokens = prompt_tokens + completion_tokens
+        return prompt_tokens, completion_tokens, total_tokens
+
     def generate(
         self,
         messages: List[Dict[str, str]],
@@ -105,17 +202,12 @@ class GeminiGenerator:
             )
             
             content = response.text
-            
-            # Get token usage from response metadata
-            prompt_tokens = 0
-            completion_tokens = 0
-            total_tokens = 0
-            
-            if response.usage_metadata:
-                prompt_tokens = response.usage_metadata.prompt_token_count or 0
-                completion_tokens = response.usage_metadata.candidates_token_count or 0
-                total_tokens = response.usage_metadata.total_token_count or 0
-            
+
+            # Token usage comes back for free in the generation response;
+            # never re-count via the remote count_tokens endpoint here
+            prompt_tokens, completion_tokens, total_tokens = \
+                self._extract_usage(response, messages, content)
+
             logger.info(f"Gemini generation: {total_tokens} tokens used")
             
             return {
@@ -137,7 +229,13 @@ class GeminiGenerator:
         max_tokens: Optional[int] = None,
         **kwargs
     ) -> Dict[str, Any]:
-        """Generate response asynchronously"""
+        """
+        Generate response asynchronously.
+
+        Awaits the SDK's async client (client.aio) directly — this never
+        wraps the sync path, so concurrent callers are not serialized on
+        the event loop.
+        """
         try:
             contents, config = self._build_contents_and_config(messages, temperature, max_tokens)
             
@@ -148,16 +246,10 @@ class GeminiGenerator:
             )
             
             content = response.text
-            
-            prompt_tokens = 0
-            completion_tokens = 0
-            total_tokens = 0
-            
-            if response.usage_metadata:
-                prompt_tokens = response.usage_metadata.prompt_token_count or 0
-                completion_tokens = response.usage_metadata.candidates_token_count or 0
-                total_tokens = response.usage_metadata.total_token_count or 0
-            
+
+            prompt_tokens, completion_tokens, total_tokens = \
+                self._extract_usage(response, messages, content)
+
             return {
                 "content": content,
                 "tokens_used": total_tokens,
@@ -180,19 +272,76 @@ class GeminiGenerator:
         """Generate response as a stream"""
         try:
             contents, config = self._build_contents_and_config(messages, temperature, max_tokens)
-            
+
+            t0 = time.perf_counter()
+            buf: List[str] = []
+            buf_len = 0
+            last_flush = time.monotonic()
+            first_t: Optional[float] = None
+            n_chunks = 0
+
             async for chunk in self.client.aio.models.generate_content_stream(
                 model=self.model_name,
                 contents=contents,
                 config=config,
             ):
-                if chunk.text:
-                    yield chunk.text
-            
+                if not chunk.text:
+                    continue
+                if first_t is None:
+                    first_t = time.perf_counter()
+                n_chunks += 1
+                buf.append(chunk.text)
+                buf_len += len(chunk.text)
+                now = time.monotonic()
+                if (buf_len >= self.STREAM_FLUSH_CHARS
+                        or now - last_flush > self.STREAM_FLUSH_SECS):
+                    yield ''.join(buf)
+                    buf.clear()
+                    buf_len = 0
+                    last_flush = now
+
+            if buf:
+                yield ''.join(buf)
+
+            # ttft = time to first token, tpoc = mean time per output chunk;
+            # these tell network latency apart from streaming overhead
+            if first_t is not None:
+                end = time.perf_counter()
+                logger.info(
+                    f"Gemini stream completed: ttft={first_t - t0:.3f}s "
+                    f"tpoc={(end - first_t) / max(n_chunks - 1, 1):.4f}s chunks={n_chunks}"
+                )
+
         except Exception as e:
             logger.error(f"Gemini streaming error: {e}")
             raise
     
+    async def generate_collecting(
+        self,
+        messages: List[Dict[str, str]],
+        temperature: Optional[float] = None,
+        max_tokens: Optional[int] = None,
+        **kwargs
+    ) -> AsyncIterator[str]:
+        """
+        Stream chunks while accumulating the full text in O(n).
+
+        Callers that need the complete response should iterate this and
+        then read `last_stream_text`, instead of doing `full += chunk`
+        per chunk (quadratic copying on long responses).
+        """
+        parts: List[str] = []
+        self._last_stream_text = None
+        async for chunk in self.generate_stream(messages, temperature, max_tokens, **kwargs):
+            parts.append(chunk)
+            yield chunk
+        self._last_stream_text = ''.join(parts)
+
+    @property
+    def last_stream_text(self) -> Optional[str]:
+        """Full text of the last generate_collecting stream, once exhausted"""
+        return self._last_stream_text
+
     def format_for_whatsapp(self, text: str, max_length: int = 4096) -> List[str]:
         """
         Format response text for WhatsApp.
@@ -225,12 +374,55 @@ class GeminiGenerator:
         
         if current_message:
             messages.append(current_message.strip())
-        
-        return messages if messages else [text[:max_length]]
+
+        if not messages:
+            return [text[:max_length]]
+
+        # Hard-split any chunk still over the limit (e.g. one giant
+        # paragraph/sentence) at line or word boundaries in a single pass
+        final_messages: List[str] = []
+        for msg in messages:
+            if len(msg) <= max_length:
+                final_messages.append(msg)
+            else:
+                final_messages.extend(self._split_oversized(msg, max_length))
+        return final_messages
+
+    @staticmethod
+    def _split_oversized(text: str, max_length: int) -> List[str]:
+        """
+        Split a single over-long block (no usable paragraph breaks) in one
+        pass, cutting at the last newline — or space — inside the window so
+        code/log replies still fit the WhatsApp limit.
+        """
+        chunks = []
+        rest = text
+        while len(rest) > max_length:
+            cut = rest.rfind('\n', 0, max_length)
+            if cut <= max_length // 2:
+                cut = rest.rfind(' ', 0, max_length)
+            if cut <= max_length // 2:
+                cut = max_length
+            chunks.append(rest[:cut].strip())
+            rest = rest[cut:].lstrip()
+        if rest:
+            chunks.append(rest)
+        return chunks
+
+
+# Global Gemini generator instance, constructed lazily: importing this
+# module no longer pays genai client init (credentials, HTTP client)
+@functools.cache
+def get_gemini_generator() -> GeminiGenerator:
+    """Get the process-wide GeminiGenerator, constructing it on first use"""
+    return GeminiGenerator()
 
 
-# Global Gemini generator instance
-gemini_generator = GeminiGenerator()
+def __getattr__(name: str):
+    # Keep `from app.rag.generator_gemini import gemini_generator` working lazily
+    if name == "gemini_generator":
+        return get_gemini_generator()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 class GeminiLCELWrapper:
@@ -249,7 +441,7 @@ class GeminiLCELWrapper:
             elif isinstance(msg, AIMessage):
                 converted.append({"role": "assistant", "content": msg.content})
 
-        result = gemini_generator.generate(converted)
+        result = get_gemini_generator().generate(converted)
         return result
 
     async def ainvoke(self, messages: list) -> Dict[str, Any]:
@@ -262,5 +454,5 @@ class GeminiLCELWrapper:
             elif isinstance(msg, AIMessage):
                 converted.append({"role": "assistant", "content": msg.content})
 
-        result = await gemini_generator.generate_async(converted)
+        result = await get_gemini_generator().generate_async(converted)
         return result
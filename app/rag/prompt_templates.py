@@ -1,5 +1,7 @@
 """Prompt templates for RAG system"""
 
+import hashlib
+from collections import OrderedDict
 from typing import List, Dict
 from langchain_core.prompts import PromptTemplate
 
@@ -43,73 +45,188 @@ User Question: {query}
 Provide a helpful, friendly response."""
 
 
+# Static template segments around the dynamic placeholders. Splitting once
+# at import lets message assembly be a plain join and lets token counting
+# tokenize only the dynamic context/history instead of the full multi-KB
+# prompt on every request.
+_SYSTEM_HEAD, _rest = SYSTEM_PROMPT.split("{context}")
+_SYSTEM_MID, _SYSTEM_TAIL = _rest.split("{conversation_history}")
+_FALLBACK_HEAD, _rest = FALLBACK_PROMPT.split("{conversation_history}")
+_FALLBACK_MID, _FALLBACK_TAIL = _rest.split("{query}")
+del _rest
+
+_encoding = None
+_static_token_counts: Dict[str, int] = {}
+
+
+def _count_tokens(text: str) -> int:
+    """Tokenize with a lazily-loaded shared cl100k_base encoding"""
+    global _encoding
+    if _encoding is None:
+        import tiktoken
+        _encoding = tiktoken.get_encoding("cl100k_base")
+    return len(_encoding.encode(text))
+
+
+def _static_tokens(key: str, parts) -> int:
+    """Token count of a template's static segments, computed once"""
+    if key not in _static_token_counts:
+        _static_token_counts[key] = sum(_count_tokens(p) for p in parts)
+    return _static_token_counts[key]
+
+
 def build_system_message(context: str, conversation_history: str) -> str:
     """Build system message with context"""
-    return SYSTEM_PROMPT.format(
-        context=context,
-        conversation_history=conversation_history
+    return "".join(
+        (_SYSTEM_HEAD, context, _SYSTEM_MID, conversation_history, _SYSTEM_TAIL)
     )
 
 
+def build_system_message_with_token_count(
+    context: str,
+    conversation_history: str
+) -> (str, int):
+    """
+    Build system message and its token count in one call.
+
+    The static template segments are tokenized once per process; only the
+    dynamic context and history are tokenized per request.
+    """
+    message = build_system_message(context, conversation_history)
+    tokens = (
+        _static_tokens('system', (_SYSTEM_HEAD, _SYSTEM_MID, _SYSTEM_TAIL))
+        + _count_tokens(context)
+        + _count_tokens(conversation_history)
+    )
+    return message, tokens
+
+
 def build_fallback_message(query: str, conversation_history: str) -> str:
     """Build fallback message when no context found"""
-    return FALLBACK_PROMPT.format(
-        query=query,
-        conversation_history=conversation_history
+    return "".join(
+        (_FALLBACK_HEAD, conversation_history, _FALLBACK_MID, query, _FALLBACK_TAIL)
+    )
+
+
+def build_fallback_message_with_token_count(
+    query: str,
+    conversation_history: str
+) -> (str, int):
+    """Build fallback message and its token count in one call"""
+    message = build_fallback_message(query, conversation_history)
+    tokens = (
+        _static_tokens('fallback', (_FALLBACK_HEAD, _FALLBACK_MID, _FALLBACK_TAIL))
+        + _count_tokens(query)
+        + _count_tokens(conversation_history)
     )
+    return message, tokens
+
+
+# Memoization for the formatting helpers: repeated turns in the same
+# conversation (and retries) rebuild the formatted string from inputs
+# that rarely change between calls. The LCEL serving path shares the
+# history cache via RAGChainWithSources._format_history. Keys cover the
+# full formatted content, values the formatted strings, evicted
+# LRU-style.
+_FMT_CACHE_MAX = 512
+_history_cache: "OrderedDict[tuple, str]" = OrderedDict()
+_context_cache: "OrderedDict[tuple, str]" = OrderedDict()
+
+
+def _cache_get(cache: "OrderedDict[tuple, str]", key: tuple):
+    value = cache.get(key)
+    if value is not None:
+        cache.move_to_end(key)
+    return value
+
+
+def _cache_put(cache: "OrderedDict[tuple, str]", key: tuple, value: str) -> None:
+    cache[key] = value
+    if len(cache) > _FMT_CACHE_MAX:
+        cache.popitem(last=False)
 
 
 def format_conversation_history(messages: List[Dict[str, str]], max_messages: int = 5) -> str:
     """
     Format conversation history for prompt
-    
+
     Args:
         messages: List of message dicts with 'role' and 'content'
         max_messages: Maximum number of messages to include
-        
+
     Returns:
         Formatted conversation history string
     """
     if not messages:
         return "No previous conversation."
-    
+
     # Take last N messages
     recent_messages = messages[-max_messages:] if len(messages) > max_messages else messages
-    
+
+    # The cache is shared across conversations, so the key must cover
+    # every message that shapes the output — a cheap length + last-message
+    # fingerprint collides between users asking the same question and
+    # would serve one user's history in another's prompt
+    key = (max_messages, tuple((m['role'], m['content']) for m in recent_messages))
+    cached = _cache_get(_history_cache, key)
+    if cached is not None:
+        return cached
+
     formatted = []
     for msg in recent_messages:
         role = "User" if msg['role'] == 'user' else "Assistant"
         content = msg['content']
         formatted.append(f"{role}: {content}")
-    
-    return "\n".join(formatted)
+
+    result = "\n".join(formatted)
+    _cache_put(_history_cache, key, result)
+    return result
 
 
 def format_context(retrieved_docs: List[Dict]) -> str:
     """
     Format retrieved documents into context string
-    
+
     Args:
         retrieved_docs: List of retrieved document dicts
-        
+
     Returns:
         Formatted context string
     """
     if not retrieved_docs:
         return "No relevant information found in the knowledge base."
-    
+
+    # Content identity must be a real hash: fingerprinting by length
+    # lets same-title chunks of equal size serve the wrong context
+    key = tuple(
+        (
+            doc.get('payload', {}).get('title', 'Document'),
+            hashlib.blake2b(
+                doc.get('payload', {}).get('content', '').encode(),
+                digest_size=16
+            ).digest(),
+            round(doc.get('score', 0), 3)
+        )
+        for doc in retrieved_docs
+    )
+    cached = _cache_get(_context_cache, key)
+    if cached is not None:
+        return cached
+
     context_parts = []
     for i, doc in enumerate(retrieved_docs, 1):
         payload = doc.get('payload', {})
         title = payload.get('title', 'Document')
         content = payload.get('content', '')
         score = doc.get('score', 0)
-        
+
         context_parts.append(
             f"--- Source {i}: {title} (Relevance: {score:.2f}) ---\n{content}"
         )
-    
-    return "\n\n".join(context_parts)
+
+    result = "\n\n".join(context_parts)
+    _cache_put(_context_cache, key, result)
+    return result
 
 
 def build_messages(
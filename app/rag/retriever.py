@@ -5,6 +5,7 @@ import logging
 from app.rag.vector_store import vector_store
 from app.rag.config import rag_config
 from app.rag.factory import get_embeddings_service
+from app.rag.semantic_cache import semantic_cache
 
 logger = logging.getLogger(__name__)
 
@@ -30,29 +31,42 @@ class Retriever:
         query: str,
         top_k: Optional[int] = None,
         min_score: Optional[float] = None,
-        filters: Optional[Dict[str, Any]] = None
+        filters: Optional[Dict[str, Any]] = None,
+        category: Optional[str] = None
     ) -> List[Dict[str, Any]]:
         """
         Retrieve relevant documents for a query
-        
+
         Args:
             query: User query text
             top_k: Number of documents to retrieve (default: from config)
             min_score: Minimum relevance score (default: from config)
             filters: Optional metadata filters
-            
+            category: Convenience shorthand for filtering on the
+                category payload field (pre-filters the HNSW search)
+
         Returns:
             List of relevant documents with scores
         """
+        if category:
+            filters = {**(filters or {}), "category": category}
         try:
             # Generate query embedding
             logger.info(f"Generating embedding for query: {query[:50]}...")
             query_vector = self.embeddings.generate_embedding(query)
-            
-            # Search vector store
+
             top_k = top_k or self.top_k
             min_score = min_score or self.min_score
-            
+
+            # Serve near-duplicate queries from the semantic cache
+            # (only for unfiltered retrieval; filters change the result set)
+            if not filters:
+                cached = semantic_cache.get(query_vector, top_k, min_score)
+                if cached is not None:
+                    logger.info(f"Retrieved {len(cached)} documents from semantic cache")
+                    return cached
+
+            # Search vector store
             logger.info(f"Searching for top-{top_k} documents (min_score: {min_score})")
             results = self.vector_store.search(
                 query_vector=query_vector,
@@ -61,19 +75,67 @@ class Retriever:
                 filter_conditions=filters
             )
             
-            # Re-rank by score (already sorted by Qdrant, but explicit)
-            results = sorted(results, key=lambda x: x['score'], reverse=True)
-            
+            # Qdrant already returns results in descending score order
             logger.info(f"Retrieved {len(results)} documents")
             for i, result in enumerate(results, 1):
                 logger.debug(f"  {i}. Score: {result['score']:.3f} - {result['payload'].get('title', 'Untitled')}")
-            
+
+            if results and not filters:
+                semantic_cache.set(query_vector, results, top_k, min_score)
+
             return results
-            
+
         except Exception as e:
             logger.error(f"Error retrieving documents: {e}")
             return []
     
+    def retrieve_many(
+        self,
+        queries: List[str],
+        top_k: Optional[int] = None,
+        min_score: Optional[float] = None,
+        filters: Optional[Dict[str, Any]] = None
+    ) -> List[List[Dict[str, Any]]]:
+        """
+        Retrieve relevant documents for several queries at once.
+
+        All queries are embedded in one batched model call and searched in
+        one Qdrant round trip (search_many), instead of N embedding calls
+        plus N network RTTs.
+
+        Args:
+            queries: List of user query texts
+            top_k: Number of documents to retrieve per query
+            min_score: Minimum relevance score
+            filters: Optional metadata filters (shared by all queries)
+
+        Returns:
+            One result list per query, in input order
+        """
+        if not queries:
+            return []
+
+        try:
+            logger.info(f"Generating embeddings for {len(queries)} queries in batch")
+            query_vectors = self.embeddings.generate_embeddings_batch(queries)
+
+            top_k = top_k or self.top_k
+            min_score = min_score or self.min_score
+
+            batched_results = self.vector_store.search_many(
+                query_vectors=query_vectors,
+                limit=top_k,
+                score_threshold=min_score,
+                filter_conditions=filters
+            )
+
+            logger.info(f"Retrieved documents for {len(queries)} queries in batch")
+            return batched_results
+
+        except Exception as e:
+            logger.error(f"Error batch-retrieving documents: {e}")
+            return [[] for _ in queries]
+
     async def retrieve_async(
         self,
         query: str,
@@ -97,25 +159,35 @@ class Retriever:
             # Generate query embedding asynchronously
             logger.info(f"Generating embedding (async) for query: {query[:50]}...")
             query_vector = await self.embeddings.generate_embedding_async(query)
-            
-            # Search vector store (Qdrant client doesn't have async API, but operation is fast)
+
             top_k = top_k or self.top_k
             min_score = min_score or self.min_score
-            
+
+            # Serve near-duplicate queries from the semantic cache
+            if not filters:
+                cached = semantic_cache.get(query_vector, top_k, min_score)
+                if cached is not None:
+                    logger.info(f"Retrieved {len(cached)} documents from semantic cache (async)")
+                    return cached
+
+            # Search vector store without blocking the event loop
+
             logger.info(f"Searching for top-{top_k} documents (min_score: {min_score})")
-            results = self.vector_store.search(
+            results = await self.vector_store.search_async(
                 query_vector=query_vector,
                 limit=top_k,
                 score_threshold=min_score,
                 filter_conditions=filters
             )
             
-            # Re-rank by score
-            results = sorted(results, key=lambda x: x['score'], reverse=True)
-            
+            # Qdrant already returns results in descending score order
             logger.info(f"Retrieved {len(results)} documents (async)")
+
+            if results and not filters:
+                semantic_cache.set(query_vector, results, top_k, min_score)
+
             return results
-            
+
         except Exception as e:
             logger.error(f"Error retrieving documents (async): {e}")
             return []
@@ -132,19 +204,14 @@ class Retriever:
         """
         if not results:
             return "No relevant information found."
-        
-        context_parts = []
-        for i, result in enumerate(results, 1):
-            payload = result['payload']
-            title = payload.get('title', 'Document')
-            content = payload.get('content', '')
-            score = result['score']
-            
-            context_parts.append(
-                f"[Source {i}] {title} (Relevance: {score:.2f})\n{content}"
-            )
-        
-        return "\n\n".join(context_parts)
+
+        # Single join over a generator: no intermediate list of parts
+        return "\n\n".join(
+            f"[Source {i}] {payload.get('title', 'Document')} "
+            f"(Relevance: {result['score']:.2f})\n{payload.get('content', '')}"
+            for i, result in enumerate(results, 1)
+            for payload in (result['payload'],)
+        )
     
     def get_sources_metadata(self, results: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         """
@@ -218,6 +285,14 @@ class LCELRetriever:
         self.top_k = top_k
         self.min_score = min_score
 
+    def _cache_usable(self, filters: Optional[Dict[str, Any]]) -> bool:
+        """
+        Whether the semantic cache applies: filters change the result
+        set, and hybrid (dense + sparse) results are not reproducible
+        from the dense query vector the cache is keyed on.
+        """
+        return not filters and not getattr(rag_config, 'RAG_HYBRID_SEARCH', False)
+
     def retrieve(
         self,
         query: str,
@@ -227,7 +302,14 @@ class LCELRetriever:
         embeddings_svc = get_embeddings_service()
 
         query_vector = embeddings_svc.generate_embedding(query)
-        
+
+        # Serve near-duplicate queries from the semantic cache
+        if self._cache_usable(filters):
+            cached = semantic_cache.get(query_vector, self.top_k, self.min_score)
+            if cached is not None:
+                logger.info(f"[LCELRetriever] Retrieved {len(cached)} documents from semantic cache")
+                return [qdrant_result_to_document(r) for r in cached]
+
         sparse_query_vector = None
         if getattr(rag_config, 'RAG_HYBRID_SEARCH', False):
             try:
@@ -236,7 +318,7 @@ class LCELRetriever:
                 sparse_query_vector = sparse_embedder.generate_sparse_embedding(query)
             except Exception as e:
                 logger.error(f"Failed to generate sparse query embedding: {e}")
-                
+
         raw_results = vector_store.search(
             query_vector=query_vector,
             limit=self.top_k,
@@ -245,6 +327,9 @@ class LCELRetriever:
             sparse_query_vector=sparse_query_vector
         )
 
+        if raw_results and self._cache_usable(filters):
+            semantic_cache.set(query_vector, raw_results, self.top_k, self.min_score)
+
         docs = [qdrant_result_to_document(r) for r in raw_results]
         logger.info(f"[LCELRetriever] Retrieved {len(docs)} documents")
         return docs
@@ -253,10 +338,21 @@ class LCELRetriever:
         self,
         query: str,
         filters: Optional[Dict[str, Any]] = None,
+        query_vector: Optional[List[float]] = None,
     ) -> List[Document]:
-        embeddings_svc = get_embeddings_service()
-        query_vector = await embeddings_svc.generate_embedding_async(query)
-        
+        # Callers that already embedded the query (e.g. for the semantic
+        # response cache) pass the vector in to avoid a second model call
+        if query_vector is None:
+            embeddings_svc = get_embeddings_service()
+            query_vector = await embeddings_svc.generate_embedding_async(query)
+
+        # Serve near-duplicate queries from the semantic cache
+        if self._cache_usable(filters):
+            cached = semantic_cache.get(query_vector, self.top_k, self.min_score)
+            if cached is not None:
+                logger.info(f"[LCELRetriever] Retrieved {len(cached)} documents from semantic cache (async)")
+                return [qdrant_result_to_document(r) for r in cached]
+
         sparse_query_vector = None
         if getattr(rag_config, 'RAG_HYBRID_SEARCH', False):
             try:
@@ -266,14 +362,27 @@ class LCELRetriever:
                 sparse_query_vector = sparse_embedder.generate_sparse_embedding(query)
             except Exception as e:
                 logger.error(f"Failed to generate sparse query embedding async: {e}")
-                
-        raw_results = vector_store.search(
-            query_vector=query_vector,
-            limit=self.top_k,
-            score_threshold=self.min_score,
-            filter_conditions=filters,
-            sparse_query_vector=sparse_query_vector
-        )
+
+        if sparse_query_vector is None:
+            raw_results = await vector_store.search_async(
+                query_vector=query_vector,
+                limit=self.top_k,
+                score_threshold=self.min_score,
+                filter_conditions=filters
+            )
+        else:
+            # Hybrid (dense + sparse RRF) search is sync-client only
+            raw_results = vector_store.search(
+                query_vector=query_vector,
+                limit=self.top_k,
+                score_threshold=self.min_score,
+                filter_conditions=filters,
+                sparse_query_vector=sparse_query_vector
+            )
+
+        if raw_results and self._cache_usable(filters):
+            semantic_cache.set(query_vector, raw_results, self.top_k, self.min_score)
+
         docs = [qdrant_result_to_document(r) for r in raw_results]
         logger.info(f"[LCELRetriever] Retrieved {len(docs)} documents (async)")
         return docs
@@ -0,0 +1,261 @@
+"""Redis-backed semantic cache for retrieval results"""
+
+import hashlib
+import logging
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import orjson
+import redis
+
+from app.rag.config import rag_config
+
+logger = logging.getLogger(__name__)
+
+
+class SemanticCache:
+    """
+    Near-duplicate query cache in front of the retrieval pipeline.
+
+    Stores (query embedding, serialized results) in Redis hashes indexed
+    by a RediSearch vector index. A lookup runs one KNN-1 search; if the
+    nearest cached query is within `similarity_threshold` cosine
+    similarity, its results are served without touching Qdrant. Requires
+    Redis Stack (RediSearch with vector support); if the index cannot be
+    created the cache disables itself and every lookup is a miss.
+    """
+
+    INDEX_NAME = "idx:semantic_cache"
+    KEY_PREFIX = "semcache:"
+
+    # Full-response cache: a stricter threshold than the retrieval cache,
+    # since a hit skips the LLM entirely, not just the Qdrant search
+    RESPONSE_INDEX_NAME = "idx:semantic_response_cache"
+    RESPONSE_KEY_PREFIX = "semresp:"
+
+    def __init__(
+        self,
+        similarity_threshold: float = 0.97,
+        response_similarity_threshold: float = 0.98
+    ):
+        self.similarity_threshold = similarity_threshold
+        self.response_similarity_threshold = response_similarity_threshold
+        self.ttl = rag_config.cache_ttl
+        self.enabled = rag_config.enable_cache
+        self.redis_client = None
+        self._hits = 0
+        self._misses = 0
+        self._response_hits = 0
+        self._response_misses = 0
+
+        if self.enabled:
+            try:
+                self.redis_client = redis.from_url(
+                    rag_config.redis_url,
+                    decode_responses=False
+                )
+                self._ensure_index(self.INDEX_NAME, self.KEY_PREFIX)
+                self._ensure_index(self.RESPONSE_INDEX_NAME, self.RESPONSE_KEY_PREFIX)
+                logger.info("Semantic cache enabled for retrieval results and responses")
+            except Exception as e:
+                logger.warning(f"Semantic cache unavailable (RediSearch required): {e}")
+                self.enabled = False
+
+    def _ensure_index(self, index_name: str, key_prefix: str):
+        """Create a RediSearch vector index if it doesn't exist"""
+        from redis.commands.search.field import TextField, VectorField
+        from redis.commands.search.indexDefinition import IndexDefinition, IndexType
+
+        try:
+            self.redis_client.ft(index_name).info()
+            return
+        except redis.ResponseError:
+            pass
+
+        self.redis_client.ft(index_name).create_index(
+            fields=[
+                VectorField(
+                    "query_vec",
+                    "FLAT",
+                    {
+                        "TYPE": "FLOAT32",
+                        "DIM": rag_config.vector_size,
+                        "DISTANCE_METRIC": "COSINE"
+                    }
+                ),
+                TextField("results")
+            ],
+            definition=IndexDefinition(
+                prefix=[key_prefix],
+                index_type=IndexType.HASH
+            )
+        )
+        logger.info(f"Created semantic cache index: {index_name}")
+
+    def _knn_lookup(self, index_name: str, query_vector: List[float]) -> Optional[tuple]:
+        """KNN-1 search; returns (similarity, raw results bytes) or None"""
+        from redis.commands.search.query import Query
+
+        query = (
+            Query("*=>[KNN 1 @query_vec $vec AS dist]")
+            .sort_by("dist")
+            .return_fields("dist", "results")
+            .dialect(2)
+        )
+        packed = np.asarray(query_vector, dtype=np.float32).tobytes()
+        res = self.redis_client.ft(index_name).search(
+            query, query_params={"vec": packed}
+        )
+        if not res.docs:
+            return None
+        # RediSearch reports cosine *distance*: similarity = 1 - dist
+        return 1.0 - float(res.docs[0].dist), res.docs[0].results
+
+    def _store(self, key_prefix: str, query_vector: List[float], results: Any):
+        """Store a query embedding and serialized payload with TTL"""
+        packed = np.asarray(query_vector, dtype=np.float32).tobytes()
+        key = key_prefix + hashlib.blake2b(packed, digest_size=16).hexdigest()
+        pipe = self.redis_client.pipeline()
+        pipe.hset(key, mapping={
+            "query_vec": packed,
+            "results": orjson.dumps(results, default=str)
+        })
+        pipe.expire(key, self.ttl)
+        pipe.execute()
+
+    def get(
+        self,
+        query_vector: List[float],
+        top_k: Optional[int] = None,
+        min_score: Optional[float] = None
+    ) -> Optional[List[Dict[str, Any]]]:
+        """
+        Look up cached results for the nearest stored query.
+
+        Returns the cached result list if its query is within the
+        similarity threshold and the entry was stored with parameters at
+        least as broad as the caller's (its top_k no smaller, its
+        min_score no higher), trimmed down to the requested
+        top_k/min_score. Else None.
+        """
+        if not self.enabled:
+            return None
+
+        try:
+            found = self._knn_lookup(self.INDEX_NAME, query_vector)
+            if found:
+                similarity, raw = found
+                if similarity >= self.similarity_threshold:
+                    entry = orjson.loads(raw)
+                    if isinstance(entry, list):
+                        # Pre-envelope entry with unknown search params:
+                        # treat as a miss and let the TTL retire it
+                        self._misses += 1
+                        return None
+                    results = entry["results"]
+                    stored_top_k = entry.get("top_k")
+                    stored_min_score = entry.get("min_score")
+                    # The entry must cover the request: a narrower stored
+                    # search could be missing results the caller asked for
+                    if top_k is not None and (
+                        stored_top_k is None or stored_top_k < top_k
+                    ):
+                        self._misses += 1
+                        return None
+                    if min_score is not None and (
+                        stored_min_score is None or stored_min_score > min_score
+                    ):
+                        self._misses += 1
+                        return None
+                    if min_score is not None:
+                        results = [r for r in results if r["score"] >= min_score]
+                    if top_k is not None:
+                        results = results[:top_k]
+                    self._hits += 1
+                    logger.debug(f"Semantic cache hit (similarity: {similarity:.4f})")
+                    return results
+
+            self._misses += 1
+            return None
+
+        except Exception as e:
+            logger.warning(f"Semantic cache lookup error: {e}")
+            self._misses += 1
+            return None
+
+    def set(
+        self,
+        query_vector: List[float],
+        results: List[Dict[str, Any]],
+        top_k: Optional[int] = None,
+        min_score: Optional[float] = None
+    ):
+        """
+        Store a query embedding and its retrieval results with TTL.
+
+        top_k/min_score record the search parameters the results were
+        fetched with, so a hit can be checked and trimmed against the
+        reader's own parameters.
+        """
+        if not self.enabled:
+            return
+
+        try:
+            self._store(self.KEY_PREFIX, query_vector, {
+                "results": results,
+                "top_k": top_k,
+                "min_score": min_score
+            })
+        except Exception as e:
+            logger.warning(f"Semantic cache save error: {e}")
+
+    def get_response(self, query_vector: List[float]) -> Optional[Dict[str, Any]]:
+        """
+        Look up a cached full RAG response for the nearest stored query.
+
+        A hit skips retrieval *and* the LLM completion, so the stricter
+        `response_similarity_threshold` applies.
+        """
+        if not self.enabled:
+            return None
+
+        try:
+            found = self._knn_lookup(self.RESPONSE_INDEX_NAME, query_vector)
+            if found:
+                similarity, raw = found
+                if similarity >= self.response_similarity_threshold:
+                    self._response_hits += 1
+                    logger.info(f"Semantic response cache hit (similarity: {similarity:.4f})")
+                    return orjson.loads(raw)
+
+            self._response_misses += 1
+            return None
+
+        except Exception as e:
+            logger.warning(f"Semantic response cache lookup error: {e}")
+            self._response_misses += 1
+            return None
+
+    def set_response(self, query_vector: List[float], response: Dict[str, Any]):
+        """Store a query embedding and its full RAG response with TTL"""
+        if not self.enabled:
+            return
+
+        try:
+            self._store(self.RESPONSE_KEY_PREFIX, query_vector, response)
+        except Exception as e:
+            logger.warning(f"Semantic response cache save error: {e}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Hit/miss counters for the semantic cache"""
+        return {
+            'semantic_cache_enabled': self.enabled,
+            'semantic_cache_hits': self._hits,
+            'semantic_cache_misses': self._misses,
+            'semantic_response_cache_hits': self._response_hits,
+            'semantic_response_cache_misses': self._response_misses
+        }
+
+
+# Global semantic cache instance
+semantic_cache = SemanticCache()
@@ -1,14 +1,19 @@
 """Qdrant vector database client"""
 
+import functools
+import time
 from typing import List, Dict, Any, Optional
-from qdrant_client import QdrantClient
+from qdrant_client import QdrantClient, AsyncQdrantClient
 from qdrant_client.models import (
     Distance,
     VectorParams,
     PointStruct,
     Filter,
     FieldCondition,
-    MatchValue
+    MatchValue,
+    HnswConfigDiff,
+    OptimizersConfigDiff,
+    SearchParams
 )
 import logging
 from app.rag.config import rag_config
@@ -18,10 +23,27 @@ logger = logging.getLogger(__name__)
 
 class VectorStore:
     """Vector store using Qdrant"""
-    
+
+    # Upserts at least this large disable incremental HNSW indexing for
+    # the duration of the insert so the graph is built once per batch
+    _BULK_INDEX_DISABLE_MIN = 1000
+
+    # Client init retries (exponential backoff) and a simple circuit
+    # breaker: after this many consecutive search failures, fail fast for
+    # the reset window instead of stacking up full network timeouts while
+    # Qdrant is down
+    _INIT_RETRIES = 3
+    _BREAKER_FAIL_MAX = 5
+    _BREAKER_RESET_SECS = 30.0
+    _HEALTH_CACHE_SECS = 30.0
+
     def __init__(self):
         self.client = None
+        self.async_client = None
         self._initialized = False
+        self._consecutive_failures = 0
+        self._breaker_open_until = 0.0
+        self._last_healthy_at = 0.0
         # Lazy initialization - connect on first use
         try:
             self.client = self._init_client()
@@ -41,24 +63,62 @@ class VectorStore:
         """Get vector size dynamically based on current config"""
         return rag_config.vector_size
     
+    @staticmethod
+    def _client_kwargs() -> Dict[str, Any]:
+        """Shared constructor kwargs for the sync and async clients"""
+        kwargs: Dict[str, Any] = {"url": rag_config.qdrant_url}
+        if rag_config.qdrant_api_key:
+            kwargs["api_key"] = rag_config.qdrant_api_key
+        if rag_config.qdrant_prefer_grpc:
+            # protobuf over reused HTTP/2 streams instead of JSON/REST:
+            # smaller payloads and no per-call TCP handshake
+            kwargs["prefer_grpc"] = True
+            kwargs["grpc_port"] = rag_config.qdrant_grpc_port
+        return kwargs
+
     def _init_client(self) -> QdrantClient:
-        """Initialize Qdrant client"""
-        try:
-            if rag_config.qdrant_api_key:
-                client = QdrantClient(
-                    url=rag_config.qdrant_url,
-                    api_key=rag_config.qdrant_api_key
-                )
-            else:
-                client = QdrantClient(url=rag_config.qdrant_url)
-            
-            logger.info(f"Connected to Qdrant at {rag_config.qdrant_url}")
-            return client
-            
-        except Exception as e:
-            logger.error(f"Failed to connect to Qdrant: {e}")
-            raise
+        """Initialize Qdrant client (retried with exponential backoff)"""
+        for attempt in range(self._INIT_RETRIES):
+            try:
+                client = QdrantClient(**self._client_kwargs())
+
+                transport = "gRPC" if rag_config.qdrant_prefer_grpc else "REST"
+                logger.info(f"Connected to Qdrant at {rag_config.qdrant_url} ({transport})")
+                return client
+
+            except Exception as e:
+                if attempt == self._INIT_RETRIES - 1:
+                    logger.error(f"Failed to connect to Qdrant: {e}")
+                    raise
+                wait = min(0.1 * (2 ** attempt), 1.0)
+                logger.warning(f"Qdrant connect failed, retrying in {wait:.1f}s: {e}")
+                time.sleep(wait)
+
+    def _check_circuit(self):
+        """Fail fast while the circuit breaker is open"""
+        if time.monotonic() < self._breaker_open_until:
+            raise Exception("Qdrant circuit breaker open, failing fast")
+
+    def _record_success(self):
+        self._consecutive_failures = 0
+        self._last_healthy_at = time.monotonic()
+
+    def _record_failure(self):
+        self._consecutive_failures += 1
+        if self._consecutive_failures >= self._BREAKER_FAIL_MAX:
+            self._breaker_open_until = time.monotonic() + self._BREAKER_RESET_SECS
+            logger.error(
+                f"Qdrant circuit breaker opened after {self._consecutive_failures} "
+                f"consecutive failures ({self._BREAKER_RESET_SECS:.0f}s)"
+            )
     
+    def _get_async_client(self) -> AsyncQdrantClient:
+        """Get the async Qdrant client, creating it on first use"""
+        if self.async_client is None:
+            self.async_client = AsyncQdrantClient(**self._client_kwargs())
+            logger.info(f"Connected to Qdrant (async) at {rag_config.qdrant_url}")
+        return self.async_client
+
     def _ensure_initialized(self):
         """Ensure client is initialized before use"""
         if not self._initialized and self.client is None:
@@ -90,9 +150,41 @@ class VectorStore:
                     
                 self.client.create_collection(
                     collection_name=self.collection_name,
+                    # DOT on unit vectors ranks identically to COSINE but
+                    # skips the per-comparison normalization; the embedding
+                    # services L2-normalize every vector at generation
                     vectors_config=VectorParams(
                         size=self.vector_size,
-                        distance=Distance.COSINE
+                        distance=Distance.DOT,
+                        # Full-precision originals live on disk; only the
+                        # int8 codes below stay resident
+                        on_disk=True
+                    ),
+                    # int8 scalar quantization: 4x smaller vectors scored
+                    # with SIMD int8 distance on the coarse pass, original
+                    # FP32 used only for rescoring the short-list
+                    quantization_config=models.ScalarQuantization(
+                        scalar=models.ScalarQuantizationConfig(
+                            type=models.ScalarType.INT8,
+                            quantile=0.99,
+                            always_ram=True
+                        )
+                    ),
+                    # Explicit HNSW graph tuning instead of server defaults
+                    # (m=16, ef_construct=100): denser graph -> better recall
+                    # and lower traversal latency at our collection size
+                    hnsw_config=HnswConfigDiff(
+                        m=rag_config.hnsw_m,
+                        ef_construct=rag_config.hnsw_ef_construct,
+                        full_scan_threshold=10000
+                    ),
+                    # memmap_threshold moves large segments to mmapped
+                    # storage; with the server's storage.async_scorer
+                    # enabled, FP32 rescore reads overlap with scoring via
+                    # io_uring instead of blocking on each SSD read
+                    optimizers_config=OptimizersConfigDiff(
+                        indexing_threshold=20000,
+                        memmap_threshold=20000
                     ),
                     sparse_vectors_config=sparse_vectors_config
                 )
@@ -104,12 +196,76 @@ class VectorStore:
             logger.error(f"Error ensuring collection: {e}")
             raise
     
+    @staticmethod
+    @functools.lru_cache(maxsize=128)
+    def _build_filter_cached(frozen_items: tuple) -> Filter:
+        """
+        Compile a Filter from a sorted (key, value) tuple.
+
+        Chatbot traffic uses a handful of filter shapes (category,
+        is_active, ...), so caching skips re-allocating the pydantic
+        Filter/FieldCondition/MatchValue models on every search.
+        """
+        return Filter(
+            must=[
+                FieldCondition(
+                    key=key,
+                    match=MatchValue(value=value)
+                )
+                for key, value in frozen_items
+            ]
+        )
+
+    @classmethod
+    def _build_query_filter(cls, filter_conditions: Optional[Dict[str, Any]]) -> Optional[Filter]:
+        """Build a Qdrant Filter from a conditions dict (None if empty)"""
+        if not filter_conditions:
+            return None
+        try:
+            return cls._build_filter_cached(tuple(sorted(filter_conditions.items())))
+        except TypeError:
+            # Unhashable filter value: build uncached
+            return Filter(
+                must=[
+                    FieldCondition(
+                        key=key,
+                        match=MatchValue(value=value)
+                    )
+                    for key, value in filter_conditions.items()
+                ]
+            )
+
+    @staticmethod
+    def _build_search_params() -> SearchParams:
+        """
+        Per-query search parameters: HNSW beam width from config, and
+        quantized coarse scoring with FP32 rescore of a 2x-oversampled
+        short-list so the hot loop runs on int8 without losing accuracy.
+        """
+        from qdrant_client import models
+
+        return SearchParams(
+            hnsw_ef=rag_config.hnsw_ef_search,
+            quantization=models.QuantizationSearchParams(
+                ignore=False,
+                rescore=True,
+                oversampling=2.0
+            )
+        )
+
     def health_check(self) -> bool:
         """Check if Qdrant is healthy"""
+        # Fail fast while the breaker is open, and skip the network probe
+        # entirely if a request succeeded within the cache window
+        if time.monotonic() < self._breaker_open_until:
+            return False
+        if time.monotonic() - self._last_healthy_at < self._HEALTH_CACHE_SECS:
+            return True
         try:
             if self.client is None:
                 self._ensure_initialized()
             self.client.get_collections()
+            self._record_success()
             return True
         except Exception as e:
             logger.error(f"Qdrant health check failed: {e}")
@@ -155,18 +311,78 @@ class VectorStore:
                     )
                 )
             
-            self.client.upsert(
-                collection_name=self.collection_name,
-                points=points
-            )
-            
+            bulk = len(points) >= self._BULK_INDEX_DISABLE_MIN
+            if bulk:
+                self.client.update_collection(
+                    collection_name=self.collection_name,
+                    optimizers_config=OptimizersConfigDiff(indexing_threshold=0)
+                )
+            try:
+                self.client.upsert(
+                    collection_name=self.collection_name,
+                    points=points
+                )
+            finally:
+                if bulk:
+                    self.client.update_collection(
+                        collection_name=self.collection_name,
+                        optimizers_config=OptimizersConfigDiff(indexing_threshold=20000)
+                    )
+
             logger.info(f"Inserted {len(points)} documents into {self.collection_name}")
             return True
-            
+
         except Exception as e:
             logger.error(f"Error inserting documents: {e}")
             raise
-    
+
+    def insert_texts(
+        self,
+        ids: List[str],
+        texts: List[str],
+        payloads: List[Dict[str, Any]]
+    ) -> bool:
+        """
+        Embed texts and insert them in one call.
+
+        Embeds through the configured provider's batch API and, for large
+        backfills, streams points via upload_collection, which batches and
+        parallelizes the upload instead of building one upsert request.
+
+        Args:
+            ids: List of document IDs
+            texts: List of raw text chunks to embed
+            payloads: List of metadata dictionaries
+
+        Returns:
+            True if successful
+        """
+        from app.rag.factory import get_embeddings_service
+
+        try:
+            vectors = get_embeddings_service().generate_embeddings_batch(texts)
+
+            if len(ids) < self._BULK_INDEX_DISABLE_MIN:
+                return self.insert_documents(ids, vectors, payloads)
+
+            self._ensure_initialized()
+            self.client.upload_collection(
+                collection_name=self.collection_name,
+                ids=ids,
+                vectors=vectors,
+                payload=payloads,
+                batch_size=256,
+                parallel=4
+            )
+            logger.info(
+                f"Uploaded {len(ids)} documents into {self.collection_name} via upload_collection"
+            )
+            return True
+
+        except Exception as e:
+            logger.error(f"Error inserting texts: {e}")
+            raise
+
     def search(
         self,
         query_vector: List[float],
@@ -188,28 +404,19 @@ class VectorStore:
             List of search results with scores and payloads
         """
         try:
+            self._check_circuit()
             self._ensure_initialized()
-            
+
             if limit is None:
                 limit = rag_config.top_k
             if score_threshold is None:
                 score_threshold = rag_config.min_score
             
-            # Build filter if provided
-            query_filter = None
-            if filter_conditions:
-                query_filter = Filter(
-                    must=[
-                        FieldCondition(
-                            key=key,
-                            match=MatchValue(value=value)
-                        )
-                        for key, value in filter_conditions.items()
-                    ]
-                )
-            
+            query_filter = self._build_query_filter(filter_conditions)
+            search_params = self._build_search_params()
+
             from qdrant_client import models
-            
+
             if sparse_query_vector and getattr(rag_config, 'RAG_HYBRID_SEARCH', False):
                 # Hybrid Search with Reciprocal Rank Fusion
                 prefetch = [
@@ -232,7 +439,8 @@ class VectorStore:
                     prefetch=prefetch,
                     query=models.FusionQuery(fusion=models.Fusion.RRF),
                     limit=limit,
-                    query_filter=query_filter
+                    query_filter=query_filter,
+                    search_params=search_params
                 ).points
                 
                 # Re-ranker RRF scores are different scale, adjust threshold manually if needed
@@ -243,7 +451,8 @@ class VectorStore:
                     query=query_vector,
                     limit=limit,
                     score_threshold=score_threshold,
-                    query_filter=query_filter
+                    query_filter=query_filter,
+                    search_params=search_params
                 ).points
             
             # Format results
@@ -257,12 +466,182 @@ class VectorStore:
             ]
             
             logger.info(f"Found {len(formatted_results)} documents (threshold: {score_threshold})")
+            self._record_success()
             return formatted_results
-            
+
         except Exception as e:
+            self._record_failure()
             logger.error(f"Error searching documents: {e}")
             raise
     
+    def search_iter(
+        self,
+        query_vector: List[float],
+        limit: int = None,
+        score_threshold: float = None,
+        filter_conditions: Optional[Dict[str, Any]] = None
+    ):
+        """
+        Search and yield (id, score, payload) tuples lazily.
+
+        For consumers that walk the results once in order (context
+        formatting, exports) this skips building a dict per hit; `search()`
+        remains the dict-shaped API for everything else.
+
+        Yields:
+            (id, score, payload) per result, best first
+        """
+        self._ensure_initialized()
+
+        if limit is None:
+            limit = rag_config.top_k
+        if score_threshold is None:
+            score_threshold = rag_config.min_score
+
+        results = self.client.query_points(
+            collection_name=self.collection_name,
+            query=query_vector,
+            limit=limit,
+            score_threshold=score_threshold,
+            query_filter=self._build_query_filter(filter_conditions),
+            search_params=self._build_search_params()
+        ).points
+
+        for result in results:
+            yield result.id, result.score, result.payload
+
+    async def search_async(
+        self,
+        query_vector: List[float],
+        limit: int = None,
+        score_threshold: float = None,
+        filter_conditions: Optional[Dict[str, Any]] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Search for similar documents without blocking the event loop.
+
+        Uses AsyncQdrantClient so the network round trip is awaited
+        instead of running the sync client on the loop.
+
+        Args:
+            query_vector: Query embedding vector
+            limit: Maximum number of results (default: from config)
+            score_threshold: Minimum similarity score (default: from config)
+            filter_conditions: Optional metadata filters
+
+        Returns:
+            List of search results with scores and payloads
+        """
+        try:
+            self._check_circuit()
+            self._ensure_initialized()
+
+            if limit is None:
+                limit = rag_config.top_k
+            if score_threshold is None:
+                score_threshold = rag_config.min_score
+
+            response = await self._get_async_client().query_points(
+                collection_name=self.collection_name,
+                query=query_vector,
+                limit=limit,
+                score_threshold=score_threshold,
+                query_filter=self._build_query_filter(filter_conditions),
+                search_params=self._build_search_params()
+            )
+
+            formatted_results = [
+                {
+                    "id": result.id,
+                    "score": result.score,
+                    "payload": result.payload
+                }
+                for result in response.points
+            ]
+
+            logger.info(f"Found {len(formatted_results)} documents (async, threshold: {score_threshold})")
+            self._record_success()
+            return formatted_results
+
+        except Exception as e:
+            self._record_failure()
+            logger.error(f"Error searching documents (async): {e}")
+            raise
+
+    def search_many(
+        self,
+        query_vectors: List[List[float]],
+        limit: int = None,
+        score_threshold: float = None,
+        filter_conditions: Optional[Dict[str, Any]] = None
+    ) -> List[List[Dict[str, Any]]]:
+        """
+        Search for similar documents for several query vectors at once.
+
+        All queries go to Qdrant in a single query_batch_points round trip
+        instead of one request per query.
+
+        Args:
+            query_vectors: One embedding vector per query
+            limit: Maximum number of results per query (default: from config)
+            score_threshold: Minimum similarity score (default: from config)
+            filter_conditions: Optional metadata filters (shared by all queries)
+
+        Returns:
+            One list of search results per query vector, in input order
+        """
+        try:
+            self._ensure_initialized()
+
+            if limit is None:
+                limit = rag_config.top_k
+            if score_threshold is None:
+                score_threshold = rag_config.min_score
+
+            query_filter = self._build_query_filter(filter_conditions)
+            search_params = self._build_search_params()
+
+            from qdrant_client import models
+
+            requests = [
+                models.QueryRequest(
+                    query=vector,
+                    limit=limit,
+                    score_threshold=score_threshold,
+                    filter=query_filter,
+                    params=search_params,
+                    with_payload=True
+                )
+                for vector in query_vectors
+            ]
+
+            responses = self.client.query_batch_points(
+                collection_name=self.collection_name,
+                requests=requests
+            )
+
+            batched_results = [
+                [
+                    {
+                        "id": result.id,
+                        "score": result.score,
+                        "payload": result.payload
+                    }
+                    for result in response.points
+                ]
+                for response in responses
+            ]
+
+            logger.info(
+                f"Batch search: {len(query_vectors)} queries in one round trip "
+                f"(threshold: {score_threshold})"
+            )
+            return batched_results
+
+        except Exception as e:
+            logger.error(f"Error batch-searching documents: {e}")
+            raise
+
     def delete_documents(self, ids: List[str]) -> bool:
         """
         Delete documents from vector store
@@ -294,11 +673,13 @@ class VectorStore:
             self._ensure_initialized()
             
             collection = self.client.get_collection(self.collection_name)
+            config = getattr(collection, 'config', None)
             return {
                 "name": self.collection_name,
                 "vectors_count": getattr(collection, 'vectors_count', getattr(collection, 'points_count', 0)),
                 "points_count": getattr(collection, 'points_count', 0),
-                "status": getattr(collection, 'status', 'green')
+                "status": getattr(collection, 'status', 'green'),
+                "quantization_enabled": getattr(config, 'quantization_config', None) is not None
             }
         except Exception as e:
             logger.error(f"Error getting collection info: {e}")
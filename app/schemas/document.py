@@ -1,6 +1,6 @@
 """Document schemas"""
 
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 from typing import Optional, List, Dict, Any
 from datetime import datetime
 
@@ -34,8 +34,7 @@ class DocumentChunkResponse(BaseModel):
     qdrant_point_id: Optional[str] = None
     created_at: datetime
     
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 class DocumentCategoryResponse(BaseModel):
@@ -45,8 +44,7 @@ class DocumentCategoryResponse(BaseModel):
     description: Optional[str] = None
     created_at: datetime
     
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 class DocumentCategoryCreate(BaseModel):
     name: str
@@ -66,8 +64,7 @@ class DivisionResponse(BaseModel):
     id: int
     name: str
     
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 class DocumentListItem(BaseModel):
@@ -87,8 +84,7 @@ class DocumentListItem(BaseModel):
     processed_at: Optional[datetime] = None
     is_active: bool
     
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 class DocumentDetailResponse(BaseModel):
@@ -113,8 +109,7 @@ class DocumentDetailResponse(BaseModel):
     failed_reason: Optional[str] = None
     is_active: bool
     
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 class DocumentListResponse(BaseModel):
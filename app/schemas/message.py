@@ -1,6 +1,6 @@
 """Message schemas"""
 
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 from typing import Optional, Dict, Any
 from datetime import datetime
 
@@ -30,8 +30,7 @@ class MessageResponse(MessageBase):
     llm_tokens: Optional[int] = None
     rag_context: Optional[Dict[str, Any]] = None
     
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 class MessageListResponse(BaseModel):
@@ -1,6 +1,6 @@
 """Generic response schemas"""
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from typing import Optional, Any
 from datetime import datetime
 
@@ -10,14 +10,14 @@ class ErrorResponse(BaseModel):
     error: str
     detail: str
     request_id: Optional[str] = None
-    timestamp: datetime = datetime.utcnow()
+    timestamp: datetime = Field(default_factory=datetime.utcnow)
     retry_after: Optional[int] = None
 
 
 class HealthResponse(BaseModel):
     """Health check response schema"""
     status: str
-    timestamp: datetime = datetime.utcnow()
+    timestamp: datetime = Field(default_factory=datetime.utcnow)
     dependencies: dict
 
 
@@ -29,4 +29,4 @@ class StatsResponse(BaseModel):
     queue_depth: int
     llm_tokens_used: int
     error_rate_percent: float
-    timestamp: datetime = datetime.utcnow()
+    timestamp: datetime = Field(default_factory=datetime.utcnow)
@@ -1,6 +1,6 @@
 """User schemas"""
 
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 from typing import Optional, List
 
 
@@ -14,8 +14,7 @@ class UserListItem(BaseModel):
     status: str  # "active" or "blocked"
     division_id: Optional[int] = None
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 class UserCreate(BaseModel):
     """Create user request body"""
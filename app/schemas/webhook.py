@@ -1,11 +1,19 @@
 """Webhook schemas"""
 
-from pydantic import BaseModel, Field, validator
+from pydantic import BaseModel, ConfigDict, Field, field_validator
 from typing import Optional, Dict, Any
 
+# Built once at import: frozenset membership is O(1) on the per-message
+# validation path
+ALLOWED_EVENTS = frozenset(
+    ['message.incoming', 'message.status', 'ready', 'session.status']
+)
+
 
 class WebhookData(BaseModel):
     """WAHA webhook data schema"""
+    model_config = ConfigDict(populate_by_name=True)
+
     messageId: Optional[str] = None
     timestamp: Optional[int] = None
     from_: Optional[str] = Field(None, alias="from")
@@ -19,11 +27,11 @@ class WebhookPayload(BaseModel):
     event: str = Field(..., description="Event type")
     data: Dict[str, Any] = Field(..., description="Event data")
     
-    @validator('event')
+    @field_validator('event')
+    @classmethod
     def validate_event(cls, v):
-        allowed_events = ['message.incoming', 'message.status', 'ready', 'session.status']
-        if v not in allowed_events:
-            raise ValueError(f'Event must be one of {allowed_events}')
+        if v not in ALLOWED_EVENTS:
+            raise ValueError(f'Event must be one of {sorted(ALLOWED_EVENTS)}')
         return v
 
 
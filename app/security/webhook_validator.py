@@ -1,48 +1,70 @@
 """Webhook signature validation"""
 
+import functools
 import hmac
 import hashlib
 import logging
 
+try:
+    import orjson
+
+    def _serialize_payload(payload: dict) -> bytes:
+        return orjson.dumps(payload, option=orjson.OPT_SORT_KEYS)
+except ImportError:  # orjson is in requirements, but degrade cleanly
+    import json
+
+    def _serialize_payload(payload: dict) -> bytes:
+        return json.dumps(payload, sort_keys=True).encode('utf-8')
+
 logger = logging.getLogger(__name__)
 
 
+@functools.lru_cache(maxsize=8)
+def _hmac_template(secret: str) -> "hmac.HMAC":
+    """
+    Pre-keyed HMAC for the webhook secret.
+
+    Keying an HMAC costs two extra SHA-256 compressions (inner/outer
+    pads); copying a keyed template per request skips them, so each
+    call pays only for hashing the payload itself.
+    """
+    return hmac.new(secret.encode('utf-8'), digestmod=hashlib.sha256)
+
+
 def validate_webhook_signature(payload: dict, signature: str, secret: str) -> bool:
     """
     Validate WAHA webhook signature
-    
+
     Args:
         payload: Webhook payload
         signature: Signature from header
         secret: Webhook secret key
-        
+
     Returns:
         True if signature is valid
     """
     if not signature or not secret:
         logger.warning("Webhook signature validation disabled (no signature or secret)")
         return True  # Skip validation if not configured
-    
+
     try:
-        # Convert payload to string
-        import json
-        payload_str = json.dumps(payload, sort_keys=True)
-        
-        # Calculate expected signature
-        expected_signature = hmac.new(
-            secret.encode('utf-8'),
-            payload_str.encode('utf-8'),
-            hashlib.sha256
-        ).hexdigest()
-        
+        # Serialize with sorted keys; orjson returns bytes directly, so
+        # no intermediate str or .encode() on the per-message path
+        payload_bytes = _serialize_payload(payload)
+
+        # Calculate expected signature from the pre-keyed template
+        mac = _hmac_template(secret).copy()
+        mac.update(payload_bytes)
+        expected_signature = mac.hexdigest()
+
         # Compare signatures
         is_valid = hmac.compare_digest(signature, expected_signature)
-        
+
         if not is_valid:
             logger.warning("Invalid webhook signature")
-        
+
         return is_valid
-        
+
     except Exception as e:
         logger.error(f"Webhook validation error: {str(e)}")
         return False
@@ -1,10 +1,11 @@
 """Document management service"""
 
 from typing import List, Optional, Dict, Any
-from sqlalchemy.orm import Session, joinedload
-from sqlalchemy import func, or_, desc
+from sqlalchemy.orm import Session, joinedload, selectinload
+from sqlalchemy import func, or_, desc, text
 from datetime import datetime
 import logging
+import redis
 
 from app.models.document import Document
 from app.models.document_category import DocumentCategory
@@ -18,13 +19,71 @@ from app.schemas.document import (
     DocumentUsageStats
 )
 from app.rag.vector_store import vector_store
+from app.rag.config import rag_config
 
 logger = logging.getLogger(__name__)
 
 
 class DocumentService:
     """Service for document management operations"""
-    
+
+    # Cache-aside for the read-heavy list/detail endpoints: the document
+    # set changes rarely, so repeated admin page hits become one Redis
+    # GET. Invalidation bumps a version counter baked into every key, so
+    # stale entries just age out — no SCAN-based eviction.
+    _CACHE_TTL = 60
+    _CACHE_VER_KEY = "docs:cache:ver"
+
+    def __init__(self):
+        self._cache_enabled = rag_config.enable_cache
+        self._redis = None
+        if self._cache_enabled:
+            try:
+                self._redis = redis.from_url(
+                    rag_config.redis_url,
+                    decode_responses=True
+                )
+            except Exception as e:
+                logger.warning(f"Failed to connect to Redis cache: {e}")
+                self._cache_enabled = False
+
+    def _cache_key(self, *parts) -> Optional[str]:
+        """Build a versioned cache key, or None if caching is off"""
+        if not self._cache_enabled:
+            return None
+        try:
+            version = self._redis.get(self._CACHE_VER_KEY) or "0"
+        except Exception as e:
+            logger.warning(f"Cache version lookup error: {e}")
+            return None
+        return "docs:" + ":".join(str(p) for p in parts) + f":v{version}"
+
+    def _cache_get(self, key: Optional[str]) -> Optional[str]:
+        if not key:
+            return None
+        try:
+            return self._redis.get(key)
+        except Exception as e:
+            logger.warning(f"Cache retrieval error: {e}")
+            return None
+
+    def _cache_set(self, key: Optional[str], value: str):
+        if not key:
+            return
+        try:
+            self._redis.setex(key, self._CACHE_TTL, value)
+        except Exception as e:
+            logger.warning(f"Cache save error: {e}")
+
+    def _invalidate_cache(self):
+        """Bump the cache version so all existing entries become stale"""
+        if not self._cache_enabled:
+            return
+        try:
+            self._redis.incr(self._CACHE_VER_KEY)
+        except Exception as e:
+            logger.warning(f"Cache invalidation error: {e}")
+
     def list_documents(
         self,
         db: Session,
@@ -50,20 +109,49 @@ class DocumentService:
         Returns:
             Paginated document list
         """
-        query = db.query(Document).options(
-            joinedload(Document.category),
-            joinedload(Document.division)
+        cache_key = self._cache_key(
+            'list', page, limit, search or '', status or '',
+            category_id or 0, division_id or 0
+        )
+        cached = self._cache_get(cache_key)
+        if cached:
+            return DocumentListResponse.model_validate_json(cached)
+
+        # COUNT(*) OVER () returns the unpaginated total alongside each
+        # row, so the page and the total come back in one round trip
+        # instead of a separate query.count()
+        # selectinload batches category/division into one extra query per
+        # page instead of LEFT JOINs that widen every result row
+        query = db.query(
+            Document,
+            func.count().over().label('total')
+        ).options(
+            selectinload(Document.category),
+            selectinload(Document.division)
         ).filter(Document.is_active == True)
         
         # Apply filters
         if search:
-            search_pattern = f"%{search}%"
-            query = query.filter(
-                or_(
-                    Document.title.like(search_pattern),
-                    Document.content.like(search_pattern)
+            if db.bind.dialect.name == 'mysql':
+                # Uses the ft_documents_title_content FULLTEXT index
+                # (migrations/add_documents_fulltext_index.sql) instead of
+                # LIKE '%..%', which scans every row including the
+                # LONGTEXT content column
+                query = query.filter(
+                    text(
+                        "MATCH(documents.title, documents.content) "
+                        "AGAINST (:search IN NATURAL LANGUAGE MODE)"
+                    ).bindparams(search=search)
+                )
+            else:
+                # LIKE fallback for non-MySQL engines (e.g. SQLite tests)
+                search_pattern = f"%{search}%"
+                query = query.filter(
+                    or_(
+                        Document.title.like(search_pattern),
+                        Document.content.like(search_pattern)
+                    )
                 )
-            )
         
         if status:
             query = query.filter(Document.embedding_status == status)
@@ -74,19 +162,17 @@ class DocumentService:
         if division_id:
             query = query.filter(Document.division_id == division_id)
         
-        # Count total
-        total = query.count()
-        
-        # Calculate pagination
-        pages = (total + limit - 1) // limit
         offset = (page - 1) * limit
-        
-        # Get page of results
-        documents = query.order_by(desc(Document.upload_date)).offset(offset).limit(limit).all()
-        
+
+        # Get page of results (each row carries the windowed total)
+        rows = query.order_by(desc(Document.upload_date)).offset(offset).limit(limit).all()
+
+        total = rows[0][1] if rows else 0
+        pages = (total + limit - 1) // limit
+
         # Convert to response items
         items = []
-        for doc in documents:
+        for doc, _ in rows:
             item = DocumentListItem(
                 id=doc.id,
                 title=doc.title,
@@ -105,13 +191,15 @@ class DocumentService:
             )
             items.append(item)
         
-        return DocumentListResponse(
+        response = DocumentListResponse(
             items=items,
             total=total,
             page=page,
             limit=limit,
             pages=pages
         )
+        self._cache_set(cache_key, response.model_dump_json())
+        return response
     
     def get_document(self, db: Session, document_id: int) -> Optional[DocumentDetailResponse]:
         """
@@ -124,15 +212,22 @@ class DocumentService:
         Returns:
             Document details or None
         """
+        cache_key = self._cache_key('get', document_id)
+        cached = self._cache_get(cache_key)
+        if cached:
+            return DocumentDetailResponse.model_validate_json(cached)
+
         doc = db.query(Document).options(joinedload(Document.category)).filter(
             Document.id == document_id,
             Document.is_active == True
         ).first()
-        
+
         if not doc:
             return None
-        
-        return DocumentDetailResponse.from_orm(doc)
+
+        response = DocumentDetailResponse.from_orm(doc)
+        self._cache_set(cache_key, response.model_dump_json())
+        return response
     
     def get_document_preview(
         self,
@@ -246,10 +341,29 @@ class DocumentService:
         
         db.commit()
         db.refresh(doc)
-        
+        self._invalidate_cache()
+
         logger.info(f"Updated document {document_id}")
         return doc
     
+    @staticmethod
+    def _has_active_twin(db: Session, doc: Document) -> bool:
+        """
+        True if another active completed document shares this document's
+        content_hash. Duplicate uploads reuse the original's Qdrant
+        points, so the vectors must outlive any single twin.
+        """
+        if not doc.content_hash:
+            return False
+        return db.query(
+            db.query(Document.id).filter(
+                Document.content_hash == doc.content_hash,
+                Document.id != doc.id,
+                Document.is_active == True,
+                Document.embedding_status == "completed"
+            ).exists()
+        ).scalar()
+
     def delete_document(self, db: Session, document_id: int) -> bool:
         """
         Soft delete document and remove from Qdrant
@@ -269,13 +383,24 @@ class DocumentService:
         if not doc:
             return False
         
-        # Get all chunk point IDs
-        chunks = db.query(DocumentChunk).filter(
-            DocumentChunk.document_id == document_id
-        ).all()
-        
-        point_ids = [chunk.qdrant_point_id for chunk in chunks if chunk.qdrant_point_id]
-        
+        # Get all chunk point IDs (column-only query: loading full
+        # DocumentChunk objects would drag chunk_text over the wire)
+        point_ids = [
+            pid for (pid,) in db.query(DocumentChunk.qdrant_point_id).filter(
+                DocumentChunk.document_id == document_id,
+                DocumentChunk.qdrant_point_id.isnot(None)
+            ).all()
+        ]
+        
+        # Duplicate uploads share the original's Qdrant points: keep the
+        # vectors while any other active twin still serves them
+        if point_ids and self._has_active_twin(db, doc):
+            logger.info(
+                f"Document {document_id} shares Qdrant points with an active "
+                f"duplicate; skipping vector delete"
+            )
+            point_ids = []
+
         # Delete from Qdrant
         if point_ids:
             try:
@@ -289,7 +414,8 @@ class DocumentService:
         doc.updated_at = datetime.utcnow()
         
         db.commit()
-        
+        self._invalidate_cache()
+
         logger.info(f"Soft deleted document {document_id}")
         return True
     
@@ -304,23 +430,77 @@ class DocumentService:
         Returns:
             Dict with deletion results
         """
-        deleted_count = 0
-        failed_ids = []
-        
-        for doc_id in document_ids:
-            try:
-                if self.delete_document(db, doc_id):
-                    deleted_count += 1
-                else:
-                    failed_ids.append(doc_id)
-            except Exception as e:
-                logger.error(f"Failed to delete document {doc_id}: {e}")
-                failed_ids.append(doc_id)
-        
-        return {
-            "deleted_count": deleted_count,
-            "failed_ids": failed_ids
-        }
+        if not document_ids:
+            return {"deleted_count": 0, "failed_ids": []}
+
+        try:
+            # One SELECT for every document plus its chunks, instead of the
+            # per-id SELECT + SELECT + commit that delete_document does
+            docs = db.query(Document).options(
+                selectinload(Document.chunks)
+            ).filter(
+                Document.id.in_(document_ids),
+                Document.is_active == True
+            ).all()
+
+            # Points shared with an active twin *outside* this batch must
+            # survive the bulk delete (duplicate uploads reuse the
+            # original's Qdrant points)
+            deleting_ids = {doc.id for doc in docs}
+            batch_hashes = {doc.content_hash for doc in docs if doc.content_hash}
+            protected_hashes = set()
+            if batch_hashes:
+                protected_hashes = {
+                    content_hash for (content_hash,) in db.query(
+                        Document.content_hash
+                    ).filter(
+                        Document.content_hash.in_(batch_hashes),
+                        Document.id.notin_(deleting_ids),
+                        Document.is_active == True,
+                        Document.embedding_status == "completed"
+                    ).all()
+                }
+
+            point_ids = list({
+                chunk.qdrant_point_id
+                for doc in docs
+                if doc.content_hash not in protected_hashes
+                for chunk in doc.chunks
+                if chunk.qdrant_point_id
+            })
+
+            # Single bulk delete in Qdrant
+            if point_ids:
+                try:
+                    vector_store.delete_documents(point_ids)
+                    logger.info(
+                        f"Deleted {len(point_ids)} points from Qdrant for {len(docs)} documents"
+                    )
+                except Exception as e:
+                    logger.error(f"Failed to delete from Qdrant: {e}")
+
+            now = datetime.utcnow()
+            for doc in docs:
+                doc.is_active = False
+                doc.updated_at = now
+
+            db.commit()
+            self._invalidate_cache()
+
+            found_ids = {doc.id for doc in docs}
+            failed_ids = [doc_id for doc_id in document_ids if doc_id not in found_ids]
+            return {
+                "deleted_count": len(docs),
+                "failed_ids": failed_ids
+            }
+
+        except Exception as e:
+            logger.error(f"Failed to bulk delete documents: {e}")
+            db.rollback()
+            return {
+                "deleted_count": 0,
+                "failed_ids": list(document_ids)
+            }
     
     def get_usage_stats(self, db: Session, document_id: int) -> DocumentUsageStats:
         """
@@ -397,7 +577,8 @@ class DocumentService:
         db.add(category)
         db.commit()
         db.refresh(category)
-        
+        self._invalidate_cache()
+
         logger.info(f"Created category: {name}")
         return category
 
@@ -419,6 +600,7 @@ class DocumentService:
             
         db.commit()
         db.refresh(category)
+        self._invalidate_cache()
         return category
 
     def delete_category(self, db: Session, category_id: int) -> bool:
@@ -428,6 +610,7 @@ class DocumentService:
             
         db.delete(category)
         db.commit()
+        self._invalidate_cache()
         return True
 
 
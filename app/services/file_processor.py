@@ -18,16 +18,32 @@ from app.rag.vector_store import vector_store
 from app.rag.factory import get_embeddings_service
 from app.database.session import SessionLocal
 from app.rag.config import rag_config
+from app.services import ocr_progress
 
 logger = logging.getLogger(__name__)
 
 
 class FileProcessor:
     """Enhanced file processor with background task support"""
-    
+
     def __init__(self):
         self.document_processor = document_processor
         self.vector_store = vector_store
+
+    @staticmethod
+    def _sha256_stream(file_path: Path) -> str:
+        """
+        SHA-256 of a file in 1 MiB chunks.
+
+        Avoids materializing 100MB+ PDFs in RAM just to hash them, and
+        leaves the pages warm in the OS cache for the extractor that
+        reads the same file next.
+        """
+        digest = hashlib.sha256()
+        with open(file_path, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b''):
+                digest.update(block)
+        return digest.hexdigest()
     
     @property
     def embeddings(self):
@@ -60,6 +76,14 @@ class FileProcessor:
         Returns:
             Created document
         """
+        # Hash the file bytes so identical re-uploads can skip the
+        # extract/chunk/embed pipeline entirely
+        content_hash = None
+        try:
+            content_hash = self._sha256_stream(Path(file_path))
+        except Exception as e:
+            logger.warning(f"Failed to hash uploaded file: {e}")
+
         doc = Document(
             title=title,
             content="",  # Will be filled during processing
@@ -69,9 +93,9 @@ class FileProcessor:
             file_path=file_path,
             file_size=file_size,
             file_type=file_type,
+            content_hash=content_hash,
             embedding_status="pending",
-            is_active=True,
-            upload_date=datetime.utcnow()
+            is_active=True
         )
         
         db.add(doc)
@@ -97,23 +121,69 @@ class FileProcessor:
                 logger.error(f"Document {document_id} not found")
                 return
             
+            # Duplicate upload? Re-embedding an identical file is the
+            # most expensive path in the system, so reuse the completed
+            # twin's content and point at its existing Qdrant points.
+            if doc.content_hash:
+                duplicate = db.query(Document).filter(
+                    Document.content_hash == doc.content_hash,
+                    Document.id != doc.id,
+                    Document.is_active == True,
+                    Document.embedding_status == "completed"
+                ).first()
+                if duplicate:
+                    doc.content = duplicate.content
+                    doc.doc_metadata = duplicate.doc_metadata
+                    doc.chunks_count = duplicate.chunks_count
+                    doc.embedding_status = "completed"
+                    doc.processed_at = datetime.utcnow()
+                    doc.failed_reason = None
+                    # Mirror the twin's chunk rows so this document holds
+                    # explicit references to the shared Qdrant points —
+                    # get_document_chunks works, and deletion can reason
+                    # about ownership instead of finding zero chunks
+                    twin_chunks = db.query(
+                        DocumentChunk.chunk_index,
+                        DocumentChunk.chunk_text,
+                        DocumentChunk.chunk_size,
+                        DocumentChunk.qdrant_point_id
+                    ).filter(DocumentChunk.document_id == duplicate.id).all()
+                    for chunk_index, chunk_text, chunk_size, point_id in twin_chunks:
+                        db.add(DocumentChunk(
+                            document_id=doc.id,
+                            chunk_index=chunk_index,
+                            chunk_text=chunk_text,
+                            chunk_size=chunk_size,
+                            qdrant_point_id=point_id
+                        ))
+                    db.commit()
+                    logger.info(
+                        f"Document {document_id} is a duplicate of {duplicate.id} "
+                        f"(hash {doc.content_hash[:12]}); skipped re-embedding"
+                    )
+                    return
+
             # Update status to processing
             doc.embedding_status = "processing"
             
-            # 1. Delete existing chunks in Qdrant
-            existing_chunks = db.query(DocumentChunk).filter(DocumentChunk.document_id == document_id).all()
-            if existing_chunks:
+            # 1. Delete existing chunks in Qdrant (ids only, no chunk_text)
+            qdrant_ids = [
+                pid for (pid,) in db.query(DocumentChunk.qdrant_point_id).filter(
+                    DocumentChunk.document_id == document_id,
+                    DocumentChunk.qdrant_point_id.isnot(None)
+                ).all()
+            ]
+            if qdrant_ids:
                 try:
-                    qdrant_ids = [chunk.qdrant_point_id for chunk in existing_chunks if chunk.qdrant_point_id]
-                    if qdrant_ids:
-                        self.vector_store.delete_documents(qdrant_ids)
-                        logger.info(f"Deleted {len(qdrant_ids)} existing points in Qdrant")
+                    self.vector_store.delete_documents(qdrant_ids)
+                    logger.info(f"Deleted {len(qdrant_ids)} existing points in Qdrant")
                 except Exception as e:
                     logger.warning(f"Failed to delete existing points in Qdrant: {e}")
-                    
-                # 2. Delete existing chunks in DB
-                db.query(DocumentChunk).filter(DocumentChunk.document_id == document_id).delete()
-                
+
+            # 2. Delete existing chunks in DB
+            db.query(DocumentChunk).filter(DocumentChunk.document_id == document_id).delete()
+
+
             db.commit()
             
             logger.info(f"Processing document {document_id}: {doc.title}")
@@ -132,26 +202,37 @@ class FileProcessor:
             # PENTING: Jalankan di thread terpisah agar TIDAK memblokir event loop FastAPI
             # Tanpa ini, OCR yang CPU-intensive akan memblokir healthcheck dan menyebabkan container di-kill
             try:
+                # Per-page progress goes out over Redis pub/sub (see the
+                # /documents/{id}/ocr-progress SSE endpoint); only the
+                # terminal state below is written to the DB columns
                 pages = await asyncio.to_thread(
-                    self.document_processor.read_file_pages, str(file_path)
+                    self.document_processor.read_file_pages,
+                    str(file_path),
+                    ocr_progress.progress_callback(document_id)
                 )
-                
+
                 # Save combined text to DB for preview/search
                 full_text = "\n".join(p["text"] for p in pages)
                 doc.content = full_text
                 
                 # Extract structured metadata (Judul, No Dokumen, dll) from the first few pages
                 try:
-                    metadata = self.document_processor.extract_document_metadata(full_text[:5000])
+                    metadata = await asyncio.to_thread(
+                        self.document_processor.extract_document_metadata, full_text[:5000]
+                    )
                     if metadata:
                         doc.doc_metadata = metadata
                         logger.info(f"Extracted document metadata: {metadata}")
                 except Exception as e:
                     logger.warning(f"Failed to extract document metadata: {e}")
                     
-                db.commit()
-                
                 total_pages = len(pages)
+                # Last-known state for clients that missed the live stream
+                doc.ocr_progress_current = total_pages
+                doc.ocr_progress_total = total_pages
+
+                db.commit()
+
                 logger.info(
                     f"Extracted {len(full_text)} chars from {doc.title} "
                     f"({total_pages} pages)"
@@ -164,9 +245,18 @@ class FileProcessor:
             
             # Chunk text using heading-aware semantic chunking
             # Falls back to sentence-based chunking for non-structured docs
-            page_chunks = self.document_processor.chunk_text_semantic_with_pages(pages)
-            
-            cover_info = self.document_processor._extract_cover_page_info(pages[:2])
+            # Run off-loop: chunking tokenizes every sentence, which would
+            # otherwise block the event loop for seconds on large docs
+            # (tiktoken's Rust core releases the GIL, so a worker thread
+            # gets real parallelism without the pickling constraints of a
+            # process pool)
+            page_chunks = await asyncio.to_thread(
+                self.document_processor.chunk_text_semantic_with_pages, pages
+            )
+
+            cover_info = await asyncio.to_thread(
+                self.document_processor._extract_cover_page_info, pages[:2]
+            )
             
             if cover_info:
                 judul = doc.doc_metadata.get('Judul', doc.title) if doc.doc_metadata else doc.title
@@ -210,28 +300,13 @@ class FileProcessor:
                 chunk_texts.append(f"{header}\n\n{c['text']}")
             logger.info(f"Split into {len(page_chunks)} semantic chunks")
             
-            # Generate embeddings
-            logger.info(f"Starting embedding generation for {len(chunk_texts)} chunks...")
-            embeddings = await self.embeddings.generate_embeddings_batch_async(chunk_texts)
-            logger.info(f"Successfully generated {len(embeddings)} embeddings")
-            
-            # Filter out chunks with failed (None) embeddings
-            valid_indices = [i for i, emb in enumerate(embeddings) if emb is not None]
-            if len(valid_indices) < len(embeddings):
-                logger.warning(f"Skipping {len(embeddings) - len(valid_indices)} chunks with failed embeddings")
-                page_chunks = [page_chunks[i] for i in valid_indices]
-                embeddings = [embeddings[i] for i in valid_indices]
-                chunk_texts = [chunk_texts[i] for i in valid_indices]
-            
-            if not embeddings:
-                raise Exception("All embeddings failed to generate")
-            
-            # Prepare Qdrant payloads with page metadata
+            # Prepare Qdrant point ids and payloads up-front so the
+            # embed/insert pipeline below only has to slice them
             chunk_ids = [str(uuid.uuid4()) for _ in range(len(page_chunks))]
-            
+
             # File name without extension for display
             file_name = Path(doc.file_path).stem if doc.file_path else doc.title
-            
+
             payloads = []
             for i, chunk_info in enumerate(page_chunks):
                 payload = {
@@ -253,41 +328,101 @@ class FileProcessor:
                     'doc_metadata': doc.doc_metadata or {},
                 }
                 payloads.append(payload)
-            
-            # Generate Sparse Embeddings for Hybrid Search if enabled
-            sparse_vectors = None
+
+            # Sparse embedder for Hybrid Search if enabled (built once)
+            sparse_embedder = None
             if getattr(rag_config, 'RAG_HYBRID_SEARCH', False):
                 try:
                     from app.rag.embeddings_sparse import SparseEmbeddings
                     sparse_embedder = SparseEmbeddings(model_name=rag_config.RAG_SPARSE_MODEL_NAME)
-                    logger.info(f"Generating sparse embeddings for {len(chunk_texts)} chunks")
-                    sparse_vectors = sparse_embedder.generate_sparse_embeddings_batch(chunk_texts)
                 except Exception as e:
-                    logger.error(f"Failed to generate sparse embeddings: {e}")
-            
-            # Insert into Qdrant
-            self.vector_store.insert_documents(
-                ids=chunk_ids,
-                vectors=embeddings,
-                payloads=payloads,
-                sparse_vectors=sparse_vectors
+                    logger.error(f"Failed to initialize sparse embedder: {e}")
+
+            # Pipeline embedding and insertion: instead of embedding all
+            # chunks, then upserting all points serially, each mini-batch
+            # embeds (network-bound) and upserts (to_thread, so the event
+            # loop stays free) concurrently with the other batches
+            EMBED_BATCH = 64
+
+            async def _embed_and_insert(start: int) -> list:
+                batch_texts = chunk_texts[start:start + EMBED_BATCH]
+                embs = await self.embeddings.generate_embeddings_batch_async(batch_texts)
+
+                # Filter out chunks with failed (None) embeddings
+                ids, vectors, batch_payloads, indices = [], [], [], []
+                for j, emb in enumerate(embs):
+                    if emb is None:
+                        continue
+                    i = start + j
+                    ids.append(chunk_ids[i])
+                    vectors.append(emb)
+                    batch_payloads.append(payloads[i])
+                    indices.append(i)
+
+                if not ids:
+                    return []
+
+                sparse_vectors = None
+                if sparse_embedder:
+                    try:
+                        sparse_vectors = await asyncio.to_thread(
+                            sparse_embedder.generate_sparse_embeddings_batch,
+                            [chunk_texts[i] for i in indices]
+                        )
+                    except Exception as e:
+                        logger.error(f"Failed to generate sparse embeddings: {e}")
+
+                await asyncio.to_thread(
+                    self.vector_store.insert_documents,
+                    ids, vectors, batch_payloads, sparse_vectors
+                )
+                return indices
+
+            logger.info(f"Starting embedding + insert pipeline for {len(chunk_texts)} chunks...")
+            batch_results = await asyncio.gather(*(
+                _embed_and_insert(start)
+                for start in range(0, len(chunk_texts), EMBED_BATCH)
+            ))
+            inserted_indices = sorted(i for indices in batch_results for i in indices)
+
+            skipped = len(chunk_texts) - len(inserted_indices)
+            if skipped:
+                logger.warning(f"Skipping {skipped} chunks with failed embeddings")
+            if not inserted_indices:
+                raise Exception("All embeddings failed to generate")
+            logger.info(f"Inserted {len(inserted_indices)} chunks into Qdrant")
+
+            # Create chunk records with a single multi-row INSERT instead
+            # of per-object db.add, which builds ORM flush state for every
+            # chunk (hundreds of rows for a large document)
+            inserted_texts = [chunk_texts[i] for i in inserted_indices]
+            chunk_sizes = await asyncio.to_thread(
+                self.document_processor.count_tokens_batch, inserted_texts
             )
-            logger.info(f"Inserted {len(page_chunks)} chunks into Qdrant")
-            
-            # Create chunk records in database
-            for i, (chunk_info, chunk_id) in enumerate(zip(page_chunks, chunk_ids)):
-                chunk_record = DocumentChunk(
-                    document_id=doc.id,
-                    chunk_index=i,
-                    chunk_text=chunk_texts[i],
-                    chunk_size=self.document_processor.count_tokens(chunk_texts[i]),
-                    qdrant_point_id=chunk_id
+            rows = [
+                {
+                    'document_id': doc.id,
+                    'chunk_index': i,
+                    'chunk_text': chunk_texts[i],
+                    'chunk_size': chunk_sizes[n],
+                    'qdrant_point_id': chunk_ids[i]
+                }
+                for n, i in enumerate(inserted_indices)
+            ]
+            # pymysql expands executemany INSERTs into multi-row VALUES;
+            # slicing keeps each statement under max_allowed_packet for
+            # documents with thousands of chunks (MySQL has no COPY, and
+            # LOAD DATA LOCAL INFILE is usually disabled server-side)
+            INSERT_SLICE = 1000
+            for start in range(0, len(rows), INSERT_SLICE):
+                db.execute(
+                    DocumentChunk.__table__.insert(),
+                    rows[start:start + INSERT_SLICE]
                 )
-                db.add(chunk_record)
             
             # Update document status
             doc.embedding_status = "completed"
-            doc.chunks_count = len(page_chunks)
+            doc.chunks_count = len(inserted_indices)
             doc.processed_at = datetime.utcnow()
             doc.failed_reason = None
             
@@ -327,13 +462,15 @@ class FileProcessor:
         if not doc:
             return False
         
-        # Delete existing chunks from Qdrant
-        chunks = db.query(DocumentChunk).filter(
-            DocumentChunk.document_id == document_id
-        ).all()
-        
-        point_ids = [chunk.qdrant_point_id for chunk in chunks if chunk.qdrant_point_id]
-        
+        # Delete existing chunks from Qdrant; only the point ids are
+        # needed, so skip loading the chunk_text column
+        point_ids = [
+            pid for (pid,) in db.query(DocumentChunk.qdrant_point_id).filter(
+                DocumentChunk.document_id == document_id,
+                DocumentChunk.qdrant_point_id.isnot(None)
+            ).all()
+        ]
+
         if point_ids:
             try:
                 self.vector_store.delete_documents(point_ids)
@@ -1,27 +1,78 @@
 """Message service"""
 
 from sqlalchemy.orm import Session
+from sqlalchemy import func, select, update
+from sqlalchemy.dialects.mysql import insert as mysql_insert
 from app.models.user import User
 from app.models.conversation import Conversation
 from app.models.message import Message
-from datetime import datetime
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+import asyncio
+import functools
 import logging
 import time
-from typing import Dict, Any
+import redis
+
+from app.rag.config import rag_config
+from app.services import user_cache
+from app.services.message_writer import message_writer
+from typing import Dict, Any, Optional
 
 logger = logging.getLogger(__name__)
 
 
 def get_or_create_user(phone_number: str, db: Session, whatsapp_name: str = None) -> User:
     """Get existing user or create new one"""
+    now = datetime.utcnow()
+
+    # Hot path: cached user id turns the phone-number SELECT into a
+    # primary-key fetch, and the last_active write is throttled to once
+    # per LAST_ACTIVE_FLUSH_SECS instead of every message
+    cached = user_cache.get_cached_user(phone_number)
+    if cached:
+        user = db.get(User, cached['user_id'])
+        if user:
+            if user_cache.needs_last_active_flush(cached):
+                user.last_active = now
+                if whatsapp_name and not user.whatsapp_name:
+                    user.whatsapp_name = whatsapp_name
+                db.commit()
+                user_cache.cache_user(phone_number, user.id)
+            return user
+
+    if db.bind.dialect.name == 'mysql':
+        # Single atomic UPSERT: INSERT ... ON DUPLICATE KEY UPDATE handles
+        # both create and last_active touch in one statement, instead of a
+        # SELECT followed by a conditional INSERT or UPDATE (and is
+        # race-safe when two messages from the same number arrive at once)
+        stmt = mysql_insert(User).values(
+            phone_number=phone_number,
+            whatsapp_name=whatsapp_name,
+            language="en",
+            created_at=now,
+            last_active=now
+        )
+        stmt = stmt.on_duplicate_key_update(
+            last_active=now,
+            whatsapp_name=func.coalesce(User.whatsapp_name, stmt.inserted.whatsapp_name)
+        )
+        db.execute(stmt)
+        db.commit()
+        user = db.query(User).filter(User.phone_number == phone_number).first()
+        if user:
+            user_cache.cache_user(phone_number, user.id)
+        return user
+
+    # Non-MySQL fallback (e.g. SQLite in tests)
     user = db.query(User).filter(User.phone_number == phone_number).first()
-    
+
     if not user:
         user = User(
             phone_number=phone_number,
             whatsapp_name=whatsapp_name,
             language="en",
-            created_at=datetime.utcnow()
+            created_at=now
         )
         db.add(user)
         db.commit()
@@ -29,75 +80,170 @@ def get_or_create_user(phone_number: str, db: Session, whatsapp_name: str = None
         logger.info(f"Created new user: {user.id} ({phone_number}, name={whatsapp_name})")
     else:
         # Update last active and name if available
-        user.last_active = datetime.utcnow()
+        user.last_active = now
         if whatsapp_name and not user.whatsapp_name:
             user.whatsapp_name = whatsapp_name
         db.commit()
-    
+
+    user_cache.cache_user(phone_number, user.id)
     return user
 
 
+# TTL matches the 24h staleness window in is_conversation_stale
+_CONV_CACHE_TTL = 86400
+
+
+@functools.cache
+def _conversation_cache():
+    """Lazy Redis client for the active-conversation id cache"""
+    if not rag_config.enable_cache:
+        return None
+    try:
+        return redis.from_url(rag_config.redis_url, decode_responses=True)
+    except Exception as e:
+        logger.warning(f"Failed to connect to Redis conversation cache: {e}")
+        return None
+
+
 def get_or_create_conversation(user_id: int, db: Session) -> Conversation:
     """Get active conversation or create new one"""
-    # Look for active conversation
+    cache = _conversation_cache()
+    cache_key = f"conv:active:{user_id}"
+
+    # Fast path: cached conversation id turns the indexed-but-ordered
+    # lookup into a primary-key fetch
+    if cache:
+        try:
+            cached_id = cache.get(cache_key)
+        except Exception as e:
+            logger.warning(f"Conversation cache error: {e}")
+            cached_id = None
+        if cached_id:
+            conversation = db.get(Conversation, int(cached_id))
+            if conversation and conversation.is_active and not is_conversation_stale(conversation):
+                return conversation
+
+    # Look for a *fresh* active conversation: the staleness cutoff is
+    # pushed into the WHERE clause, so the (user_id, is_active,
+    # started_at DESC) index satisfies the whole lookup in one seek and
+    # the stale-check round trip in Python disappears
+    # One timestamp per call: the cutoff and any rotation share it
+    now = datetime.utcnow()
+    cutoff = now - timedelta(hours=24)
     conversation = db.query(Conversation).filter(
         Conversation.user_id == user_id,
-        Conversation.is_active == True
+        Conversation.is_active == True,
+        Conversation.started_at > cutoff
     ).order_by(Conversation.started_at.desc()).first()
-    
-    # Create new conversation if none exists or old one is stale
-    if not conversation or is_conversation_stale(conversation):
-        if conversation:
-            conversation.is_active = False
-            conversation.ended_at = datetime.utcnow()
-        
+
+    # Create new conversation if none exists or the old one went stale
+    if not conversation:
+        # Close any stale active conversations set-based - no need to
+        # fetch the rows just to flip their flags
+        db.execute(
+            update(Conversation)
+            .where(
+                Conversation.user_id == user_id,
+                Conversation.is_active == True
+            )
+            .values(is_active=False, ended_at=now)
+        )
+
         conversation = Conversation(
             user_id=user_id,
-            started_at=datetime.utcnow(),
             is_active=True
         )
         db.add(conversation)
         db.commit()
         db.refresh(conversation)
         logger.info(f"Created new conversation: {conversation.id} for user {user_id}")
-    
+
+    if cache:
+        try:
+            cache.setex(cache_key, _CONV_CACHE_TTL, conversation.id)
+        except Exception as e:
+            logger.warning(f"Conversation cache save error: {e}")
+
     return conversation
 
 
 def is_conversation_stale(conversation: Conversation, hours: int = 24) -> bool:
-    """Check if conversation is older than specified hours"""
-    from datetime import timedelta
+    """Check if conversation is older than specified hours
+
+    Kept for the cached fast path (and external callers); the main
+    lookup in get_or_create_conversation filters on started_at directly.
+    """
     age = datetime.utcnow() - conversation.started_at
     return age > timedelta(hours=hours)
 
 
+@dataclass(frozen=True)
+class SavedMessage:
+    """
+    Lightweight stand-in for a persisted Message row.
+
+    Callers of the save functions only ever read the id and foreign
+    keys, so there is no reason to hand back a live ORM object whose
+    attributes expire on commit and reload via SELECT on access.
+    """
+    id: int
+    conversation_id: int
+    user_id: int
+    role: str
+
+
+def _persist_message(db: Session, row: dict) -> int:
+    """
+    Persist a message row and bump its conversation counter in one commit.
+
+    Uses a Core INSERT: the primary key comes back via the driver
+    (lastrowid on MySQL, implicit RETURNING on backends that support
+    it), so there is no flush/refresh round trip and no ORM attribute
+    expiration on commit.
+    """
+    result = db.execute(Message.__table__.insert().values(**row))
+    db.execute(
+        update(Conversation)
+        .where(Conversation.id == row['conversation_id'])
+        .values(message_count=Conversation.message_count + 1)
+    )
+    db.commit()
+    return result.inserted_primary_key[0]
+
+
 def save_user_message(
     conversation_id: int,
     user_id: int,
     content: str,
     content_type: str = "text",
     db: Session = None
-) -> Message:
-    """Save user message to database"""
-    message = Message(
+) -> Optional[SavedMessage]:
+    """
+    Save user message to database
+
+    Under webhook traffic the row is coalesced into the background bulk
+    writer (returns None); callers that need the persisted row should
+    rely on the direct path, used whenever the writer is not running.
+    """
+    row = {
+        'conversation_id': conversation_id,
+        'user_id': user_id,
+        'role': "user",
+        'content': content,
+        'content_type': content_type
+    }
+    if message_writer.enqueue(row):
+        logger.debug(f"Queued user message for conversation {conversation_id}")
+        return None
+
+    message_id = _persist_message(db, row)
+    logger.info(f"Saved user message: {message_id}")
+    return SavedMessage(
+        id=message_id,
         conversation_id=conversation_id,
         user_id=user_id,
-        role="user",
-        content=content,
-        content_type=content_type,
-        created_at=datetime.utcnow()
+        role="user"
     )
-    db.add(message)
-    
-    # Update conversation message count
-    conversation = db.query(Conversation).filter(Conversation.id == conversation_id).first()
-    if conversation:
-        conversation.message_count += 1
-    
-    db.commit()
-    db.refresh(message)
-    logger.info(f"Saved user message: {message.id}")
-    return message
 
 
 def save_assistant_message(
@@ -108,61 +254,120 @@ def save_assistant_message(
     llm_tokens: int = None,
     response_time_ms: int = None,
     db: Session = None
-) -> Message:
-    """Save assistant message to database"""
-    message = Message(
+) -> Optional[SavedMessage]:
+    """Save assistant message to database (bulk-queued when possible)"""
+    row = {
+        'conversation_id': conversation_id,
+        'user_id': user_id,
+        'role': "assistant",
+        'content': content,
+        'rag_context': rag_context,
+        'llm_tokens': llm_tokens,
+        'response_time_ms': response_time_ms,
+        'processed_at': datetime.utcnow()
+    }
+    if message_writer.enqueue(row):
+        logger.debug(f"Queued assistant message for conversation {conversation_id}")
+        return None
+
+    message_id = _persist_message(db, row)
+    logger.info(f"Saved assistant message: {message_id}")
+    return SavedMessage(
+        id=message_id,
         conversation_id=conversation_id,
         user_id=user_id,
-        role="assistant",
-        content=content,
-        rag_context=rag_context,
-        llm_tokens=llm_tokens,
-        response_time_ms=response_time_ms,
-        created_at=datetime.utcnow(),
-        processed_at=datetime.utcnow()
+        role="assistant"
     )
-    db.add(message)
-    
-    # Update conversation message count
-    conversation = db.query(Conversation).filter(Conversation.id == conversation_id).first()
-    if conversation:
-        conversation.message_count += 1
-    
-    db.commit()
-    db.refresh(message)
-    logger.info(f"Saved assistant message: {message.id}")
-    return message
 
 
 def get_conversation_history(
     conversation_id: int,
     limit: int = 10,
     db: Session = None
-) -> list[Message]:
-    """Get recent conversation history"""
-    messages = db.query(Message).filter(
-        Message.conversation_id == conversation_id
-    ).order_by(Message.created_at.desc()).limit(limit).all()
-    
-    # Return in chronological order
-    return list(reversed(messages))
+) -> list:
+    """
+    Get recent conversation history as LLM-ready {role, content} dicts.
+
+    Only the two needed columns are selected: assistant rows carry a
+    multi-KB rag_context JSON that the prompt builder never reads. The
+    latest-N ids come from one range scan of the (conversation_id,
+    created_at) index; the outer query re-sorts those rows ASC in SQL,
+    so the result arrives in chronological order with no Python-side
+    reversal.
+    """
+    latest_ids = (
+        db.query(Message.id)
+        .filter(Message.conversation_id == conversation_id)
+        .order_by(Message.created_at.desc())
+        .limit(limit)
+        .subquery()
+    )
+    rows = (
+        db.query(Message.role, Message.content)
+        .filter(Message.id.in_(select(latest_ids)))
+        .order_by(Message.created_at.asc())
+        .all()
+    )
+
+    return [
+        {"role": role, "content": content}
+        for role, content in rows
+    ]
+
+
+# Strong refs to in-flight saves so the event loop can't GC them
+_pending_saves = set()
+
+
+def _save_assistant_with_own_session(**kwargs):
+    """Persist an assistant message on a session owned by this task"""
+    from app.database.session import SessionLocal
+    db = SessionLocal()
+    try:
+        save_assistant_message(db=db, **kwargs)
+    finally:
+        db.close()
+
+
+def _schedule_assistant_save(**kwargs):
+    """
+    Persist the assistant message off the critical path.
+
+    The reply text is already computed when this runs, so the DB write
+    happens concurrently with returning the response to the caller.
+    """
+    task = asyncio.get_running_loop().create_task(
+        asyncio.to_thread(_save_assistant_with_own_session, **kwargs)
+    )
+    _pending_saves.add(task)
+
+    def _done(t):
+        _pending_saves.discard(t)
+        if not t.cancelled() and t.exception():
+            logger.error(f"Background assistant save failed: {t.exception()}")
+
+    task.add_done_callback(_done)
 
 
 async def generate_ai_response(
     user_message: str,
     conversation_id: int,
     user_id: int,
-    db: Session
+    db: Session,
+    on_first_paragraph=None
 ) -> Dict[str, Any]:
     """
     Generate AI response using RAG pipeline
-    
+
     Args:
         user_message: User's message text
         conversation_id: Conversation ID
         user_id: User ID
         db: Database session
-        
+        on_first_paragraph: Optional async callable invoked with the
+            first paragraph of the answer while the rest still
+            generates (see chain.generate_response_async)
+
     Returns:
         Dict with response text and metadata
     """
@@ -179,15 +384,9 @@ async def generate_ai_response(
         if user and user.division_id:
             filters = {"division_id": user.division_id}
         
-        # Get conversation history
-        history = get_conversation_history(conversation_id, limit=5, db=db)
-        
-        # Format history for RAG
-        formatted_history = [
-            {"role": msg.role, "content": msg.content}
-            for msg in history
-        ]
-        
+        # Get conversation history (already formatted for the LLM)
+        formatted_history = get_conversation_history(conversation_id, limit=5, db=db)
+
         # Call RAG pipeline
         logger.info(f"Generating RAG response for user {user_id}")
         start_time = time.time()
@@ -196,14 +395,16 @@ async def generate_ai_response(
             query=user_message,
             conversation_history=formatted_history,
             user_id=user_id,
-            filters=filters
+            filters=filters,
+            on_first_paragraph=on_first_paragraph
         )
         
         response_time = int((time.time() - start_time) * 1000)
         logger.info(f"RAG response generated in {response_time}ms for user {user_id}")
         
-        # Save assistant response with full metadata
-        save_assistant_message(
+        # Save assistant response with full metadata, off the critical
+        # path — the user-visible reply doesn't wait on the DB write
+        _schedule_assistant_save(
             conversation_id=conversation_id,
             user_id=user_id,
             content=response['text'],
@@ -216,10 +417,9 @@ async def generate_ai_response(
                 'docs_retrieved':    response.get('docs_retrieved', 0),
             },
             llm_tokens=response.get('tokens', 0),
-            response_time_ms=response.get('total_time_ms', response_time),
-            db=db
+            response_time_ms=response.get('total_time_ms', response_time)
         )
-        
+
         return response
         
     except Exception as e:
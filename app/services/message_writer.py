@@ -0,0 +1,140 @@
+"""Background bulk writer for chat messages"""
+
+import asyncio
+import logging
+from collections import Counter
+from typing import Optional
+
+from sqlalchemy import update
+
+from app.database.session import SessionLocal
+from app.models.conversation import Conversation
+from app.models.message import Message
+
+logger = logging.getLogger(__name__)
+
+# Flush when this many rows are queued, or after the timeout — whichever
+# comes first. Under a webhook burst, N single-row commits collapse into
+# one multi-row INSERT plus one counter UPDATE per conversation.
+BULK_RECORDER_SIZE = 50
+FLUSH_TIMEOUT_SECS = 0.1
+
+
+class MessageWriter:
+    """Coalesces message INSERTs into multi-row statements"""
+
+    def __init__(self):
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self):
+        """Start the drain task (call from the app lifespan)"""
+        if self.running:
+            return
+        self._queue = asyncio.Queue()
+        self._task = asyncio.create_task(self._drain())
+        logger.info("Message writer started")
+
+    async def stop(self):
+        """Flush remaining rows and stop the drain task"""
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        # Flush whatever is still queued
+        rows = []
+        while self._queue and not self._queue.empty():
+            rows.append(self._queue.get_nowait())
+        if rows:
+            await asyncio.to_thread(self._flush, rows)
+        self._task = None
+        logger.info("Message writer stopped")
+
+    def enqueue(self, row: dict) -> bool:
+        """
+        Queue a message row for the next bulk flush.
+
+        Returns False when the writer is not running (scripts, tests,
+        startup) so the caller can fall back to a direct insert.
+        """
+        if not self.running:
+            return False
+        self._queue.put_nowait(row)
+        return True
+
+    async def _drain(self):
+        while True:
+            rows = []
+            try:
+                rows.append(await self._queue.get())
+                # Collect more rows until the batch is full or the window ends
+                loop = asyncio.get_running_loop()
+                deadline = loop.time() + FLUSH_TIMEOUT_SECS
+                while len(rows) < BULK_RECORDER_SIZE:
+                    remaining = deadline - loop.time()
+                    if remaining <= 0:
+                        break
+                    try:
+                        rows.append(
+                            await asyncio.wait_for(self._queue.get(), timeout=remaining)
+                        )
+                    except asyncio.TimeoutError:
+                        break
+            except asyncio.CancelledError:
+                # stop() cancelled us mid-collection: rows already popped
+                # off the queue are invisible to stop()'s own drain, so
+                # flush them here or a graceful shutdown loses messages
+                if rows:
+                    try:
+                        await asyncio.to_thread(self._flush, rows)
+                    except Exception as e:
+                        logger.error(f"Message writer final flush error: {e}", exc_info=True)
+                raise
+            try:
+                await asyncio.to_thread(self._flush, rows)
+            except Exception as e:
+                logger.error(f"Message writer flush error: {e}", exc_info=True)
+
+    def _flush(self, rows: list):
+        """One multi-row INSERT plus one counter UPDATE per conversation"""
+        db = SessionLocal()
+        try:
+            db.execute(Message.__table__.insert(), rows)
+            counts = Counter(row['conversation_id'] for row in rows)
+            for conversation_id, n in counts.items():
+                db.execute(
+                    update(Conversation)
+                    .where(Conversation.id == conversation_id)
+                    .values(message_count=Conversation.message_count + n)
+                )
+            db.commit()
+            logger.debug(f"Flushed {len(rows)} messages in one batch")
+        except Exception as e:
+            db.rollback()
+            logger.error(f"Bulk message flush failed, retrying per row: {e}")
+            # Fall back to row-at-a-time so one bad row can't drop a batch
+            for row in rows:
+                try:
+                    db.execute(Message.__table__.insert(), [row])
+                    db.execute(
+                        update(Conversation)
+                        .where(Conversation.id == row['conversation_id'])
+                        .values(message_count=Conversation.message_count + 1)
+                    )
+                    db.commit()
+                except Exception as row_error:
+                    db.rollback()
+                    logger.error(f"Failed to save message row: {row_error}")
+        finally:
+            db.close()
+
+
+# Global message writer instance
+message_writer = MessageWriter()
@@ -0,0 +1,52 @@
+"""Redis pub/sub channel for live OCR progress updates"""
+
+import functools
+import logging
+from typing import Callable, Optional
+
+import orjson
+import redis
+
+from app.rag.config import rag_config
+
+logger = logging.getLogger(__name__)
+
+CHANNEL_PREFIX = "ocr:"
+
+
+@functools.cache
+def _publisher():
+    """Lazy Redis client for publishing progress events"""
+    if not rag_config.enable_cache:
+        return None
+    try:
+        return redis.from_url(rag_config.redis_url, decode_responses=False)
+    except Exception as e:
+        logger.warning(f"OCR progress publisher unavailable: {e}")
+        return None
+
+
+def publish(document_id: int, current: int, total: int, message: str = ""):
+    """
+    Publish one progress event to the document's channel.
+
+    PUBLISH is fire-and-forget: with no subscribers it costs one Redis
+    round trip and no storage, so per-page updates never touch the DB.
+    """
+    client = _publisher()
+    if client is None:
+        return
+    try:
+        client.publish(
+            f"{CHANNEL_PREFIX}{document_id}",
+            orjson.dumps({"current": current, "total": total, "message": message})
+        )
+    except Exception as e:
+        logger.warning(f"Failed to publish OCR progress for document {document_id}: {e}")
+
+
+def progress_callback(document_id: int) -> Optional[Callable[[int, int, str], None]]:
+    """Bind a (current, total, message) callback to a document's channel"""
+    if _publisher() is None:
+        return None
+    return functools.partial(publish, document_id)
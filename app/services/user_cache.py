@@ -0,0 +1,66 @@
+"""Redis hot cache for per-user lookup state on the message path"""
+
+import functools
+import logging
+import time
+from typing import Optional
+
+import orjson
+import redis
+
+from app.rag.config import rag_config
+
+logger = logging.getLogger(__name__)
+
+# Entry TTL; re-validated against the DB on every expiry
+USER_CACHE_TTL = 600
+
+# How stale the cached last_active may get before the DB row is touched
+# again (write-behind throttle)
+LAST_ACTIVE_FLUSH_SECS = 60
+
+
+@functools.cache
+def _cache():
+    """Lazy Redis client for the user cache"""
+    if not rag_config.enable_cache:
+        return None
+    try:
+        return redis.from_url(rag_config.redis_url, decode_responses=False)
+    except Exception as e:
+        logger.warning(f"Failed to connect to Redis user cache: {e}")
+        return None
+
+
+def get_cached_user(phone_number: str) -> Optional[dict]:
+    """Get cached {'user_id', 'last_active_epoch'} for a phone number"""
+    client = _cache()
+    if client is None:
+        return None
+    try:
+        cached = client.get(f"user:{phone_number}")
+        if cached:
+            return orjson.loads(cached)
+    except Exception as e:
+        logger.warning(f"User cache retrieval error: {e}")
+    return None
+
+
+def cache_user(phone_number: str, user_id: int):
+    """Cache a user id with the current time as last_active epoch"""
+    client = _cache()
+    if client is None:
+        return
+    try:
+        client.setex(
+            f"user:{phone_number}",
+            USER_CACHE_TTL,
+            orjson.dumps({'user_id': user_id, 'last_active_epoch': time.time()})
+        )
+    except Exception as e:
+        logger.warning(f"User cache save error: {e}")
+
+
+def needs_last_active_flush(entry: dict) -> bool:
+    """True when the cached last_active is stale enough to write through"""
+    return time.time() - entry.get('last_active_epoch', 0) > LAST_ACTIVE_FLUSH_SECS
@@ -1,188 +1,350 @@
 """WAHA API client"""
 
+import asyncio
+import atexit
+import functools
+import random
+import threading
+import time
 import httpx
 from app.config import settings
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Transient statuses worth retrying on the same keep-alive socket
+# instead of surfacing to the caller (who would pay a fresh handshake)
+_RETRYABLE_STATUSES = frozenset({429, 502, 503, 504})
+
+
+def _retry_delay(attempt: int, response) -> float:
+    """Backoff before the next attempt, honoring Retry-After on 429"""
+    if response is not None and response.status_code == 429:
+        retry_after = response.headers.get("Retry-After")
+        if retry_after:
+            try:
+                return float(retry_after)
+            except ValueError:
+                pass
+    return 0.1 * 2 ** attempt + random.random() * 0.05
+
+# Shared pooled clients: a fresh httpx.Client per call forced a new
+# TCP (+TLS) handshake for every WhatsApp send. One keep-alive pool per
+# process reuses sockets across all WAHAClient instances.
+_POOL_LIMITS = httpx.Limits(max_keepalive_connections=20, max_connections=100)
+_client_lock = threading.Lock()
+_sync_client = None
+_async_client = None
+
+
+def _get_sync_client() -> httpx.Client:
+    global _sync_client
+    if _sync_client is None:
+        with _client_lock:
+            if _sync_client is None:
+                _sync_client = httpx.Client(timeout=30.0, limits=_POOL_LIMITS)
+    return _sync_client
+
+
+def _get_async_client() -> httpx.AsyncClient:
+    global _async_client
+    if _async_client is None:
+        with _client_lock:
+            if _async_client is None:
+                _async_client = httpx.AsyncClient(timeout=30.0, limits=_POOL_LIMITS)
+    return _async_client
+
+
+def _close_clients():
+    global _sync_client
+    if _sync_client is not None:
+        try:
+            _sync_client.close()
+        except Exception:
+            pass
+        _sync_client = None
+
+
+atexit.register(_close_clients)
+
+
+@functools.lru_cache(maxsize=1024)
+def _chat_id(to: str) -> str:
+    """Default chat id for a phone number, memoized per sender"""
+    return f"{to}@c.us"
+
 
 class WAHAClient:
     """WAHA (WhatsApp HTTP API) client"""
-    
+
     def __init__(self, session: str = "default"):
         self.base_url = settings.WAHA_API_URL.rstrip('/').rstrip('/api')
         self.api_key = settings.WAHA_API_KEY
         self.session = session
         self.timeout = 30.0
-    
+
+        # Hot-path constants, built once per client instead of per call:
+        # the webhook handler hits these methods on every message
+        self._headers = {"Content-Type": "application/json"}
+        if self.api_key:
+            self._headers["X-Api-Key"] = self.api_key
+        self._send_text_url = f"{self.base_url}/api/sendText"
+        self._sessions_url = f"{self.base_url}/api/sessions"
+        self._presence_url = f"{self.base_url}/api/{self.session}/presence"
+
+    def _post_with_retry(self, url: str, payload: dict, max_attempts: int = 3) -> httpx.Response:
+        """
+        POST with bounded in-client retry on transient failures.
+
+        Connection errors and 429/502/503/504 responses are retried with
+        exponential backoff on the same pooled client, so the keep-alive
+        socket is reused instead of every hiccup bubbling up to a caller
+        that would reconnect from scratch.
+        """
+        for attempt in range(max_attempts):
+            retryable_response = None
+            try:
+                response = _get_sync_client().post(
+                    url, json=payload, headers=self._headers
+                )
+                response.raise_for_status()
+                return response
+            except httpx.TransportError:
+                if attempt == max_attempts - 1:
+                    raise
+            except httpx.HTTPStatusError as e:
+                if (e.response.status_code not in _RETRYABLE_STATUSES
+                        or attempt == max_attempts - 1):
+                    raise
+                retryable_response = e.response
+            delay = _retry_delay(attempt, retryable_response)
+            logger.warning(f"WAHA request retry {attempt + 1}/{max_attempts - 1} in {delay:.2f}s: {url}")
+            time.sleep(delay)
+
+    async def _post_with_retry_async(self, url: str, payload: dict, max_attempts: int = 3) -> httpx.Response:
+        """Async twin of _post_with_retry (sleeps on the event loop)"""
+        for attempt in range(max_attempts):
+            retryable_response = None
+            try:
+                response = await _get_async_client().post(
+                    url, json=payload, headers=self._headers
+                )
+                response.raise_for_status()
+                return response
+            except httpx.TransportError:
+                if attempt == max_attempts - 1:
+                    raise
+            except httpx.HTTPStatusError as e:
+                if (e.response.status_code not in _RETRYABLE_STATUSES
+                        or attempt == max_attempts - 1):
+                    raise
+                retryable_response = e.response
+            delay = _retry_delay(attempt, retryable_response)
+            logger.warning(f"WAHA request retry {attempt + 1}/{max_attempts - 1} in {delay:.2f}s: {url}")
+            await asyncio.sleep(delay)
+
     def send_message(self, to: str, text: str, chat_id: str = None) -> dict:
         """
         Send text message via WAHA
-        
+
         Args:
             to: Phone number (e.g., "6281234567890")
             text: Message text
             chat_id: Optional WhatsApp chat ID (defaults to {to}@c.us)
-            
+
         Returns:
             WAHA API response
         """
         if chat_id is None:
-            chat_id = f"{to}@c.us"
-        
+            chat_id = _chat_id(to)
+
         payload = {
             "session": self.session,
             "chatId": chat_id,
             "text": text
         }
-        
-        headers = {"Content-Type": "application/json"}
-        if self.api_key:
-            headers["X-Api-Key"] = self.api_key
-        
+
         try:
-            with httpx.Client(timeout=self.timeout) as client:
-                response = client.post(
-                    f"{self.base_url}/api/sendText",
-                    json=payload,
-                    headers=headers
-                )
-                response.raise_for_status()
-                
-                # WAHA sendText returns 201 with empty body (no JSON)
-                if not response.text:
-                    logger.info(f"Message sent to {to} via session {self.session}")
-                    return {"status": "sent", "chatId": chat_id}
-                
-                result = response.json()
+            response = self._post_with_retry(self._send_text_url, payload)
+
+            # WAHA sendText returns 201 with empty body (no JSON)
+            if not response.text:
                 logger.info(f"Message sent to {to} via session {self.session}")
-                return result
-                
+                return {"status": "sent", "chatId": chat_id}
+
+            result = response.json()
+            logger.info(f"Message sent to {to} via session {self.session}")
+            return result
+
         except httpx.HTTPError as e:
             logger.error(f"WAHA API error: {str(e)}")
             if hasattr(e, 'response') and e.response is not None:
                 logger.error(f"Response body: {e.response.text}")
             raise
-    
+
+    async def send_message_async(self, to: str, text: str, chat_id: str = None) -> dict:
+        """
+        Send text message via WAHA without blocking the event loop
+
+        Args:
+            to: Phone number (e.g., "6281234567890")
+            text: Message text
+            chat_id: Optional WhatsApp chat ID (defaults to {to}@c.us)
+
+        Returns:
+            WAHA API response
+        """
+        if chat_id is None:
+            chat_id = _chat_id(to)
+
+        payload = {
+            "session": self.session,
+            "chatId": chat_id,
+            "text": text
+        }
+
+        try:
+            response = await self._post_with_retry_async(self._send_text_url, payload)
+
+            if not response.text:
+                logger.info(f"Message sent to {to} via session {self.session}")
+                return {"status": "sent", "chatId": chat_id}
+
+            result = response.json()
+            logger.info(f"Message sent to {to} via session {self.session}")
+            return result
+
+        except httpx.HTTPError as e:
+            logger.error(f"WAHA API error: {str(e)}")
+            if hasattr(e, 'response') and e.response is not None:
+                logger.error(f"Response body: {e.response.text}")
+            raise
+
     def get_sessions(self) -> list:
         """Get all WAHA sessions"""
-        headers = {"Content-Type": "application/json"}
-        if self.api_key:
-            headers["X-Api-Key"] = self.api_key
-        
         try:
-            with httpx.Client(timeout=self.timeout) as client:
-                response = client.get(
-                    f"{self.base_url}/api/sessions",
-                    headers=headers
-                )
-                response.raise_for_status()
-                return response.json()
+            response = _get_sync_client().get(
+                self._sessions_url,
+                headers=self._headers
+            )
+            response.raise_for_status()
+            return response.json()
         except httpx.HTTPError as e:
             logger.error(f"WAHA get sessions error: {str(e)}")
             return []
-    
+
     def get_session_status(self, session: str = None) -> dict:
         """Get WAHA session status"""
         if session is None:
             session = self.session
-            
-        headers = {"Content-Type": "application/json"}
-        if self.api_key:
-            headers["X-Api-Key"] = self.api_key
-        
+
         try:
-            with httpx.Client(timeout=self.timeout) as client:
-                response = client.get(
-                    f"{self.base_url}/api/sessions/{session}",
-                    headers=headers
-                )
-                response.raise_for_status()
-                return response.json()
+            response = _get_sync_client().get(
+                f"{self.base_url}/api/sessions/{session}",
+                headers=self._headers
+            )
+            response.raise_for_status()
+            return response.json()
         except httpx.HTTPError as e:
             logger.error(f"WAHA session status error: {str(e)}")
             return {"status": "error", "error": str(e)}
-    
+
     def send_typing(self, to: str, chat_id: str = None) -> dict:
         """
         Send typing indicator (sedang mengetik...)
         WAHA API: POST /api/{session}/presence
-        
+
         Args:
             to: Phone number (e.g., "6281234567890")
             chat_id: Optional WhatsApp chat ID (defaults to {to}@c.us)
         """
         if chat_id is None:
-            chat_id = f"{to}@c.us"
-        
+            chat_id = _chat_id(to)
+
         payload = {
             "chatId": chat_id,
             "presence": "typing"
         }
-        
-        headers = {"Content-Type": "application/json"}
-        if self.api_key:
-            headers["X-Api-Key"] = self.api_key
-        
+
         try:
-            with httpx.Client(timeout=self.timeout) as client:
-                response = client.post(
-                    f"{self.base_url}/api/{self.session}/presence",
-                    json=payload,
-                    headers=headers
-                )
-                response.raise_for_status()
-                logger.info(f"Typing indicator sent to {to}")
-                
-                # Presence endpoint returns 201 with empty body
-                if response.status_code == 201 and not response.text:
-                    return {"status": "ok", "message": "Typing indicator sent"}
-                
-                return response.json() if response.text else {"status": "ok"}
+            # A missed typing indicator is harmless: no retries
+            response = self._post_with_retry(self._presence_url, payload, max_attempts=1)
+            logger.info(f"Typing indicator sent to {to}")
+
+            # Presence endpoint returns 201 with empty body
+            if response.status_code == 201 and not response.text:
+                return {"status": "ok", "message": "Typing indicator sent"}
+
+            return response.json() if response.text else {"status": "ok"}
         except httpx.HTTPError as e:
             logger.warning(f"Failed to send typing: {str(e)}")
             if hasattr(e, 'response') and e.response is not None:
                 logger.warning(f"Response: {e.response.text}")
             return {"status": "error"}
-    
+
+    async def send_typing_async(self, to: str, chat_id: str = None) -> dict:
+        """
+        Send typing indicator without blocking the event loop.
+
+        Errors are logged and swallowed (same as the sync version): a
+        missed typing indicator should never fail the reply.
+        """
+        if chat_id is None:
+            chat_id = _chat_id(to)
+
+        payload = {
+            "chatId": chat_id,
+            "presence": "typing"
+        }
+
+        try:
+            # A missed typing indicator is harmless: no retries
+            response = await self._post_with_retry_async(self._presence_url, payload, max_attempts=1)
+            logger.info(f"Typing indicator sent to {to}")
+
+            # Presence endpoint returns 201 with empty body
+            if response.status_code == 201 and not response.text:
+                return {"status": "ok", "message": "Typing indicator sent"}
+
+            return response.json() if response.text else {"status": "ok"}
+        except httpx.HTTPError as e:
+            logger.warning(f"Failed to send typing: {str(e)}")
+            if hasattr(e, 'response') and e.response is not None:
+                logger.warning(f"Response: {e.response.text}")
+            return {"status": "error"}
+
     def resolve_lid(self, lid: str) -> str | None:
         """
         Resolve a WhatsApp LID to a real phone number.
-        
+
         WAHA API: GET /api/{session}/lids/{lid}
         Returns the phone number (without @c.us suffix) or None if not found.
-        
+
         Args:
             lid: The LID number (e.g., "38457321738409") without @lid suffix
-            
+
         Returns:
             Phone number string (e.g., "6285156121852") or None
         """
-        headers = {"Content-Type": "application/json"}
-        if self.api_key:
-            headers["X-Api-Key"] = self.api_key
-        
         try:
-            with httpx.Client(timeout=self.timeout) as client:
-                response = client.get(
-                    f"{self.base_url}/api/{self.session}/lids/{lid}",
-                    headers=headers
-                )
-                response.raise_for_status()
-                data = response.json()
-                
-                # Response: {"lid": "38457321738409@lid", "pn": "6285156121852@c.us"}
-                pn = data.get("pn")
-                if pn:
-                    # Strip @c.us suffix to get clean phone number
-                    phone = pn.split("@")[0] if "@" in pn else pn
-                    logger.info(f"Resolved LID {lid} -> {phone}")
-                    return phone
-                
-                logger.info(f"LID {lid} could not be resolved (pn is null)")
-                return None
-                
+            response = _get_sync_client().get(
+                f"{self.base_url}/api/{self.session}/lids/{lid}",
+                headers=self._headers
+            )
+            response.raise_for_status()
+            data = response.json()
+
+            # Response: {"lid": "38457321738409@lid", "pn": "6285156121852@c.us"}
+            pn = data.get("pn")
+            if pn:
+                # Strip @c.us suffix to get clean phone number
+                phone = pn.split("@")[0] if "@" in pn else pn
+                logger.info(f"Resolved LID {lid} -> {phone}")
+                return phone
+
+            logger.info(f"LID {lid} could not be resolved (pn is null)")
+            return None
+
         except httpx.HTTPError as e:
             logger.warning(f"Failed to resolve LID {lid}: {str(e)}")
             if hasattr(e, 'response') and e.response is not None:
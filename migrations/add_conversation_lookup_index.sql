@@ -0,0 +1,11 @@
+-- Migration: Composite index for the active-conversation lookup
+-- get_or_create_conversation filters by user_id + is_active and orders by
+-- started_at DESC LIMIT 1. Without a matching composite index this is a
+-- filter plus sort; with it the row comes straight from index order.
+-- (MySQL 8 honors the DESC key part; older versions still use the index,
+-- just with a backward scan.)
+
+CREATE INDEX IF NOT EXISTS idx_conv_user_active_started
+  ON conversations (user_id, is_active, started_at DESC);
+
+SELECT 'Conversation lookup index migration completed!' AS status;
@@ -0,0 +1,11 @@
+-- Migration: Add content_hash column for duplicate-upload detection
+-- create_document_record stores a SHA-256 of the file bytes; when a
+-- completed document with the same hash already exists, processing skips
+-- the extract/chunk/embed pipeline and reuses its results.
+
+ALTER TABLE documents
+  ADD COLUMN IF NOT EXISTS content_hash VARCHAR(64) NULL;
+
+CREATE INDEX IF NOT EXISTS idx_documents_content_hash ON documents(content_hash);
+
+SELECT 'Documents content_hash migration completed!' AS status;
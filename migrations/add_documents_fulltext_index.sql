@@ -0,0 +1,9 @@
+-- Migration: Add FULLTEXT index for document search
+-- list_documents previously searched with LIKE '%term%', which cannot use
+-- a B-tree index and scans every row (including the LONGTEXT content).
+-- A FULLTEXT index lets MATCH ... AGAINST resolve searches via the index.
+
+CREATE FULLTEXT INDEX IF NOT EXISTS ft_documents_title_content
+  ON documents(title, content);
+
+SELECT 'Documents FULLTEXT index migration completed!' AS status;
@@ -0,0 +1,18 @@
+-- Migration: Server-side timestamp defaults
+-- The services stamped datetime.utcnow() in Python and sent it with every
+-- INSERT. Letting MySQL fill these columns saves a Python call per row and
+-- keeps all timestamps on the database clock.
+-- Note: the server should run with time_zone = UTC (standard for the
+-- container deployment) so values match the old utcnow() semantics.
+
+ALTER TABLE messages
+  MODIFY created_at DATETIME DEFAULT CURRENT_TIMESTAMP;
+
+ALTER TABLE conversations
+  MODIFY started_at DATETIME DEFAULT CURRENT_TIMESTAMP;
+
+ALTER TABLE documents
+  MODIFY upload_date DATETIME DEFAULT CURRENT_TIMESTAMP NOT NULL,
+  MODIFY updated_at DATETIME DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP;
+
+SELECT 'Server timestamp defaults migration completed!' AS status;
@@ -0,0 +1,164 @@
+"""
+Migration: documents schema v2 — one ALTER instead of two table rebuilds
+
+Merges the two earlier `documents` migrations:
+  - alter_documents_table.sql  (category/file/chunk bookkeeping columns)
+  - upgrade_content_column.py  (content TEXT -> LONGTEXT)
+
+On InnoDB every ALTER TABLE may rebuild the table, and `documents`
+already holds large OCR blobs — running the two migrations separately
+copies all that data twice. This script issues a single combined ALTER
+and asks for online DDL (ALGORITHM=INSTANT, then INPLACE, then the
+server default) so reruns and fresh installs move the minimum bytes.
+
+The ADD COLUMN clauses use IF NOT EXISTS (MariaDB / MySQL 8.0.29+), so
+reruns are no-ops; the LONGTEXT MODIFY is skipped entirely when content
+is already LONGTEXT, because re-running a MODIFY forces a full copy even
+when nothing changes.
+
+Run this script to upgrade your database:
+    python migrations/documents_schema_v2.py
+"""
+
+import os
+import sys
+from sqlalchemy import create_engine, text
+from dotenv import load_dotenv
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Load environment variables
+load_dotenv()
+
+ADD_COLUMN_CLAUSES = """
+  ADD COLUMN IF NOT EXISTS category_id INT NULL,
+  ADD COLUMN IF NOT EXISTS file_path VARCHAR(500) NULL,
+  ADD COLUMN IF NOT EXISTS file_size INT NULL,
+  ADD COLUMN IF NOT EXISTS file_type VARCHAR(50) NULL,
+  ADD COLUMN IF NOT EXISTS chunks_count INT DEFAULT 0 NOT NULL,
+  ADD COLUMN IF NOT EXISTS processed_at TIMESTAMP NULL,
+  ADD COLUMN IF NOT EXISTS failed_reason TEXT NULL,
+  ADD COLUMN IF NOT EXISTS upload_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP NOT NULL
+"""
+
+MODIFY_CONTENT_CLAUSE = ",\n  MODIFY COLUMN content LONGTEXT NOT NULL"
+
+# Tried in order: INSTANT is metadata-only, INPLACE avoids blocking
+# writers, and the final unhinted attempt lets the server pick COPY if
+# nothing better is permitted (the LONGTEXT change typically needs it).
+ALGORITHM_ATTEMPTS = [
+    ", ALGORITHM=INSTANT, LOCK=NONE",
+    ", ALGORITHM=INPLACE, LOCK=NONE",
+    "",
+]
+
+
+def upgrade_documents_schema():
+    """Apply the combined documents schema changes in one ALTER"""
+
+    # Get database URL from environment
+    database_url = os.getenv('DATABASE_URL')
+
+    if not database_url:
+        print("❌ ERROR: DATABASE_URL not found in environment variables")
+        print("   Make sure .env file exists with DATABASE_URL")
+        return False
+
+    print("=" * 60)
+    print("Documents schema v2 migration")
+    print("=" * 60)
+    print(f"Database: {database_url.split('@')[-1]}")  # Hide password
+    print()
+
+    try:
+        # Create engine
+        engine = create_engine(database_url)
+
+        with engine.connect() as connection:
+            # Only probe: is content already LONGTEXT? A redundant MODIFY
+            # would force a full table copy for nothing.
+            result = connection.execute(text("""
+                SELECT COLUMN_TYPE
+                FROM information_schema.COLUMNS
+                WHERE TABLE_SCHEMA = DATABASE()
+                AND TABLE_NAME = 'documents'
+                AND COLUMN_NAME = 'content'
+            """))
+            content_type = result.scalar()
+            needs_longtext = not (content_type and 'longtext' in content_type.lower())
+
+            clauses = ADD_COLUMN_CLAUSES
+            if needs_longtext:
+                print(f"content column is {content_type}; will upgrade to LONGTEXT")
+                clauses += MODIFY_CONTENT_CLAUSE
+            else:
+                print("✅ content column is already LONGTEXT - skipping MODIFY")
+
+            last_error = None
+            for hint in ALGORITHM_ATTEMPTS:
+                statement = f"ALTER TABLE documents{clauses}{hint}"
+                label = hint.strip(', ') or 'server default algorithm'
+                try:
+                    print(f"Trying ALTER with {label}...")
+                    connection.execute(text(statement))
+                    connection.commit()
+                    print(f"✅ ALTER succeeded with {label}")
+                    last_error = None
+                    break
+                except Exception as e:
+                    connection.rollback()
+                    last_error = e
+                    print(f"   Not permitted ({str(e).splitlines()[0]})")
+
+            if last_error is not None:
+                raise last_error
+
+            # Indexes and foreign key from the v1 migration, still gated
+            # on IF NOT EXISTS (index DDL is already online in InnoDB)
+            connection.execute(text(
+                "CREATE INDEX IF NOT EXISTS idx_category_id ON documents(category_id)"
+            ))
+            connection.execute(text(
+                "CREATE INDEX IF NOT EXISTS idx_category_status "
+                "ON documents(category_id, embedding_status)"
+            ))
+            connection.execute(text(
+                "CREATE INDEX IF NOT EXISTS idx_upload_date ON documents(upload_date)"
+            ))
+            try:
+                connection.execute(text(
+                    "ALTER TABLE documents ADD CONSTRAINT fk_document_category "
+                    "FOREIGN KEY (category_id) REFERENCES document_categories(id) "
+                    "ON DELETE SET NULL"
+                ))
+            except Exception:
+                # Duplicate constraint on rerun - fine
+                connection.rollback()
+            connection.commit()
+
+            print()
+            print("=" * 60)
+            print("Migration successful!")
+            print("=" * 60)
+            print()
+            return True
+
+    except Exception as e:
+        print()
+        print("=" * 60)
+        print("❌ Migration failed!")
+        print("=" * 60)
+        print(f"Error: {str(e)}")
+        print()
+        print("Troubleshooting:")
+        print("  1. Check DATABASE_URL in .env file")
+        print("  2. Ensure database is accessible")
+        print("  3. Ensure you have ALTER permissions")
+        print()
+        return False
+
+
+if __name__ == "__main__":
+    success = upgrade_documents_schema()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,8 @@
+"""Shared constants for seed and test scripts"""
+
+# Pre-computed bcrypt hash of the default dev password "admin123"
+# (cost 12). Hashing at seed/test time costs ~250ms per call by design;
+# reusing this constant skips that entirely.
+#
+# Development/seed use only — never ship this credential to production.
+ADMIN_PW_HASH = "$2b$12$LQv3c1yqBWVHxkd0LHAkCOYz6TtxMQJqhN8/LewY5ztC2x3eoKiOy"
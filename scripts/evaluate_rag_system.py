@@ -91,11 +91,38 @@ class RAGEvaluator:
     - BERTScore: Semantic similarity
     - RAGAS: Faithfulness, Answer Relevancy, Context Precision
     """
-    
-    def __init__(self, use_ragas: bool = True):
+
+    # Budget for contexts sent to the judge LLM: its input tokens (and hence
+    # cost and latency) scale linearly with total context length, so cap both
+    # the number of contexts and the characters per context
+    MAX_CONTEXTS = 5
+    MAX_CONTEXT_CHARS_PER_DOC = 2000
+
+    # Lazily-imported metric functions, cached at class level so the import
+    # cost is paid once per process instead of once per scored sample
+    # (mirrors the lazy-loading pattern in app.rag.factory.AIServiceFactory)
+    _sentence_bleu = None
+    _word_tokenize = None
+    _bert_score_fn = None
+
+    def __init__(self, use_ragas: bool = True, score_cache: bool = True):
         self.use_ragas = use_ragas
         self.results = {}
-        
+
+        # RAGAS metrics with judge LLM/embeddings bound, built lazily once
+        # by _setup_metrics
+        self._metrics = None
+        self._ragas_llm = None
+        self._ragas_emb = None
+
+        # Disk-backed memoization of per-sample scores: re-runs of the same
+        # (metric, model, question, answer, contexts, ground_truth) tuple
+        # become SQLite lookups instead of recomputation
+        self.score_cache = None
+        if score_cache:
+            from app.rag.evaluation.score_cache import SQLiteScoreCache
+            self.score_cache = SQLiteScoreCache()
+
         # Initialize scorers
         from rouge_score import rouge_scorer
         self.rouge_scorer = rouge_scorer.RougeScorer(
@@ -194,12 +221,17 @@ class RAGEvaluator:
     
     def evaluate_bleu4(self, generated: str, reference: str) -> float:
         """Calculate BLEU-4 score"""
-        from nltk.translate.bleu_score import sentence_bleu
-        from nltk.tokenize import word_tokenize
-        
+        if RAGEvaluator._sentence_bleu is None:
+            from nltk.translate.bleu_score import sentence_bleu
+            from nltk.tokenize import word_tokenize
+            RAGEvaluator._sentence_bleu = staticmethod(sentence_bleu)
+            RAGEvaluator._word_tokenize = staticmethod(word_tokenize)
+        sentence_bleu = RAGEvaluator._sentence_bleu
+        word_tokenize = RAGEvaluator._word_tokenize
+
         if not reference or not generated:
             return 0.0
-        
+
         try:
             ref_tokens = word_tokenize(reference.lower())
             gen_tokens = word_tokenize(generated.lower())
@@ -233,11 +265,53 @@ class RAGEvaluator:
             print(f"ROUGE error: {e}")
             return {'rouge1_f1': 0, 'rouge2_f1': 0, 'rougeL_f1': 0}
     
-    def evaluate_bertscore(self, generated_list: List[str], 
+    def _cached_score(self, metric_name: str, question: str, generated: str,
+                      reference: str, compute) -> float:
+        """Look up a per-sample score in the cache, computing on miss"""
+        if self.score_cache is None:
+            return compute()
+
+        key = self.score_cache.make_key(
+            metric_name, "local", question, generated, ground_truth=reference
+        )
+        cached = self.score_cache.get(key)
+        if cached is not None:
+            return cached
+
+        score = compute()
+        self.score_cache.set(key, score)
+        return score
+
+    def _cached_rouge(self, question: str, generated: str, reference: str) -> Dict:
+        """Cached variant of evaluate_rouge (one cache entry per F1 sub-metric)"""
+        if self.score_cache is None:
+            return self.evaluate_rouge(generated, reference)
+
+        sub_metrics = ['rouge1_f1', 'rouge2_f1', 'rougeL_f1']
+        keys = {
+            name: self.score_cache.make_key(
+                name, "local", question, generated, ground_truth=reference
+            )
+            for name in sub_metrics
+        }
+        cached = {name: self.score_cache.get(key) for name, key in keys.items()}
+
+        if all(v is not None for v in cached.values()):
+            return cached
+
+        scores = self.evaluate_rouge(generated, reference)
+        for name in sub_metrics:
+            self.score_cache.set(keys[name], scores.get(name, 0))
+        return scores
+
+    def evaluate_bertscore(self, generated_list: List[str],
                            reference_list: List[str]) -> Dict:
         """Calculate BERTScore"""
-        from bert_score import score as bert_score_fn
-        
+        if RAGEvaluator._bert_score_fn is None:
+            from bert_score import score as bert_score_fn
+            RAGEvaluator._bert_score_fn = staticmethod(bert_score_fn)
+        bert_score_fn = RAGEvaluator._bert_score_fn
+
         # Filter out empty pairs
         valid_pairs = [
             (g, r) for g, r in zip(generated_list, reference_list)
@@ -268,11 +342,315 @@ class RAGEvaluator:
             print(f"BERTScore error: {e}")
             return {'precision': 0, 'recall': 0, 'f1': 0, 'error': str(e)}
     
+    def _build_judge(self):
+        """Build the Gemini judge LLM + embeddings used by RAGAS metrics"""
+        from langchain_google_genai import ChatGoogleGenerativeAI, GoogleGenerativeAIEmbeddings
+
+        google_api_key = os.environ.get("GOOGLE_API_KEY", "")
+        if not google_api_key:
+            try:
+                from app.config import settings
+                google_api_key = settings.GOOGLE_API_KEY
+            except Exception:
+                pass
+
+        if not google_api_key:
+            raise RuntimeError('GOOGLE_API_KEY not found. Set it in .env or environment.')
+
+        llm = ChatGoogleGenerativeAI(
+            model="gemini-1.5-flash",
+            google_api_key=google_api_key,
+            temperature=0.0
+        )
+        embeddings = GoogleGenerativeAIEmbeddings(
+            model="models/text-embedding-004",
+            google_api_key=google_api_key
+        )
+        return llm, embeddings
+
+    def _setup_metrics(self) -> List:
+        """
+        Bind the judge LLM/embeddings to the RAGAS metrics once.
+
+        ragas.evaluate() re-binds the LLM and embeddings and re-initializes
+        the metrics' prompts on every call; for per-sample scoring that is
+        pure overhead. Wrap and init once, cache on the instance, and let
+        metric.score()/ascore() reuse the frozen setup.
+        """
+        if getattr(self, '_metrics', None) is not None:
+            return self._metrics
+
+        from ragas.metrics import faithfulness, answer_relevancy, context_precision
+        from ragas.llms import LangchainLLMWrapper
+        from ragas.embeddings import LangchainEmbeddingsWrapper
+        from ragas.run_config import RunConfig
+
+        llm, embeddings = self._build_judge()
+        self._ragas_llm = LangchainLLMWrapper(llm)
+        self._ragas_emb = LangchainEmbeddingsWrapper(embeddings)
+
+        metrics = [faithfulness, answer_relevancy, context_precision]
+        for m in metrics:
+            m.llm = self._ragas_llm
+            if hasattr(m, 'embeddings'):
+                m.embeddings = self._ragas_emb
+            m.init(RunConfig())
+
+        self._metrics = metrics
+        return metrics
+
+    @classmethod
+    def _cap_contexts(cls, contexts: List[str]) -> List[str]:
+        """Truncate contexts to the judge-LLM budget before scoring"""
+        return [
+            c[:cls.MAX_CONTEXT_CHARS_PER_DOC]
+            for c in contexts[:cls.MAX_CONTEXTS]
+        ]
+
+    def evaluate_single(self, question: str, answer: str,
+                        contexts: List[str],
+                        ground_truth: Optional[str] = None) -> Dict:
+        """
+        Score one sample with the RAGAS metrics directly.
+
+        Calls metric.score() on a single row instead of building a one-row
+        HuggingFace Dataset and going through ragas.evaluate(), which rebuilds
+        an Executor and allocates an Arrow table per call. The Dataset path is
+        kept only for whole-dataset evaluation in evaluate_with_ragas.
+        """
+        metrics = self._setup_metrics()
+
+        row = {
+            'question': question,
+            'answer': answer,
+            'contexts': self._cap_contexts(contexts),
+            'ground_truth': ground_truth or ''
+        }
+
+        scores = {}
+        for m in metrics:
+            try:
+                scores[m.name] = m.score(row)
+            except Exception as e:
+                print(f"  {m.name} error: {e}")
+                scores[m.name] = None
+        return scores
+
+    def evaluate_dataset(self, samples: List[Dict],
+                         run_name: Optional[str] = None,
+                         reporter=None) -> Dict:
+        """
+        Stream-score a dataset sample by sample with the RAGAS metrics.
+
+        Each scored row is appended to an on-disk JSONL via
+        EvaluationReporter as soon as it is available, so partial progress
+        is durable and peak memory stays O(1). Aggregates (mean/std/min/max
+        per metric) are maintained with Welford online accumulators instead
+        of materializing a full DataFrame.
+
+        Args:
+            samples: List of dicts with question, answer, contexts and
+                     optionally ground_truth
+            run_name: Name for the run (defaults to a timestamp)
+            reporter: EvaluationReporter to stream results to
+
+        Returns:
+            Dict with num_samples, aggregated stats and the results file path
+        """
+        if reporter is None:
+            from app.rag.evaluation.reporter import EvaluationReporter
+            reporter = EvaluationReporter()
+        if run_name is None:
+            run_name = datetime.now().strftime("run_%Y%m%d_%H%M%S")
+
+        # Welford accumulators: metric -> [count, mean, M2, min, max]
+        stats: Dict[str, List[float]] = {}
+
+        for idx, sample in enumerate(samples):
+            scores = self.evaluate_single(
+                question=sample.get('question') or sample.get('query'),
+                answer=sample.get('answer', ''),
+                contexts=sample.get('contexts', []),
+                ground_truth=sample.get('ground_truth')
+            )
+
+            record = {'index': idx, 'question': sample.get('question'), **scores}
+            reporter.append_partial(run_name, record)
+
+            for name, value in scores.items():
+                if value is None:
+                    continue
+                value = float(value)
+                if name not in stats:
+                    stats[name] = [1, value, 0.0, value, value]
+                else:
+                    acc = stats[name]
+                    acc[0] += 1
+                    delta = value - acc[1]
+                    acc[1] += delta / acc[0]
+                    acc[2] += delta * (value - acc[1])
+                    acc[3] = min(acc[3], value)
+                    acc[4] = max(acc[4], value)
+
+        aggregated = {}
+        for name, (count, mean, m2, min_v, max_v) in stats.items():
+            aggregated[f'{name}_mean'] = mean
+            aggregated[f'{name}_std'] = (m2 / count) ** 0.5 if count > 1 else 0.0
+            aggregated[f'{name}_min'] = min_v
+            aggregated[f'{name}_max'] = max_v
+
+        results = {
+            'num_samples': len(samples),
+            'aggregated': aggregated
+        }
+        results['file_path'] = reporter.finalize_run(run_name, results)
+        return results
+
+    # Disk cache of RAG responses so evaluator-only changes can be re-scored
+    # without re-running retrieval + generation for every question
+    RAG_CACHE_DIR = Path("evaluation_data/rag_cache")
+
+    def _rag_cache_path(self, question: str, user_id: Optional[int]) -> Path:
+        import hashlib
+        key = hashlib.sha256(
+            f"{question.strip().lower()}|{user_id}".encode("utf-8")
+        ).hexdigest()
+        return self.RAG_CACHE_DIR / f"{key}.json"
+
+    def _cached_rag_response(self, question: str,
+                             user_id: Optional[int]) -> Optional[Dict]:
+        path = self._rag_cache_path(question, user_id)
+        if path.exists():
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    return json.load(f)
+            except (json.JSONDecodeError, OSError):
+                pass
+        return None
+
+    def _store_rag_response(self, question: str, user_id: Optional[int],
+                            response: Dict) -> None:
+        self.RAG_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        path = self._rag_cache_path(question, user_id)
+        # Document objects are not JSON-serializable; cache only the fields
+        # evaluation needs
+        cacheable = {
+            'text': response.get('text', ''),
+            'sources': response.get('sources', []),
+            'retrieval_time_ms': response.get('retrieval_time_ms', 0),
+            'generation_time_ms': response.get('generation_time_ms', 0),
+            'total_time_ms': response.get('total_time_ms', 0),
+        }
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(cacheable, f, ensure_ascii=False, default=str)
+
+    async def evaluate_single_async(self, question: str, answer: str,
+                                    contexts: List[str],
+                                    ground_truth: Optional[str] = None) -> Dict:
+        """
+        Async-native variant of evaluate_single.
+
+        Awaits each metric's ascore() coroutine directly (gathered
+        concurrently) instead of shunting the sync path to a worker
+        thread, so concurrent evaluations don't tie up executor threads.
+        """
+        import asyncio
+
+        metrics = self._setup_metrics()
+        row = {
+            'question': question,
+            'answer': answer,
+            'contexts': self._cap_contexts(contexts),
+            'ground_truth': ground_truth or ''
+        }
+
+        results = await asyncio.gather(
+            *[m.ascore(row) for m in metrics], return_exceptions=True
+        )
+
+        scores = {}
+        for m, result in zip(metrics, results):
+            if isinstance(result, Exception):
+                print(f"  {m.name} error: {result}")
+                scores[m.name] = None
+            else:
+                scores[m.name] = result
+        return scores
+
+    def evaluate_rag_query(self, question: str,
+                           ground_truth: Optional[str] = None,
+                           user_id: Optional[int] = None,
+                           use_cache: bool = True) -> Dict:
+        """Run one query through the RAG chain and score the answer"""
+        from app.rag.chain import rag_chain
+
+        response = self._cached_rag_response(question, user_id) if use_cache else None
+        if response is None:
+            response = rag_chain.generate_response(query=question, user_id=user_id)
+            if use_cache and not response.get('error'):
+                self._store_rag_response(question, user_id, response)
+        answer = response.get('text', '')
+        contexts = [s.get('title', '') for s in response.get('sources', [])]
+
+        scores = self.evaluate_single(question, answer, contexts, ground_truth)
+        return {'question': question, 'answer': answer, 'contexts': contexts,
+                'scores': scores, 'response': response}
+
+    async def aevaluate_rag_query(self, question: str,
+                                  ground_truth: Optional[str] = None,
+                                  user_id: Optional[int] = None,
+                                  use_cache: bool = True) -> Dict:
+        """
+        Async variant of evaluate_rag_query: awaits the RAG chain and the
+        metric coroutines directly so many queries can be in flight
+        concurrently without tying up executor threads.
+        """
+        from app.rag.chain import rag_chain
+
+        response = self._cached_rag_response(question, user_id) if use_cache else None
+        if response is None:
+            response = await rag_chain.generate_response_async(
+                query=question, user_id=user_id
+            )
+            if use_cache and not response.get('error'):
+                self._store_rag_response(question, user_id, response)
+        answer = response.get('text', '')
+        contexts = [s.get('title', '') for s in response.get('sources', [])]
+
+        scores = await self.evaluate_single_async(
+            question, answer, contexts, ground_truth
+        )
+        return {'question': question, 'answer': answer, 'contexts': contexts,
+                'scores': scores, 'response': response}
+
+    async def aevaluate_many(self, questions: List[Dict],
+                             concurrency: int = 8) -> List[Dict]:
+        """
+        Evaluate a batch of queries concurrently.
+
+        Generation and judge-LLM calls are I/O-bound, so overlapping them
+        with asyncio.gather removes the per-query RTT serialization; the
+        semaphore bounds in-flight requests to avoid rate-limit blowups.
+        """
+        import asyncio
+
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def _one(q: Dict) -> Dict:
+            async with semaphore:
+                return await self.aevaluate_rag_query(
+                    question=q.get('question') or q.get('query'),
+                    ground_truth=q.get('ground_truth'),
+                    user_id=q.get('user_id')
+                )
+
+        return list(await asyncio.gather(*[_one(q) for q in questions]))
+
     def evaluate_with_ragas(self, eval_data: Dict) -> Dict:
         """Evaluate using RAGAS metrics with Google Gemini as LLM evaluator"""
         if not self.use_ragas:
             return {'skipped': True, 'reason': 'RAGAS disabled'}
-        
+
         try:
             from ragas import evaluate as ragas_evaluate
             from ragas.metrics import (
@@ -281,33 +659,15 @@ class RAGEvaluator:
                 context_precision
             )
             from datasets import Dataset
-            from langchain_google_genai import ChatGoogleGenerativeAI, GoogleGenerativeAIEmbeddings
-            
+
             print("  Running RAGAS evaluation (using Gemini)...")
-            
-            # Get Google API key from environment or app config
-            google_api_key = os.environ.get("GOOGLE_API_KEY", "")
-            if not google_api_key:
-                try:
-                    from app.config import settings
-                    google_api_key = settings.GOOGLE_API_KEY
-                except Exception:
-                    pass
-            
-            if not google_api_key:
-                return {'error': 'GOOGLE_API_KEY not found. Set it in .env or environment.'}
-            
+
             # Use Gemini as LLM evaluator instead of OpenAI
-            llm = ChatGoogleGenerativeAI(
-                model="gemini-1.5-flash",
-                google_api_key=google_api_key,
-                temperature=0.0
-            )
-            embeddings = GoogleGenerativeAIEmbeddings(
-                model="models/text-embedding-004",
-                google_api_key=google_api_key
-            )
-            
+            try:
+                llm, embeddings = self._build_judge()
+            except RuntimeError as e:
+                return {'error': str(e)}
+
             # Prepare dataset
             dataset = Dataset.from_dict({
                 "question": eval_data["question"],
@@ -362,14 +722,19 @@ class RAGEvaluator:
             'total_ms': calc_stats(total_times)
         }
     
-    def run_evaluation(self, eval_data: Dict, include_ragas: bool = False) -> Dict:
+    def run_evaluation(self, eval_data: Dict, include_ragas: bool = False,
+                       return_per_sample: bool = True) -> Dict:
         """
         Run all evaluations on collected data
-        
+
         Args:
             eval_data: Dict with questions, answers, contexts, ground_truths
             include_ragas: Whether to include RAGAS (requires OpenAI API)
-            
+            return_per_sample: Include per-sample score arrays and raw
+                question/answer data in the result. Pass False when only
+                aggregates are needed (e.g. dashboard pings) to avoid
+                materializing O(N) payloads.
+
         Returns:
             Dict with all evaluation results
         """
@@ -386,10 +751,15 @@ class RAGEvaluator:
         
         if has_ground_truth:
             print("Calculating BLEU-4 and ROUGE-L...")
-            for gen, ref in zip(eval_data["answer"], eval_data["ground_truth"]):
+            for question, gen, ref in zip(
+                eval_data["question"], eval_data["answer"], eval_data["ground_truth"]
+            ):
                 if ref:
-                    bleu_scores.append(self.evaluate_bleu4(gen, ref))
-                    rouge_scores.append(self.evaluate_rouge(gen, ref))
+                    bleu_scores.append(
+                        self._cached_score("bleu4", question, gen, ref,
+                                           lambda: self.evaluate_bleu4(gen, ref))
+                    )
+                    rouge_scores.append(self._cached_rouge(question, gen, ref))
         else:
             print("Skipping BLEU-4 and ROUGE-L (no ground truth provided)")
         
@@ -410,33 +780,48 @@ class RAGEvaluator:
         
         # Latency
         latency_results = self.evaluate_latency(eval_data)
-        
+
+        # Aggregate BLEU/ROUGE with single vectorized .agg calls instead of
+        # one Python pass per statistic
+        bleu_agg = {'skipped': True}
+        rouge_agg = {'skipped': True}
+        if bleu_scores or rouge_scores:
+            import pandas as pd
+        if bleu_scores:
+            stats = pd.Series(bleu_scores).agg(['mean', 'min', 'max'])
+            bleu_agg = {
+                'mean': float(stats['mean']),
+                'min': float(stats['min']),
+                'max': float(stats['max']),
+            }
+            if return_per_sample:
+                bleu_agg['per_sample'] = bleu_scores
+        if rouge_scores:
+            means = pd.DataFrame(rouge_scores)[
+                ['rouge1_f1', 'rouge2_f1', 'rougeL_f1']
+            ].agg('mean')
+            rouge_agg = {f'{col}_mean': float(v) for col, v in means.items()}
+
         # Compile results
         self.results = {
             'timestamp': datetime.now().isoformat(),
             'num_samples': n,
             'has_ground_truth': has_ground_truth,
-            'bleu4': {
-                'mean': sum(bleu_scores) / len(bleu_scores) if bleu_scores else 0,
-                'min': min(bleu_scores) if bleu_scores else 0,
-                'max': max(bleu_scores) if bleu_scores else 0,
-                'per_sample': bleu_scores
-            } if bleu_scores else {'skipped': True},
-            'rouge': {
-                'rouge1_f1_mean': sum(r['rouge1_f1'] for r in rouge_scores) / len(rouge_scores) if rouge_scores else 0,
-                'rouge2_f1_mean': sum(r['rouge2_f1'] for r in rouge_scores) / len(rouge_scores) if rouge_scores else 0,
-                'rougeL_f1_mean': sum(r['rougeL_f1'] for r in rouge_scores) / len(rouge_scores) if rouge_scores else 0,
-            } if rouge_scores else {'skipped': True},
+            'bleu4': bleu_agg,
+            'rouge': rouge_agg,
             'bertscore': bert_results,
             'ragas': ragas_results,
             'latency': latency_results,
-            'raw_data': {
+        }
+        if return_per_sample:
+            self.results['raw_data'] = {
                 'questions': eval_data['question'],
                 'answers': eval_data['answer'],
                 'ground_truths': eval_data['ground_truth'] if has_ground_truth else None
             }
-        }
-        
+        else:
+            bert_results.pop('per_sample_f1', None)
+
         return self.results
     
     def print_summary(self):
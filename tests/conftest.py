@@ -1,48 +1,111 @@
 """Pytest configuration and fixtures"""
 
+import httpx
 import pytest
-from fastapi.testclient import TestClient
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker
-from app.main import app
+from sqlalchemy.pool import StaticPool
 from app.database.base import Base
-from app.database.session import get_db
 
-# Test database URL
-TEST_DATABASE_URL = "sqlite:///./test.db"
+# In-memory test database: StaticPool pins every connection to the same
+# underlying SQLite handle, so the schema created once is visible to all
+# sessions and nothing ever touches the filesystem
+TEST_DATABASE_URL = "sqlite:///:memory:"
 
 # Create test engine
 engine = create_engine(
     TEST_DATABASE_URL,
-    connect_args={"check_same_thread": False}
+    connect_args={"check_same_thread": False},
+    poolclass=StaticPool
 )
-TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False)
+
+
+@event.listens_for(engine, "connect")
+def _set_sqlite_pragmas(dbapi_conn, connection_record):
+    """Durability off for the throwaway test DB: no journal, no fsync"""
+    cursor = dbapi_conn.cursor()
+    cursor.execute("PRAGMA journal_mode=MEMORY")
+    cursor.execute("PRAGMA synchronous=OFF")
+    cursor.execute("PRAGMA temp_store=MEMORY")
+    cursor.close()
+
+# The per-test session the get_db override should hand out; set by the
+# db fixture so the session-scoped client always sees the current test's
+# transaction
+_active_db = {"session": None}
+
+
+@pytest.fixture(scope="session", autouse=True)
+def _schema():
+    """Create the schema once per test session instead of per test"""
+    Base.metadata.create_all(bind=engine)
+    yield
+    Base.metadata.drop_all(bind=engine)
 
 
 @pytest.fixture(scope="function")
 def db():
-    """Database session fixture"""
-    Base.metadata.create_all(bind=engine)
-    db = TestingSessionLocal()
+    """
+    Database session fixture (transaction rollback per test).
+
+    The session runs inside a SAVEPOINT that is transparently restarted
+    whenever test code commits, so even committing tests are fully
+    undone by the outer rollback — no DDL or TRUNCATE between tests.
+    """
+    connection = engine.connect()
+    transaction = connection.begin()
+    db = TestingSessionLocal(bind=connection)
+    nested = connection.begin_nested()
+
+    @event.listens_for(db, "after_transaction_end")
+    def _restart_savepoint(session, trans):
+        nonlocal nested
+        if trans.nested and not trans._parent.nested:
+            nested = connection.begin_nested()
+
+    _active_db["session"] = db
     try:
         yield db
     finally:
+        _active_db["session"] = None
+        event.remove(db, "after_transaction_end", _restart_savepoint)
         db.close()
-        Base.metadata.drop_all(bind=engine)
+        transaction.rollback()
+        connection.close()
 
 
-@pytest.fixture(scope="function")
-def client(db):
-    """Test client fixture"""
+@pytest.fixture(scope="session")
+async def client(_schema):
+    """
+    Test client fixture.
+
+    Session-scoped httpx.AsyncClient over ASGITransport: requests call
+    straight into the app on the test's event loop with no thread-pool
+    handoff, and tests can fan out concurrent requests with
+    asyncio.gather. The app import is lazy so collection alone doesn't
+    pull in every router and its imports.
+    """
+    from app.main import app
+    from app.database.session import get_db
+
     def override_get_db():
-        try:
-            yield db
-        finally:
-            db.close()
-    
+        session = _active_db["session"]
+        if session is not None:
+            # Inside a test that requested the db fixture: share its
+            # rollback transaction
+            yield session
+        else:
+            session = TestingSessionLocal(bind=engine)
+            try:
+                yield session
+            finally:
+                session.close()
+
     app.dependency_overrides[get_db] = override_get_db
-    
-    with TestClient(app) as test_client:
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as test_client:
         yield test_client
-    
+
     app.dependency_overrides.clear()
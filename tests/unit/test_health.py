@@ -1,8 +1,8 @@
 """Test health endpoint"""
 
-def test_health_check(client):
+async def test_health_check(client):
     """Test health check endpoint"""
-    response = client.get("/health")
+    response = await client.get("/health")
     assert response.status_code in [200, 503]
     data = response.json()
     assert "status" in data